@@ -0,0 +1,7 @@
+"""
+Class Widgets 2 性能基准
+
+用法::
+
+    python -m benchmarks.schedule_bench --sizes small,medium,large
+"""
@@ -0,0 +1,178 @@
+"""
+合成课程表生成器
+
+按给定规模确定性地生成 ScheduleData（相同参数 + seed 必然得到相同结果），
+用于基准测试在“全校规模”下的表现。
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from src.core.schedule.model import (
+    ScheduleData, MetaInfo, Subject, Timeline, Entry, EntryType, Timetable, WeekType
+)
+
+SUBJECT_COLORS = ["#FF5722", "#3F51B5", "#2196F3", "#9C27B0", "#795548", "#00BCD4", "#4CAF50", "#8BC34A"]
+SUBJECT_ICONS = ["ic_fluent_book_20_regular", "ic_fluent_ruler_20_regular", "ic_fluent_leaf_three_20_regular"]
+
+
+@dataclass(frozen=True)
+class ScheduleSize:
+    """生成规模参数"""
+    name: str
+    subjects: int = 20
+    timelines: int = 7
+    entries_per_day: int = 10
+    dated_days: int = 0
+    overrides: int = 0
+    swap_records: int = 0
+    max_week_cycle: int = 2
+
+
+SIZES: dict[str, ScheduleSize] = {
+    "small": ScheduleSize("small", subjects=12, timelines=5, entries_per_day=8, overrides=10, swap_records=2),
+    "medium": ScheduleSize("medium", subjects=40, timelines=14, entries_per_day=12, dated_days=30,
+                           overrides=200, swap_records=10),
+    "large": ScheduleSize("large", subjects=120, timelines=56, entries_per_day=16, dated_days=200,
+                          overrides=2000, swap_records=40, max_week_cycle=4),
+}
+
+
+@dataclass
+class GeneratedSchedule:
+    schedule: ScheduleData
+    swap_records: list[dict] = field(default_factory=list)
+
+
+class ScheduleGenerator:
+    """确定性课程表生成器"""
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+
+    def _id(self, prefix: str) -> str:
+        # 与 generate_id 同形（prefix_uuid4hex），但由 rng 决定
+        return f"{prefix}_{self.rng.getrandbits(128):032x}"
+
+    def _weeks(self, max_cycle: int):
+        if max_cycle <= 1:
+            return WeekType.ALL
+        roll = self.rng.random()
+        if roll < 0.5:
+            return WeekType.ALL
+        if roll < 0.8:
+            return self.rng.randint(1, max_cycle)
+        return sorted(self.rng.sample(range(1, max_cycle + 1), self.rng.randint(1, max_cycle)))
+
+    def subjects(self, count: int) -> list[Subject]:
+        return [
+            Subject(
+                id=self._id("subj"),
+                name=f"Subject {i + 1}",
+                simplifiedName=f"S{i + 1}",
+                teacher=f"Teacher {self.rng.randint(1, max(1, count // 2))}",
+                icon=self.rng.choice(SUBJECT_ICONS),
+                color=self.rng.choice(SUBJECT_COLORS),
+                location=f"Room {self.rng.randint(100, 499)}",
+                isLocalClassroom=self.rng.random() > 0.2,
+            )
+            for i in range(count)
+        ]
+
+    def entries(self, count: int, subjects: list[Subject]) -> list[Entry]:
+        result = []
+        cursor = datetime(2000, 1, 1, 7, 30)
+        for i in range(count):
+            if i % 2 == 0:
+                entry_type = EntryType.ACTIVITY if self.rng.random() < 0.1 else EntryType.CLASS
+                duration = 40
+            else:
+                entry_type = EntryType.BREAK
+                duration = 10
+            end = cursor + timedelta(minutes=duration)
+            result.append(Entry(
+                id=self._id("entry"),
+                type=entry_type,
+                startTime=cursor.strftime("%H:%M"),
+                endTime=end.strftime("%H:%M"),
+                subjectId=self.rng.choice(subjects).id if entry_type == EntryType.CLASS else None,
+                title="Activity" if entry_type == EntryType.ACTIVITY else None,
+            ))
+            cursor = end
+        return result
+
+    def generate(self, size: ScheduleSize, start_date: Optional[date] = None) -> GeneratedSchedule:
+        start_date = start_date or date(2025, 9, 1)
+        subjects = self.subjects(size.subjects)
+
+        days: list[Timeline] = []
+        for i in range(size.timelines):
+            days.append(Timeline(
+                id=self._id("day"),
+                entries=self.entries(size.entries_per_day, subjects),
+                dayOfWeek=[(i % 7) + 1],
+                weeks=WeekType.ALL if i < 7 else self._weeks(size.max_week_cycle),
+            ))
+
+        for i in range(size.dated_days):
+            day_date = start_date + timedelta(days=self.rng.randint(0, 180))
+            days.append(Timeline(
+                id=self._id("day"),
+                entries=self.entries(size.entries_per_day, subjects),
+                dayOfWeek=[day_date.isoweekday()],
+                weeks=self._weeks(size.max_week_cycle),
+                date=day_date.isoformat(),
+            ))
+
+        overrides: list[Timetable] = []
+        for _ in range(size.overrides):
+            day = self.rng.choice(days)
+            entry = self.rng.choice(day.entries)
+            overrides.append(Timetable(
+                id=self._id("override"),
+                entryId=entry.id,
+                dayOfWeek=list(day.dayOfWeek or []) or None,
+                weeks=self._weeks(size.max_week_cycle),
+                subjectId=self.rng.choice(subjects).id,
+            ))
+
+        schedule = ScheduleData(
+            meta=MetaInfo(
+                id=self._id("meta"),
+                maxWeekCycle=size.max_week_cycle,
+                startDate=start_date.isoformat(),
+            ),
+            subjects=subjects,
+            days=days,
+            overrides=overrides,
+        )
+        return GeneratedSchedule(schedule=schedule, swap_records=self.swap_records(schedule, size.swap_records))
+
+    def swap_records(self, schedule: ScheduleData, count: int) -> list[dict]:
+        """生成与 ClassSwapManager 持久化格式一致的换课记录"""
+        records = []
+        class_entries = [e for d in schedule.days[:7] for e in d.entries if e.type == EntryType.CLASS]
+        if len(class_entries) < 2:
+            return records
+        for _ in range(count):
+            a, b = self.rng.sample(class_entries, 2)
+            is_swap = self.rng.random() < 0.7
+            records.append({
+                "type": "swap" if is_swap else "replace",
+                "entry_a": a.id,
+                "entry_b": b.id if is_swap else "",
+                "old_subject": a.subjectId or "",
+                "new_subject": (b.subjectId if is_swap else self.rng.choice(schedule.subjects).id) or "",
+                "timestamp": datetime(2025, 9, 1, 8, 0).isoformat(),
+            })
+        return records
+
+
+def generate_schedule(size: ScheduleSize | str, seed: int = 0) -> GeneratedSchedule:
+    """按规模名或参数生成课程表"""
+    if isinstance(size, str):
+        size = SIZES[size]
+    return ScheduleGenerator(seed).generate(size)
@@ -0,0 +1,434 @@
+"""
+课程表子系统规模基准
+
+覆盖 ScheduleParser.load / ScheduleManager.save / 存储格式读写 / ScheduleServices.get_day_entries /
+ScheduleEditor 操作 / ScheduleConverter 双向转换 / iCalendar 导出 / 差异与三方合并 / ClassSwapManager 操作，
+在多个合成规模下计时，输出机器可读的 JSON，并与基线比较以发现扩展性回退。
+
+用法::
+
+    python -m benchmarks.schedule_bench                       # 运行并与 baseline.json 比较
+    python -m benchmarks.schedule_bench --sizes large --repeat 10
+    python -m benchmarks.schedule_bench --update-baseline     # 重写基线
+
+当任一操作的中位耗时超过基线的 ``--threshold`` 倍时，退出码为 1。
+绝对耗时随机器变化，因此每个规模前后都计时一个固定的校准负载（meta.calibration_ms），
+比较时用各自的校准耗时归一化，再计算相对基线的倍数；基线中同时记录运行环境。
+基线只应通过 ``--update-baseline`` 整体重写，不要手工修改其中的数值。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QCoreApplication
+from loguru import logger
+
+from benchmarks.generator import SIZES, generate_schedule
+from src.core.config.manager import ConfigManager
+from src.core.config.writer import atomic_write
+from src.core.convertor.converter import ScheduleConverter
+from src.core.convertor.ics import IcsExporter, write_ics
+from src.core.parser import ScheduleParser
+from src.core.schedule.compaction import compact_overrides
+from src.core.schedule.conflicts import ResourceConflictIndex
+from src.core.schedule.diff import diff_schedules, merge_schedules
+from src.core.schedule.editor import ScheduleEditor
+from src.core.schedule.manager import ScheduleManager
+from src.core.schedule.model import EntryType, ScheduleData
+from src.core.schedule.service import ScheduleServices
+from src.core.schedule.snapshots import SnapshotStore
+from src.core.schedule.swapper import ClassSwapManager
+from src.core.utils.storage import StorageFormat, encode
+
+BENCH_PATH = Path(__file__).parent
+DEFAULT_BASELINE = BENCH_PATH / "baseline.json"
+CALIBRATION_ROUNDS = 100
+
+
+def calibrate(repeat: int = 5) -> float:
+    """固定负载（小规模课表的 JSON 解析 / 序列化往返）的耗时，毫秒；用于在不同机器之间归一化"""
+    schedule = generate_schedule(SIZES["small"], seed=0).schedule
+    payload = schedule.model_dump_json()
+    ScheduleData.model_validate_json(payload)  # 预热
+    samples = []
+    for _ in range(max(repeat, 5)):
+        start = time.perf_counter()
+        for _ in range(CALIBRATION_ROUNDS):
+            ScheduleData.model_validate_json(payload).model_dump_json()
+        samples.append(time.perf_counter() - start)
+    return round(min(samples) * 1000, 4)  # 取最小值：受后台负载干扰最小
+
+
+def environment() -> dict:
+    """基线中记录的运行环境"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    packages = {}
+    for name in ("PySide6", "pydantic", "pydantic-core"):
+        try:
+            packages[name] = version(name)
+        except PackageNotFoundError:
+            packages[name] = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+class BenchCentral:
+    """基准用的最小 AppCentral：只提供 configs 与 schedule_manager"""
+
+    def __init__(self, workdir: Path):
+        self.configs = ConfigManager(path=workdir, filename="configs.json")
+        self.schedule_manager = ScheduleManager(workdir / "schedules", self)
+
+
+class BenchRunner:
+    def __init__(self, repeat: int = 5, ops: Optional[set[str]] = None):
+        self.repeat = repeat
+        self.ops = ops
+        self.results: dict[str, dict[str, dict[str, float]]] = {}
+
+    def measure(self, size: str, op: str, fn: Callable[[], object], number: int = 1) -> None:
+        """计时 fn：预热一次，然后重复 repeat 轮，每轮调用 number 次，记录单次耗时"""
+        if self.ops and op not in self.ops:
+            return
+        fn()
+        samples = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+        self.results.setdefault(size, {})[op] = {
+            "median_ms": round(statistics.median(samples) * 1000, 4),
+            "min_ms": round(min(samples) * 1000, 4),
+            "calls": self.repeat * number,
+        }
+
+    def run_size(self, size_name: str, seed: int) -> None:
+        generated = generate_schedule(SIZES[size_name], seed=seed)
+        base_schedule = generated.schedule
+        with tempfile.TemporaryDirectory(prefix="cw2-bench-") as tmp:
+            workdir = Path(tmp)
+            central = BenchCentral(workdir)
+            manager = central.schedule_manager
+
+            def fresh() -> ScheduleData:
+                manager.schedule = base_schedule.model_copy(deep=True)
+                return manager.schedule
+
+            # 持久化
+            fresh()
+            manager.schedule_path = manager.schedules_dir / f"{size_name}.json"
+            manager.current_schedule_name = size_name
+            manager.save()
+            self.measure(size_name, "manager_save", manager.save)
+            self.measure(size_name, "parser_load", lambda: ScheduleParser(manager.schedule_path).load())
+
+            # 存储格式：原写法（json 模块 + indent=4）与 pretty / compact 对比
+            formats_dir = workdir / "formats"
+            formats_dir.mkdir()
+            legacy_path = formats_dir / "legacy.json"
+            paths = {fmt: formats_dir / f"{fmt.value}.json" for fmt in StorageFormat}
+            self.measure(size_name, "storage_save_legacy", lambda: legacy_path.write_text(
+                json.dumps(manager.schedule.model_dump(), ensure_ascii=False, indent=4), encoding="utf-8"))
+            self.measure(size_name, "storage_load_legacy", lambda: ScheduleData.model_validate(
+                json.loads(legacy_path.read_text(encoding="utf-8"))))
+            for fmt, path in paths.items():
+                self.measure(size_name, f"storage_save_{fmt.value}",
+                             lambda fmt=fmt, path=path: path.write_bytes(encode(manager.schedule, fmt)))
+                self.measure(size_name, f"storage_load_{fmt.value}", lambda path=path: ScheduleParser(path).load())
+
+            configs = central.configs
+
+            def config_save_legacy():
+                configs.notify()  # 与 config_save 相同：所有分区重新 dump、原子写入，只有编码方式不同
+                for name in configs.data:
+                    atomic_write(formats_dir / f"{name}.json", json.dumps(
+                        configs.section_dump(name), ensure_ascii=False, indent=4, default=str).encode("utf-8"))
+
+            def config_save(fmt: StorageFormat):
+                configs.app.storage_format = fmt  # 同时标记所有分区需要按该格式重写
+                configs.save(silent=True)
+
+            self.measure(size_name, "config_save_legacy", config_save_legacy)
+            for fmt in StorageFormat:
+                self.measure(size_name, f"config_save_{fmt.value}", lambda fmt=fmt: config_save(fmt))
+            configs.app.storage_format = StorageFormat.PRETTY
+
+            # 快照（内容未变时只计算清单，即稳定状态下每次保存的额外开销）
+            store = SnapshotStore(workdir / "bench-snapshots")
+            snapshot_id = store.snapshot(size_name, manager.schedule, "bench").id
+            self.measure(size_name, "snapshot_take", lambda: store.snapshot(size_name, manager.schedule, "bench"))
+            self.measure(size_name, "snapshot_restore", lambda: store.restore(size_name, snapshot_id))
+
+            # 教师 / 教室冲突索引（目录内 4 份课表）
+            for i in range(3):
+                shutil.copy(manager.schedule_path, manager.schedules_dir / f"{size_name}-peer{i}.json")
+            self.measure(size_name, "conflict_index_build",
+                         lambda: ResourceConflictIndex(manager.schedules_dir).refresh())
+            conflicts = ResourceConflictIndex(manager.schedules_dir)
+            conflicts.refresh()
+            query_day = datetime.strptime(base_schedule.meta.startDate, "%Y-%m-%d").date()
+            teachers = sorted({s.teacher for s in base_schedule.subjects if s.teacher})
+
+            def query_conflicts():
+                conflicts.refresh()
+                return [conflicts.query("teacher", t, query_day, "08:00", "12:00") for t in teachers]
+
+            self.measure(size_name, "conflict_query", query_conflicts)
+
+            # 日程解析
+            services = ScheduleServices(central)
+            start = datetime.strptime(base_schedule.meta.startDate, "%Y-%m-%d")
+            span = 7 * (base_schedule.meta.maxWeekCycle or 1)
+            dates = [start + timedelta(days=i) for i in range(span)]
+            self.measure(
+                size_name, "services_get_day_entries",
+                lambda: [services.get_day_entries(manager.schedule, d) for d in dates],
+            )
+
+            # 编辑器
+            fresh()
+            editor = ScheduleEditor(manager)
+            day_id = editor.schedule.days[0].id
+            entry_id = editor.schedule.days[0].entries[0].id
+
+            def editor_add_remove_entry():
+                new_id = editor.addEntry(day_id, EntryType.CLASS.value, "23:00", "23:40", "", "Bench")
+                editor.removeEntry(new_id)
+
+            def editor_override_roundtrip():
+                editor.addOverride(entry_id, [1], 1, editor.schedule.subjects[0].id, "")
+                oid = editor.findOverride(entry_id, [1], 1)
+                editor.removeOverride(oid)
+
+            def editor_duplicate_day():
+                editor.removeDay(editor.duplicateDay(day_id))
+
+            self.measure(size_name, "editor_add_remove_entry", editor_add_remove_entry)
+            self.measure(size_name, "editor_update_entry", lambda: editor.updateEntry(
+                entry_id, "", "", "", editor.schedule.subjects[1].id, ""))
+            self.measure(size_name, "editor_override_roundtrip", editor_override_roundtrip)
+            self.measure(size_name, "editor_get_entry_override", lambda: editor.getEntryOverride(entry_id, 1, 1))
+            self.measure(size_name, "editor_duplicate_day", editor_duplicate_day)
+            editor.manager.scheduleSwitched.disconnect(editor.refresh)
+
+            # 转换器
+            fresh()
+            manager.save()
+            cses_path = workdir / f"{size_name}.yaml"
+            cw2_path = workdir / f"{size_name}.cw2.json"
+            self.measure(size_name, "converter_cw2_to_cses",
+                         lambda: ScheduleConverter.from_cw2(manager.schedule_path).to_cses(cses_path))
+            self.measure(size_name, "converter_cses_to_cw2",
+                         lambda: ScheduleConverter.from_cses(cses_path).to_cw2(cw2_path))
+            # 导入 / 导出实际走的内存路径：一次解析、一次写入
+            self.measure(size_name, "converter_import_cses",
+                         lambda: ScheduleConverter.from_cses(cses_path).to_schedule())
+            self.measure(size_name, "converter_export_cses",
+                         lambda: ScheduleConverter.from_schedule(manager.schedule).to_cses(cses_path))
+            # 整学年 iCalendar（52 周）
+            year_start = datetime.strptime(base_schedule.meta.startDate, "%Y-%m-%d").date()
+            self.measure(size_name, "ics_export_year", lambda: write_ics(
+                workdir / f"{size_name}.ics",
+                [IcsExporter(manager.schedule, year_start, year_start + timedelta(weeks=52, days=-1))],
+            ))
+
+            # 差异 / 三方合并
+            local = base_schedule.model_copy(deep=True)
+            local.days[0].entries[0].title = "Local"
+            remote = base_schedule.model_copy(deep=True)
+            remote.subjects[0].name = "Remote"
+            remote.overrides = remote.overrides[1:]
+            self.measure(size_name, "diff_schedules", lambda: diff_schedules(base_schedule, remote))
+            self.measure(size_name, "merge_three_way", lambda: merge_schedules(base_schedule, local, remote))
+            self.measure(size_name, "compact_overrides", lambda: compact_overrides(base_schedule))
+
+            # 换课
+            fresh()
+            swapper = ClassSwapManager(central)
+            cycle = manager.schedule.meta.maxWeekCycle or 1
+            self.measure(size_name, "swap_get_day_entries", lambda: [
+                swapper.getDayEntries(dow, week) for dow in range(1, 8) for week in range(1, cycle + 1)
+            ])
+            day_entries = swapper.getDayEntries(1, 1)
+            class_ids = [e["id"] for e in day_entries if e["type"] == EntryType.CLASS.value]
+            if len(class_ids) >= 2:
+                self.measure(size_name, "swap_two_entries",
+                             lambda: swapper.swapTwoEntries(class_ids[0], class_ids[1], 1, 1))
+                self.measure(size_name, "swap_replace_entry",
+                             lambda: swapper.replaceEntry(class_ids[0], manager.schedule.subjects[0].id, 1, 1))
+                # 一次调整整天：8 次互换，批量提交只持久化 / 刷新一次
+                batch_ops = [
+                    {"type": "swap", "entry_a": class_ids[i % len(class_ids)],
+                     "entry_b": class_ids[(i + 1) % len(class_ids)]}
+                    for i in range(8)
+                ]
+                self.measure(size_name, "swap_batch_of_8",
+                             lambda: swapper.applySwapBatch(batch_ops, 1, 1))
+            self.measure(size_name, "swap_apply_picker_to_today", lambda: swapper.applyPickerToToday(1, 1))
+
+            today = datetime.now()
+            swap_state = {
+                "date": today.strftime("%Y-%m-%d"),
+                "records": generated.swap_records,
+                "day_of_week": today.isoweekday(),
+                "week_of_cycle": 1,
+            }
+
+            def load_swap_records():
+                central.configs.schedule.class_swap = dict(swap_state)
+                swapper.loadSwapRecords()
+
+            self.measure(size_name, "swap_load_records", load_swap_records)
+
+
+def compare(results: dict, baseline: dict, threshold: float,
+            calibration_ms: Optional[dict[str, float]] = None) -> tuple[list[dict], bool]:
+    """
+    与基线比较，返回 (比较行, 是否存在回退)
+    双方都有该规模的校准耗时时，ratio 为归一化后的倍数：(当前 / 当前校准) / (基线 / 基线校准)
+    """
+    rows = []
+    regressed = False
+    base_results = baseline.get("results", {})
+    speeds = relative_speed(calibration_ms, baseline)
+    for size, ops in results.items():
+        speed = speeds.get(size, 1.0)
+        for op, current in ops.items():
+            base = base_results.get(size, {}).get(op)
+            row = {"size": size, "op": op, "median_ms": current["median_ms"],
+                   "baseline_ms": None, "ratio": None, "regression": False}
+            if base and base.get("median_ms"):
+                ratio = current["median_ms"] / (base["median_ms"] * speed)
+                row["baseline_ms"] = base["median_ms"]
+                row["ratio"] = round(ratio, 3)
+                row["regression"] = ratio > threshold
+                regressed = regressed or row["regression"]
+            rows.append(row)
+    return rows, regressed
+
+
+def scaling(results: dict) -> dict[str, dict[str, float]]:
+    """各规模相对最小规模的耗时倍数"""
+    order = [s for s in SIZES if s in results]
+    if len(order) < 2:
+        return {}
+    smallest = results[order[0]]
+    table: dict[str, dict[str, float]] = {}
+    for op, base in smallest.items():
+        if not base["median_ms"]:
+            continue
+        table[op] = {
+            size: round(results[size][op]["median_ms"] / base["median_ms"], 2)
+            for size in order if op in results[size]
+        }
+    return table
+
+
+def relative_speed(calibration_ms: Optional[dict[str, float]], baseline: dict) -> dict[str, float]:
+    """各规模的校准耗时相对基线的倍数"""
+    base_calibration = baseline.get("meta", {}).get("calibration_ms")
+    if not calibration_ms or not isinstance(base_calibration, dict):
+        return {}
+    return {
+        size: value / base_calibration[size]
+        for size, value in calibration_ms.items() if base_calibration.get(size)
+    }
+
+
+def print_report(rows: list[dict], scale: dict, speeds: Optional[dict[str, float]] = None) -> None:
+    if speeds:
+        print("calibration vs. baseline (ratios are normalized): "
+              + ", ".join(f"{size}={speed:.2f}x" for size, speed in speeds.items()) + "\n")
+    print(f"{'size':<8}{'operation':<30}{'median ms':>12}{'baseline':>12}{'ratio':>8}")
+    for row in rows:
+        baseline = f"{row['baseline_ms']:.3f}" if row["baseline_ms"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['size']:<8}{row['op']:<30}{row['median_ms']:>12.3f}{baseline:>12}{ratio:>8}{flag}")
+    if scale:
+        print("\nscaling vs. smallest size:")
+        for op, by_size in scale.items():
+            print(f"  {op:<30}" + "  ".join(f"{s}={v}x" for s, v in by_size.items()))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Class Widgets 2 schedule scaling benchmarks")
+    parser.add_argument("--sizes", default="small,medium,large", help="comma separated: " + ",".join(SIZES))
+    parser.add_argument("--ops", default="", help="comma separated operation filter")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write machine-readable results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--threshold", type=float, default=1.5, help="regression ratio vs. baseline")
+    parser.add_argument("--verbose", action="store_true", help="keep application logging")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.remove()
+    _app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    runner = BenchRunner(repeat=args.repeat, ops={o for o in args.ops.split(",") if o} or None)
+    calibration_ms: dict[str, float] = {}
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        if size not in SIZES:
+            parser.error(f"unknown size: {size}")
+        # 在该规模前后各校准一次取几何平均，减小运行期间机器负载变化的影响
+        before = calibrate(args.repeat)
+        runner.run_size(size, args.seed)
+        calibration_ms[size] = round(statistics.geometric_mean([before, calibrate(args.repeat)]), 4)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            **environment(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "calibration_ms": calibration_ms,
+        },
+        "results": runner.results,
+    }
+
+    baseline = {}
+    if args.baseline.exists() and not args.update_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    rows, regressed = compare(runner.results, baseline, args.threshold, calibration_ms)
+    report["comparison"] = rows
+    report["scaling"] = scaling(runner.results)
+    print_report(rows, report["scaling"], relative_speed(calibration_ms, baseline))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(
+            json.dumps({"meta": report["meta"], "results": runner.results}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        print(f"\nbaseline updated: {args.baseline}")
+        return 0
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
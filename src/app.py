@@ -5,6 +5,11 @@ import os
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 sys.path.insert(0, project_root)
 
+if __name__ == "__main__" and "--plugin-host" in sys.argv:
+    # 独立运行的插件进程：在导入主程序（AppCentral、QtWidgets 等）之前分流
+    from src.core.plugin.remote import run_plugin_host
+    sys.exit(run_plugin_host(sys.argv))
+
 from src.core import AppCentral
 from PySide6.QtWidgets import QApplication
 
@@ -1,5 +1,20 @@
 # Local imports
-from .directories import (SRC_PATH, QML_PATH, PLUGINS_PATH, THEMES_PATH, ASSETS_PATH, EXAMPLES_PATH,
-                          CONFIGS_PATH, PATHS, PathManager)
+# 按需导入（PEP 562）：只用到 schedule.model / convertor 等纯数据模块时（如命令行批量转换）不会加载 Qt 与整个应用
+_LAZY = {
+    **{name: ".directories" for name in (
+        "SRC_PATH", "QML_PATH", "PLUGINS_PATH", "THEMES_PATH", "ASSETS_PATH", "EXAMPLES_PATH",
+        "CONFIGS_PATH", "PATHS", "PathManager",
+    )},
+    "AppCentral": ".central",
+}
 
-from .central import AppCentral
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -215,6 +215,7 @@ class AppCentral(QObject):  # Class Widgets 的中枢
     def _load_config(self) -> None:
         """加载和验证配置"""
         self.configs.load_config()
+        self.notification_service.sound_bank.reload()  # 预加载通知音效
 
     def _load_class_swap(self) -> None:
         """加载换课记录，跨天时自动清理"""
@@ -225,7 +226,9 @@ class AppCentral(QObject):  # Class Widgets 的中枢
         self.updated.emit()  # 发送信号
 
     def cleanup(self) -> None:
-        self.configs.save()
+        self.plugin_manager.hosts.shutdown()
+        self.configs.close()
+        self._notification.history.close()
         self.union_update_timer.stop()
         logger.info("Clean up.")
 
@@ -325,7 +328,8 @@ class AppCentral(QObject):  # Class Widgets 的中枢
         self.union_update_timer.tick.connect(self.update)
         self.union_update_timer.tick.connect(self.automation_manager.update)
         self.schedule_manager.scheduleModified.connect(self.runtime.refresh)
-        self._class_swap_manager.updated.connect(self.update)
+        # 换课修改课表时已经通过 scheduleModified 刷新 runtime，这里只需通知界面
+        self._class_swap_manager.updated.connect(self.updated)
 
         self.app_instance.aboutToQuit.connect(self.cleanup)
 
@@ -1,17 +1,63 @@
 import platform
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from PySide6.QtGui import QFontDatabase
 from PySide6.QtWidgets import QApplication
 from loguru import logger
 from pydantic import Field, PrivateAttr
-from PySide6.QtCore import QObject, QTimer, Signal, Property, Slot
+from PySide6.QtCore import QObject, QTimer, Signal, Property, Slot, QThread
 
 from .model import AppConfig, ScheduleConfig, PreferencesConfig, PluginsConfig, LocaleConfig, InteractionsConfig, \
     ConfigBaseModel, NetworkConfig, NotificationsConfig
+from .plugin_store import PluginConfigStore
+from .watcher import ConfigWatcher, read_config
+from .writer import ConfigWriter, ConfigSaveWorker, ConfigConflictError
+from src.core.utils.storage import StorageFormat
 from src import __version__, __version_type__
 
+SAVE_DELAY_MS = 2000  # 变更平息多久后保存
+SAVE_MAX_DELAY_MS = 10000  # 持续变更时最长推迟多久
+SECTIONS_DIR = "settings"
+
+
+def _coalesce_paths(paths: set[str]) -> list[str]:
+    """去掉已被祖先路径覆盖的路径，"" 覆盖全部"""
+    if "" in paths:
+        return [""]
+    result: list[str] = []
+    for path in sorted(paths):
+        if not any(path == kept or path.startswith(kept + ".") for kept in result):
+            result.append(path)
+    return result
+
+
+def _common_path(paths: list[str]) -> str:
+    parts = [p.split(".") for p in paths]
+    common = []
+    for segment in zip(*parts):
+        if len(set(segment)) != 1:
+            break
+        common.append(segment[0])
+    return ".".join(common)
+
+
+_MISSING = object()
+
+
+def _diff_paths(old: dict, new: dict, prefix: str = ""):
+    """两份 dump 之间值不同的路径（逐层比较 dict）"""
+    for key in old.keys() | new.keys():
+        a, b = old.get(key, _MISSING), new.get(key, _MISSING)
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(a, dict) and isinstance(b, dict):
+            yield from _diff_paths(a, b, path)
+        elif a != b:
+            yield path
+
 
 class RootConfig(ConfigBaseModel):
     app: AppConfig = Field(default_factory=AppConfig)
@@ -23,40 +69,300 @@ class RootConfig(ConfigBaseModel):
     network: NetworkConfig = Field(default_factory=NetworkConfig)
     notifications: NotificationsConfig = Field(default_factory=NotificationsConfig)
 
-    _on_change: callable = PrivateAttr(default=None)
+    _revision: int = PrivateAttr(default=0)  # 每次变更递增
+    # 每个分区单独保存：分区最后一次变更时的修订号 / 已写入文件的修订号
+    _section_revisions: dict[str, int] = PrivateAttr(default_factory=dict)
+    _saved_revisions: dict[str, int] = PrivateAttr(default_factory=dict)
 
-    def __setattr__(self, name, value):
-        super().__setattr__(name, value)
-        if self._on_change and name != "_on_change":
-            self._on_change()
+    def touch(self, section: str) -> int:
+        """记录分区的一次变更，返回新的修订号"""
+        self._revision += 1
+        self._section_revisions[section] = self._revision
+        return self._revision
+
+    def section_revision(self, section: str) -> int:
+        return self._section_revisions.get(section, 0)
+
+    def mark_saved(self, section: str, revision: int):
+        if revision > self._saved_revisions.get(section, 0):
+            self._saved_revisions[section] = revision
+
+    def is_dirty(self, section: str) -> bool:
+        return self.section_revision(section) > self._saved_revisions.get(section, 0)
+
+    @property
+    def dirty_sections(self) -> list[str]:
+        return [name for name in type(self).model_fields if self.is_dirty(name)]
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.dirty_sections)
+
+
+SECTION_MODELS: dict[str, type[ConfigBaseModel]] = {
+    name: field.annotation for name, field in RootConfig.model_fields.items()
+}
 
 
 # 配置管理器
 class ConfigManager(QObject):
-    configChanged = Signal()
+    configChanged = Signal(str)  # 变更的点分路径，如 "preferences.opacity"；空字符串表示整体变化
+    configBatchChanged = Signal(list)  # 批量修改结束时一次性发出，包含全部变更路径
+    _requestWrite = Signal(object, object, int)  # ConfigWriter, 快照, 修订号 -> 后台写入
 
     def __init__(self, path: Path, filename: str):
         super().__init__()
         self.path = Path(path)
         self.filename = filename
+        # 旧版单文件配置：首次启动时迁移；之后被外部写入（集中下发）时合并到各分区，然后改名为 .bak
         self.full_path = self.path / filename
+        # 每个顶层分区一个文件（settings/preferences.json 等），只重写变化的分区
+        self.sections_path = self.path / SECTIONS_DIR
 
         self._config = RootConfig()
+        # data 属性的缓存：按顶层分区分别缓存 model_dump()，变更时只失效对应分区
+        self._section_dumps: dict[str, dict] = {}
+        self._data_cache: Optional[dict] = None
+        self._batch_depth = 0
+        self._batch_paths: set[str] = set()
         self._bind_nested_on_change(self._config)
 
+        # 变更后防抖保存，序列化与写入在后台线程进行
+        self._writers = {
+            name: ConfigWriter(self.sections_path / f"{name}.json", guard=True) for name in SECTION_MODELS
+        }
+        self._writer_sections = {writer: name for name, writer in self._writers.items()}
+        self._io_thread: Optional[QThread] = None
+        self._save_worker: Optional[ConfigSaveWorker] = None
+        self._dirty_since = 0.0
         self.save_timer = QTimer(self)
-        self.save_timer.setInterval(1000 * 60)  # 1分钟保存一次
-        self.save_timer.timeout.connect(self.save)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self._save_in_background)
+
+        # 插件配置：每个插件一个文件，插件加载时才读取
+        self.plugin_store = PluginConfigStore(self.path / "plugins", self)
+        # 外部修改配置文件后热重载，load_config 之后启动
+        self._watcher: Optional[ConfigWatcher] = None
 
     def _bind_nested_on_change(self, obj):
         """
         递归绑定 _on_change 给所有嵌套的 ConfigBaseModel
         """
-        obj._on_change = lambda: (self.configChanged.emit())
-        for field_name, field in obj.__fields__.items():
-            value = getattr(obj, field_name)
-            if isinstance(value, ConfigBaseModel):
-                self._bind_nested_on_change(value)
+        obj._bind_on_change(self.notify)
+        self._section_dumps.clear()
+        self._data_cache = None
+
+    def notify(self, path: str = "") -> None:
+        """
+        发出 configChanged(path) 并失效对应分区的缓存
+        原地修改 dict / list 等不会触发 _on_change 的情况，需要手动调用
+        """
+        section = path.split(".", 1)[0]
+        if path == "app.storage_format":  # 换格式后所有分区都按新格式重写
+            for name in SECTION_MODELS:
+                self._config.touch(name)
+        if section:
+            self._section_dumps.pop(section, None)
+            self._config.touch(section)
+        else:
+            self._section_dumps.clear()
+            for name in SECTION_MODELS:
+                self._config.touch(name)
+        self._data_cache = None
+        if self._batch_depth:
+            self._batch_paths.add(path)
+            return
+        self.request_save()
+        self.configChanged.emit(path)
+
+    @contextmanager
+    def batch(self):
+        """
+        批量修改：期间不发出 configChanged、不触发保存，
+        结束时合并为一次 configChanged（公共路径）+ configBatchChanged（全部路径）；可嵌套
+        """
+        self.beginBatch()
+        try:
+            yield self
+        finally:
+            self.endBatch()
+
+    @Slot()
+    def beginBatch(self) -> None:
+        self._batch_depth += 1
+
+    @Slot()
+    def endBatch(self) -> None:
+        if not self._batch_depth:
+            logger.warning("endBatch() called without beginBatch()")
+            return
+        self._batch_depth -= 1
+        if self._batch_depth or not self._batch_paths:
+            return
+        paths = _coalesce_paths(self._batch_paths)
+        self._batch_paths = set()
+        self.request_save()
+        self.configChanged.emit(_common_path(paths))
+        self.configBatchChanged.emit(paths)
+
+    def request_save(self) -> None:
+        """在变更平息 SAVE_DELAY_MS 后保存；持续变更时最多推迟 SAVE_MAX_DELAY_MS"""
+        now = time.monotonic()
+        if not self.save_timer.isActive():
+            self._dirty_since = now
+            self.save_timer.start()
+        elif (now - self._dirty_since) * 1000 < SAVE_MAX_DELAY_MS:
+            self.save_timer.start()  # 重新计时
+
+    def write_in_background(self, writer: ConfigWriter, snapshot: dict, revision: int):
+        """交给后台写入线程；snapshot 之后不能再被修改"""
+        writer.format = self.storage_format
+        if self._save_worker is None:
+            self._save_worker = ConfigSaveWorker()
+            self._save_worker.moveToThread(self._ensure_io_thread())
+            self._requestWrite.connect(self._save_worker.write)
+            self._save_worker.saved.connect(self._on_written)
+            self._save_worker.conflicted.connect(self._on_write_conflict)
+            self._save_worker.failed.connect(
+                lambda w, msg: logger.error(f"Save config failed: {w.path.name}: {msg}"))
+        self._requestWrite.emit(writer, snapshot, revision)
+
+    def _ensure_io_thread(self) -> QThread:
+        """配置读写共用的后台线程，读写按提交顺序依次执行"""
+        if self._io_thread is None:
+            self._io_thread = QThread()
+            self._io_thread.start()
+        return self._io_thread
+
+    def _save_in_background(self):
+        # 分区 dump 的缓存只会被整体替换、不会原地修改，可以直接交给后台线程
+        for name in self._config.dirty_sections:
+            self.write_in_background(self._writers[name], self.section_dump(name),
+                                     self._config.section_revision(name))
+
+    def _on_written(self, writer: ConfigWriter, revision: int):
+        section = self._writer_sections.get(writer)
+        if section is not None:
+            self._config.mark_saved(section, revision)
+            logger.debug(f"Config section {section} saved in background (revision {revision})")
+        else:
+            self.plugin_store.on_written(writer, revision)
+
+    # ── 热重载 ─────────────────────────────────────────────
+
+    def _start_watcher(self):
+        if self._watcher is not None:
+            return
+        self._watcher = ConfigWatcher(self._writers, SECTION_MODELS, self._ensure_io_thread(), self,
+                                      legacy=(self.full_path, RootConfig))
+        self._watcher.loaded.connect(self._apply_external)
+        self._watcher.failed.connect(self._on_external_invalid)
+        self._watcher.legacyLoaded.connect(self._apply_legacy)
+        self._watcher.legacyFailed.connect(
+            lambda error: logger.warning(f"Ignored invalid {self.filename}: {error}")
+        )
+
+    def _on_write_conflict(self, writer: ConfigWriter, revision: int):
+        # 先合并外部修改，合并后仍有未保存的本地变更会再次保存
+        logger.warning(f"{writer.path.name} was modified externally, merging before save")
+        if self._watcher is not None:
+            self._watcher.reload()
+        else:
+            self._reload_from_disk(self._writer_sections[writer])
+            self.request_save()
+
+    def _on_external_invalid(self, section: str, error: str, digest: str):
+        """外部写入的文件无效：保留当前配置，并在稍后用它覆盖该文件"""
+        writer = self._writers[section]
+        logger.warning(f"Ignored invalid external change of {writer.path.name}: {error}")
+        writer.adopt(writer.snapshot, digest)
+        self._config.touch(section)  # 视为一次新的变更
+        self.request_save()
+
+    def _model_path(self, path: str) -> str:
+        """截到最深的模型字段：dict / list 等字段整体替换"""
+        obj, parts = self._config, []
+        for key in path.split("."):
+            if not isinstance(obj, ConfigBaseModel) or key not in type(obj).model_fields:
+                break
+            parts.append(key)
+            obj = getattr(obj, key)
+        return ".".join(parts)
+
+    def _apply_external(self, section: str, config: ConfigBaseModel, digest: str):
+        """
+        应用外部修改：与上次读写的分区文件内容比较，只把变化的路径设置到当前配置上
+        冲突规则：同一路径以文件为准；其他路径上未保存的本地修改保留，随后写回文件
+        """
+        writer = self._writers[section]
+        dump = config.model_dump()
+        changed = _diff_paths(writer.snapshot or {}, dump, section)
+        paths = _coalesce_paths({p for p in map(self._model_path, changed) if p})
+        writer.adopt(dump, digest)
+        if not paths:
+            return
+
+        had_local_changes = self._config.is_dirty(section)
+        self._set_paths(section, config, paths)
+        if not had_local_changes:  # 当前分区与文件一致，无需写回
+            self._config.mark_saved(section, self._config.section_revision(section))
+        logger.info(f"Applied external change of {writer.path.name}: {', '.join(paths)}")
+
+    def _set_paths(self, section: str, config: ConfigBaseModel, paths: list[str]):
+        with self.batch():
+            for path in paths:
+                _, *parents, key = path.split(".")
+                target, source = getattr(self._config, section), config
+                for k in parents:
+                    target, source = getattr(target, k), getattr(source, k)
+                setattr(target, key, getattr(source, key))
+
+    def _apply_legacy(self, config: RootConfig):
+        """
+        应用外部写入的旧版 configs.json（集中下发的工具可能仍写这个文件）：
+        与当前配置不同的路径以该文件为准，写入各分区文件后把它改名为 .bak，避免重复应用
+        """
+        applied = []
+        with self.batch():
+            for section in SECTION_MODELS:
+                source = getattr(config, section)
+                changed = _diff_paths(self.section_dump(section), source.model_dump(), section)
+                paths = _coalesce_paths({p for p in map(self._model_path, changed) if p})
+                self._set_paths(section, source, paths)
+                applied += paths
+            self._ensure_defaults()
+        self.save()
+        try:
+            self.full_path.replace(self.full_path.with_name(f"{self.filename}.bak"))
+        except OSError as e:
+            logger.warning(f"Failed to move {self.filename} aside after applying it: {e}")
+        logger.info(f"Applied {self.filename} to {self.sections_path}: {', '.join(applied) or 'no changes'}")
+
+    def _reload_legacy(self):
+        """启动时发现旧版 configs.json（已有分区文件，说明是之后下发的）"""
+        try:
+            config, _, error = read_config(self.full_path, RootConfig)
+        except OSError as e:
+            config, error = None, str(e)
+        if error:
+            logger.warning(f"Ignored invalid {self.filename}: {error}")
+            return
+        self._apply_legacy(config)
+
+    def _reload_from_disk(self, section: str):
+        """同步读取并合并单个分区的外部修改"""
+        writer = self._writers[section]
+        try:
+            config, digest, error = read_config(writer.path, SECTION_MODELS[section])
+        except FileNotFoundError:
+            return
+        if digest == writer.digest:
+            return
+        if error:
+            self._on_external_invalid(section, error, digest)
+        else:
+            self._apply_external(section, config, digest)
 
     def _ensure_defaults(self):
         """确保在 QApplication 存在时，填充"""
@@ -91,32 +397,113 @@ class ConfigManager(QObject):
 
         for day in outdated_reschedule_days:
             self._config.schedule.reschedule_day.pop(day)
+        if outdated_reschedule_days:
+            self.notify("schedule.reschedule_day")
 
         logger.info(f"Cleaned useless configs.")
 
-    def load_config(self):
-        if self.full_path.exists():
+    def _load_legacy(self) -> RootConfig:
+        """读取旧版单文件 configs.json，迁移后所有分区都需要写出"""
+        config = RootConfig.model_validate_json(self.full_path.read_bytes())
+        logger.info(f"Migrating {self.filename} to per-section files in {self.sections_path}")
+        return config
+
+    def _load_sections(self) -> tuple[RootConfig, list[str]]:
+        """逐个读取分区文件；缺失或损坏的分区使用默认值，不影响其他分区"""
+        sections, missing = {}, []
+        for name, writer in self._writers.items():
+            if not writer.path.exists():
+                missing.append(name)
+                continue
             try:
-                data = self.full_path.read_text(encoding="utf-8")
-                self._config = RootConfig.model_validate_json(data)
-
-                self._bind_nested_on_change(self._config)
-                self._ensure_defaults()
-                self._clean_useless_configs()
-                title = "{:#^80s}".format(f" Class Widgets {__version__}-{__version_type__} ")
-                logger.info(f"{title} \nloaded config: {self.full_path}")
-            except Exception as e:
-                logger.warning(f"Load config failed: {e}, use default config")
-        self.save()
+                config, digest, error = read_config(writer.path, SECTION_MODELS[name])
+            except OSError as e:
+                config, error = None, str(e)
+            if error:
+                backup = writer.path.with_name(f"{writer.path.name}.bak")
+                logger.warning(f"Load config section {name} failed: {error}, use default (backup: {backup.name})")
+                writer.path.replace(backup)
+                missing.append(name)
+                continue
+            sections[name] = config
+            writer.adopt(config.model_dump(), digest)
+        return RootConfig(**sections), missing
 
-    def save(self, silent=False):
+    def load_config(self):
+        previous = self._config
+        migrate = not any(w.path.exists() for w in self._writers.values()) and self.full_path.exists()
         try:
-            self.path.mkdir(parents=True, exist_ok=True)
-            self.full_path.write_text(self._config.model_dump_json(indent=4), encoding="utf-8")
-            if not silent:
-                logger.success(f"Save config success: {self.full_path}")
+            if migrate:
+                config, missing = self._load_legacy(), list(SECTION_MODELS)
+            else:
+                config, missing = self._load_sections()
         except Exception as e:
-            logger.error(f"Save config failed: {e}")
+            logger.warning(f"Load config failed: {e}, use default config")
+            config, missing = RootConfig(), list(SECTION_MODELS)
+
+        self._config = config
+        # 修订号延续，刚读入的分区与文件一致；缺失的分区需要写出
+        self._config._revision = previous._revision
+        for name in missing:
+            self._config.touch(name)
+        self._bind_nested_on_change(self._config)
+        with self.batch():
+            self._ensure_defaults()
+            self._clean_useless_configs()
+        title = "{:#^80s}".format(f" Class Widgets {__version__}-{__version_type__} ")
+        logger.info(f"{title} \nloaded config: {self.sections_path}")
+
+        self.save()
+        if migrate and not self._config.dirty:
+            self.full_path.replace(self.full_path.with_name(f"{self.filename}.bak"))
+        elif not migrate and self.full_path.exists():
+            self._reload_legacy()
+        self._start_watcher()
+
+    def _save_section(self, name: str):
+        writer, revision = self._writers[name], self._config.section_revision(name)
+        writer.format = self.storage_format
+        try:
+            writer.write(self.section_dump(name), revision)
+        except ConfigConflictError:
+            # 先合并外部修改再写入，避免覆盖掉下发的配置
+            self._reload_from_disk(name)
+            revision = self._config.section_revision(name)
+            writer.write(self.section_dump(name), revision, force=True)
+        self._config.mark_saved(name, revision)
+
+    def save(self, silent=False):
+        """立即保存（同步）；只写入有变化的分区"""
+        self.save_timer.stop()
+        saved = []
+        for name in self._config.dirty_sections:
+            try:
+                self._save_section(name)
+                saved.append(name)
+            except Exception as e:
+                logger.error(f"Save config section {name} failed: {e}")
+        if saved and not silent:
+            logger.success(f"Save config success: {self.sections_path} ({', '.join(saved)})")
+
+    def close(self):
+        """退出时保存未写入的变更并停止后台读写线程"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self.save()
+        self.plugin_store.flush()
+        if self._io_thread is not None:
+            self._io_thread.quit()
+            self._io_thread.wait()
+            if self._save_worker is not None:
+                self._save_worker.deleteLater()
+            self._io_thread.deleteLater()
+            self._io_thread = None
+            self._save_worker = None
+
+    @property
+    def storage_format(self) -> StorageFormat:
+        return StorageFormat(self._config.app.storage_format)
 
     def __getattr__(self, name: str):
         """代理属性获取"""
@@ -125,9 +512,19 @@ class ConfigManager(QObject):
 
         return getattr(self._config, name)
 
+    def section_dump(self, section: str) -> dict:
+        """单个顶层分区的 model_dump()（缓存，调用方只读）"""
+        dump = self._section_dumps.get(section)
+        if dump is None:
+            dump = self._section_dumps[section] = getattr(self._config, section).model_dump()
+        return dump
+
     @Property('QVariant', notify=configChanged)
     def data(self):
-        return self._config.model_dump()  # 整个配置转 dict
+        # 整个配置转 dict；未变化的分区复用缓存，读取之间没有变更时直接返回上次的结果
+        if self._data_cache is None:
+            self._data_cache = {name: self.section_dump(name) for name in RootConfig.model_fields}
+        return self._data_cache
 
     @Slot(str, "QVariant")
     def set(self, key: str, value) -> None:
@@ -138,46 +535,34 @@ class ConfigManager(QObject):
 
         last_key = keys[-1]
 
-        # 如果最后一级是 dict，就赋值到 dict 的键
+        # 如果最后一级是 dict，就赋值到 dict 的键（不会触发 _on_change，需要手动通知）
         if isinstance(cfg, dict):
             cfg[last_key] = value
+            self.notify(key)
+        elif isinstance(cfg, ConfigBaseModel) and cfg._on_change:
+            setattr(cfg, last_key, value)  # 由 _on_change 通知
         else:
             setattr(cfg, last_key, value)
-
-        self._config._on_change()
-        self.configChanged.emit()
+            self.notify(key)
 
     @Slot(str, str, "QVariant")
     def setPlugin(self, plugin_id: str, key: str, value) -> None:
-        """设置插件配置（同时更新运行时模型）"""
-        # 先更新 dict 存储
-        plugin_cfg: dict = self._config.plugins.configs.get(plugin_id)
-        if plugin_cfg is None:
-            plugin_cfg = {}
-            self._config.plugins.configs[plugin_id] = plugin_cfg
-
-        # 更新 dict
-        keys = key.split(".")
-        cfg = plugin_cfg
-        for k in keys[:-1]:
-            if k not in cfg or not isinstance(cfg[k], dict):
-                cfg[k] = {}
-            cfg = cfg[k]
-
-        cfg[keys[-1]] = value
-
-        # 如果存在运行时模型，同步更新
-        if hasattr(self, '_api') and hasattr(self._api, '_plugin_models'):
-            model = self._api._plugin_models.get(plugin_id)
-            if model:
-                try:
-                    # 使用 setattr 设置值，会触发模型的 _on_change
-                    obj = model
-                    for k in keys[:-1]:
-                        obj = getattr(obj, k)
-                    setattr(obj, keys[-1], value)
-                except Exception as e:
-                    logger.error(f"Failed to update runtime model for {plugin_id}: {e}")
-
-        self._config._on_change()
-        self.configChanged.emit()
+        """设置插件配置（同时更新运行时模型）；只写插件自己的配置文件，不影响主配置"""
+        model = self.plugin_store.model(plugin_id)
+        if model is not None:
+            try:
+                # 使用 setattr 设置值，由模型的 _on_change 同步回存储
+                obj = model
+                keys = key.split(".")
+                for k in keys[:-1]:
+                    obj = getattr(obj, k)
+                setattr(obj, keys[-1], value)
+                return
+            except Exception as e:
+                logger.error(f"Failed to update runtime model for {plugin_id}: {e}")
+        self.plugin_store.update(plugin_id, key, value)
+
+    @Slot(str, result="QVariant")
+    def getPlugin(self, plugin_id: str):
+        """读取插件配置（首次访问时才加载）"""
+        return self.plugin_store.get(plugin_id)
@@ -10,6 +10,7 @@ from PySide6.QtCore import QLocale, QCoreApplication, Property
 from ..directories import DEFAULT_THEME
 from src import __version__, __version_type__
 from ..notification import NotificationProviderConfig
+from ..utils.storage import StorageFormat
 
 type JsonScalar = Optional[str | int | float | bool]
 type JsonData = JsonScalar | dict[str, "JsonData"] | list["JsonData"]
@@ -21,8 +22,13 @@ GITHUB_MIRRORS: dict[str, str] = {
 }
 
 
+def _child_callback(callback: Callable[[str], None], name: str) -> Callable[[str], None]:
+    return lambda path="": callback(f"{name}.{path}" if path else name)
+
+
 class ConfigBaseModel(BaseModel):
-    _on_change: Optional[Callable[[], None]] = PrivateAttr(default=None)
+    # 变更回调，参数为相对当前模型的点分路径（如 "opacity"、"hide.state"）
+    _on_change: Optional[Callable[[str], None]] = PrivateAttr(default=None)
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -30,12 +36,21 @@ class ConfigBaseModel(BaseModel):
             if isinstance(value, ConfigBaseModel):
                 value._on_change = self._on_change
 
+    def _bind_on_change(self, callback: Optional[Callable[[str], None]]):
+        """递归绑定变更回调，嵌套模型的回调会带上自己的字段名"""
+        self._on_change = callback
+        for name, value in self.__dict__.items():
+            if isinstance(value, ConfigBaseModel):
+                value._bind_on_change(_child_callback(callback, name) if callback else None)
+
     def __setattr__(self, name, value):  # 实时发送更新信号
         super().__setattr__(name, value)
+        if name.startswith("_"):  # 私有属性不是配置内容
+            return
         if isinstance(value, ConfigBaseModel):
-            value._on_change = self._on_change
-        if self._on_change and name != "_on_change":
-            self._on_change()
+            value._bind_on_change(_child_callback(self._on_change, name) if self._on_change else None)
+        if self._on_change:
+            self._on_change(name)
 
 
 class LayoutAnchor(str, Enum):
@@ -92,6 +107,11 @@ class AppConfig(ConfigBaseModel):
     channel: str = __version_type__
     tutorial_completed: bool = False  # 是否完成初始化
     auto_startup: bool = False  # 开机自启
+    storage_format: StorageFormat = StorageFormat.PRETTY  # 课表与配置文件的存储格式
+
+    class Config:
+        use_enum_values = True
+        validate_assignment = True
 
 
 class PreferencesConfig(ConfigBaseModel):
@@ -141,9 +161,20 @@ class InteractionsConfig(ConfigBaseModel):
 
 class PluginsConfig(ConfigBaseModel):
     enabled: list[str] = ["builtin.classwidgets.widgets"]
+    isolated: list[str] = []  # 在独立进程中运行的外部插件
     configs: dict[str, dict[str, JsonData]] = Field(default_factory=dict)
 
 
+class ScheduleSnapshotsConfig(ConfigBaseModel):
+    """
+    课程表快照（保存 / 导入 / 换课前自动记录）
+    """
+    enabled: bool = True
+    keep_recent: int = 20  # 最近 N 个
+    keep_daily: int = 30  # N 天内每天一个
+    keep_weekly: int = 26  # N 周内每周一个
+
+
 class ScheduleConfig(ConfigBaseModel):
     current_schedule: str = QCoreApplication.translate("Configs", "New Schedule 1")
     preparation_time: int = 2  # min
@@ -151,6 +182,9 @@ class ScheduleConfig(ConfigBaseModel):
     time_offset: int = 0  # 时差偏移
     reschedule_day: dict[str, JsonData] = Field(default_factory=dict)  # 调整日程
     class_swap: dict[str, JsonData] = Field(default_factory=dict)  # 临时换课记录
+    snapshots: ScheduleSnapshotsConfig = Field(default_factory=ScheduleSnapshotsConfig)  # 快照
+    compact_on_save: bool = False  # 保存时压缩 override（在 GUI 线程执行，默认关闭；可用 compactOverrides 手动压缩）
+    ics_export_weeks: int = 20  # 导出 iCalendar 时从开学日起的周数
 
 
 class NetworkConfig(ConfigBaseModel):
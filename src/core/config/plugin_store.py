@@ -0,0 +1,164 @@
+"""
+插件配置存储
+
+每个插件的配置保存在 configs/plugins/<插件 ID>.json，插件加载（注册配置模型）时才读取，
+未启用的插件启动时没有任何开销。每个插件独立记录修订号、防抖写入，不会触发主配置的序列化。
+旧版本保存在主配置 plugins.configs 中的配置会在首次读取时迁移过来。
+"""
+from __future__ import annotations
+
+import copy
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from loguru import logger
+from pydantic_core import to_jsonable_python
+
+from .writer import ConfigWriter
+
+if TYPE_CHECKING:
+    from .manager import ConfigManager
+    from .model import ConfigBaseModel
+
+SAVE_DELAY_MS = 2000
+SAVE_MAX_DELAY_MS = 10000
+
+
+def _filename(plugin_id: str) -> str:
+    return re.sub(r'[\\/:*?"<>|]+', "_", plugin_id) + ".json"
+
+
+@dataclass
+class _PluginEntry:
+    data: dict
+    writer: ConfigWriter
+    timer: QTimer
+    revision: int = 0
+    saved_revision: int = 0
+    dirty_since: float = 0.0
+    model: Optional["ConfigBaseModel"] = None
+
+    @property
+    def dirty(self) -> bool:
+        return self.revision != self.saved_revision
+
+
+class PluginConfigStore(QObject):
+    changed = Signal(str, str)  # 插件 ID, 点分路径（空字符串表示整体）
+
+    def __init__(self, directory: Path, config_manager: "ConfigManager"):
+        super().__init__()
+        self.directory = Path(directory)
+        self._cm = config_manager
+        self._entries: dict[str, _PluginEntry] = {}
+
+    # ── 读取 ─────────────────────────────────────────────
+
+    def is_loaded(self, plugin_id: str) -> bool:
+        return plugin_id in self._entries
+
+    def _entry(self, plugin_id: str) -> _PluginEntry:
+        entry = self._entries.get(plugin_id)
+        if entry is not None:
+            return entry
+
+        path = self.directory / _filename(plugin_id)
+        data, migrated = {}, False
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if not isinstance(data, dict):
+                    raise ValueError("plugin config must be a JSON object")
+            except Exception as e:
+                logger.warning(f"Load plugin config failed for {plugin_id}: {e}, use defaults")
+                data = {}
+        else:
+            legacy = self._cm.plugins.configs
+            if plugin_id in legacy:
+                data, migrated = copy.deepcopy(legacy[plugin_id]), True
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(SAVE_DELAY_MS)
+        entry = self._entries[plugin_id] = _PluginEntry(data=data, writer=ConfigWriter(path), timer=timer)
+        timer.timeout.connect(lambda: self._save_in_background(entry))
+
+        if migrated:
+            entry.revision += 1
+            self._save(entry)
+            if entry.saved_revision == entry.revision:
+                self._cm.plugins.configs.pop(plugin_id, None)
+                self._cm.notify("plugins.configs")
+                logger.info(f"Migrated config of plugin {plugin_id} to {path.name}")
+        return entry
+
+    def get(self, plugin_id: str) -> dict:
+        """插件配置（首次访问时读取文件；返回值只读）"""
+        return self._entry(plugin_id).data
+
+    def model(self, plugin_id: str) -> Optional["ConfigBaseModel"]:
+        entry = self._entries.get(plugin_id)
+        return entry.model if entry else None
+
+    def bind_model(self, plugin_id: str, model: "ConfigBaseModel"):
+        self._entry(plugin_id).model = model
+
+    # ── 修改 ─────────────────────────────────────────────
+
+    def replace(self, plugin_id: str, data: dict, path: str = ""):
+        entry = self._entry(plugin_id)
+        entry.data = data
+        self._changed(plugin_id, entry, path)
+
+    def update(self, plugin_id: str, path: str, value):
+        """按点分路径修改单个值，中间缺失的层级自动创建"""
+        entry = self._entry(plugin_id)
+        keys = path.split(".")
+        cfg = entry.data
+        for k in keys[:-1]:
+            if not isinstance(cfg.get(k), dict):
+                cfg[k] = {}
+            cfg = cfg[k]
+        cfg[keys[-1]] = to_jsonable_python(value)
+        self._changed(plugin_id, entry, path)
+
+    def _changed(self, plugin_id: str, entry: _PluginEntry, path: str):
+        entry.revision += 1
+        now = time.monotonic()
+        if not entry.timer.isActive():
+            entry.dirty_since = now
+            entry.timer.start()
+        elif (now - entry.dirty_since) * 1000 < SAVE_MAX_DELAY_MS:
+            entry.timer.start()
+        self.changed.emit(plugin_id, path)
+
+    # ── 写入 ─────────────────────────────────────────────
+
+    def _save_in_background(self, entry: _PluginEntry):
+        if entry.dirty:
+            self._cm.write_in_background(entry.writer, copy.deepcopy(entry.data), entry.revision)
+
+    def _save(self, entry: _PluginEntry):
+        entry.timer.stop()
+        entry.writer.format = self._cm.storage_format
+        try:
+            entry.writer.write(entry.data, entry.revision)
+            self.on_written(entry.writer, entry.revision)
+        except Exception as e:
+            logger.error(f"Save plugin config failed: {entry.writer.path.name}: {e}")
+
+    def on_written(self, writer: ConfigWriter, revision: int):
+        for entry in self._entries.values():
+            if entry.writer is writer and revision > entry.saved_revision:
+                entry.saved_revision = revision
+
+    def flush(self):
+        """同步写入所有未保存的插件配置"""
+        for entry in self._entries.values():
+            if entry.dirty:
+                self._save(entry)
@@ -0,0 +1,130 @@
+"""
+配置文件热重载
+
+监视各分区配置文件的外部修改（如集中下发的配置），防抖后在后台线程读取并验证，
+验证通过的分区交回主线程，由 ConfigManager 只把变化的路径应用到运行中的配置上。
+自己写入的内容通过文件摘要识别，不会被当作外部修改。
+旧版单文件 configs.json 也会被监视：集中下发的工具仍可能写入它，读取后整体交给 ConfigManager 按分区合并。
+"""
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot, QFileSystemWatcher, QThread
+from pydantic import BaseModel
+
+from .writer import ConfigWriter, file_digest
+
+RELOAD_DELAY_MS = 300  # 外部程序往往分多次写入，等文件稳定后再读取
+
+
+def read_config(path: Path, model: type[BaseModel]) -> tuple[Optional[BaseModel], str, Optional[str]]:
+    """读取并验证配置文件，返回 (配置, 文件摘要, 错误信息)"""
+    data = path.read_bytes()
+    digest = file_digest(data)
+    try:
+        return model.model_validate_json(data), digest, None
+    except Exception as e:
+        return None, digest, str(e).splitlines()[0]
+
+
+class ConfigReadWorker(QObject):
+    loaded = Signal(str, object, str)  # 分区, 验证后的配置, 文件摘要
+    failed = Signal(str, str, str)  # 分区, 错误信息, 文件摘要
+    legacyLoaded = Signal(object)  # 验证后的整份旧版配置
+    legacyFailed = Signal(str)  # 错误信息
+
+    def __init__(self, writers: dict[str, ConfigWriter], models: dict[str, type[BaseModel]],
+                 legacy: Optional[tuple[Path, type[BaseModel]]] = None):
+        super().__init__()
+        self._writers = writers
+        self._models = models
+        self._legacy = legacy
+        self._legacy_digest: Optional[str] = None  # 已处理过的旧版文件，无效时不重复报错
+
+    @Slot()
+    def read(self):
+        # 与写入在同一线程排队执行，读取时不会有写到一半的内容
+        for name, writer in self._writers.items():
+            try:
+                config, digest, error = read_config(writer.path, self._models[name])
+            except FileNotFoundError:
+                continue
+            if digest == writer.digest:  # 自己写入的，或内容没有变化
+                continue
+            if error:
+                self.failed.emit(name, error, digest)
+            else:
+                self.loaded.emit(name, config, digest)
+        if self._legacy is not None:
+            self._read_legacy(*self._legacy)
+
+    def _read_legacy(self, path: Path, model: type[BaseModel]):
+        try:
+            config, digest, error = read_config(path, model)
+        except FileNotFoundError:
+            return
+        if digest == self._legacy_digest:
+            return
+        self._legacy_digest = digest
+        if error:
+            self.legacyFailed.emit(error)
+        else:
+            self.legacyLoaded.emit(config)
+
+
+class ConfigWatcher(QObject):
+    """监视配置目录，外部修改后在 io 线程读取验证"""
+    loaded = Signal(str, object, str)
+    failed = Signal(str, str, str)
+    legacyLoaded = Signal(object)
+    legacyFailed = Signal(str)
+    _requestRead = Signal()
+
+    def __init__(self, writers: dict[str, ConfigWriter], models: dict[str, type[BaseModel]],
+                 thread: QThread, parent=None, legacy: Optional[tuple[Path, type[BaseModel]]] = None):
+        super().__init__(parent)
+        self._paths = [writer.path for writer in writers.values()]
+        if legacy is not None:
+            self._paths.append(legacy[0])
+        self._worker = ConfigReadWorker(writers, models, legacy)
+        self._worker.moveToThread(thread)
+        self._requestRead.connect(self._worker.read)
+        self._worker.loaded.connect(self.loaded)
+        self._worker.failed.connect(self.failed)
+        self._worker.legacyLoaded.connect(self.legacyLoaded)
+        self._worker.legacyFailed.connect(self.legacyFailed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(RELOAD_DELAY_MS)
+        self._timer.timeout.connect(self._requestRead)
+
+        # 同时监视目录：原子替换后原文件的监视会失效
+        self._fs = QFileSystemWatcher(self)
+        for directory in {path.parent for path in self._paths}:
+            self._fs.addPath(str(directory))
+        self._watch_files()
+        self._fs.fileChanged.connect(self._on_changed)
+        self._fs.directoryChanged.connect(self._on_changed)
+
+    def _watch_files(self):
+        watched = set(self._fs.files())
+        missing = [str(p) for p in self._paths if str(p) not in watched and p.exists()]
+        if missing:
+            self._fs.addPaths(missing)
+
+    def _on_changed(self, _path: str):
+        self._watch_files()
+        self._timer.start()
+
+    def reload(self):
+        """立即重新读取"""
+        self._timer.stop()
+        self._requestRead.emit()
+
+    def stop(self):
+        self._timer.stop()
+        paths = self._fs.files() + self._fs.directories()
+        if paths:
+            self._fs.removePaths(paths)
+        self._worker.deleteLater()
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from src.core.utils.storage import StorageFormat, encode
+
+
+class ConfigConflictError(Exception):
+    """配置文件在上次读写之后被外部修改"""
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def atomic_write(path: Path, data: bytes):
+    """写入临时文件并 fsync 后原子替换，断电时旧文件或新文件总有一个是完整的"""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if os.name == "posix":  # 同步目录项，确保 rename 本身落盘
+        fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class ConfigWriter:
+    """
+    配置文件写入（线程安全）
+    每次写入带修订号，较旧的快照不会覆盖已经写入的较新内容；
+    guard 为 True 时，文件被外部修改过（与最后一次读写的内容不同）则拒绝覆盖
+    """
+
+    def __init__(self, path: Path, guard: bool = False):
+        self.path = path
+        self.guard = guard
+        self.format = StorageFormat.PRETTY
+        self.written_revision = -1
+        self.digest: Optional[str] = None  # 文件当前内容（最后一次读入或写入）的摘要
+        self.snapshot: Optional[dict] = None  # 与之对应的配置内容
+        self._lock = threading.Lock()
+
+    def adopt(self, snapshot: dict, digest: str):
+        """记录从文件读入的内容"""
+        with self._lock:
+            self.snapshot = snapshot
+            self.digest = digest
+
+    def write(self, snapshot: dict, revision: int, force: bool = False) -> bool:
+        with self._lock:
+            if revision <= self.written_revision:
+                return False
+            if self.guard and not force and self.digest is not None:
+                try:
+                    current = file_digest(self.path.read_bytes())
+                except FileNotFoundError:
+                    current = self.digest
+                if current != self.digest:
+                    raise ConfigConflictError(f"{self.path.name} was modified externally")
+            data = encode(snapshot, self.format)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.path, data)
+            self.written_revision = revision
+            self.digest = file_digest(data)
+            self.snapshot = snapshot
+            return True
+
+
+class ConfigSaveWorker(QObject):
+    """在后台线程序列化并写入配置（主配置与各插件配置共用）"""
+    saved = Signal(object, int)  # ConfigWriter, 修订号
+    failed = Signal(object, str)
+    conflicted = Signal(object, int)  # 文件已被外部修改，未写入
+
+    @Slot(object, object, int)
+    def write(self, writer: ConfigWriter, snapshot: dict, revision: int):
+        try:
+            if writer.write(snapshot, revision):
+                self.saved.emit(writer, revision)
+        except ConfigConflictError:
+            self.conflicted.emit(writer, revision)
+        except Exception as e:
+            self.failed.emit(writer, str(e))
@@ -0,0 +1,5 @@
+import sys
+
+from src.core.convertor.cli import main
+
+sys.exit(main())
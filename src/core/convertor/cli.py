@@ -0,0 +1,172 @@
+"""
+命令行批量转换 CSES YAML <-> CW2 JSON（多进程，不依赖 Qt / GUI）
+
+用法::
+
+    python -m src.core.convertor schedules/ -o converted/               # 按扩展名自动判断方向
+    python -m src.core.convertor a.yaml b.yaml -o out/ --to cw2
+    python -m src.core.convertor cses/ -o out/ -r --jobs 8 --report report.json
+
+有转换失败的文件时退出码为 1。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Literal, Optional
+
+import yaml
+from loguru import logger
+
+from src.core.convertor.converter import ScheduleConverter, YAML_DUMPER
+
+type Target = Literal["cw2", "cses"]
+
+CSES_SUFFIXES = (".yaml", ".yml")
+CW2_SUFFIXES = (".json",)
+
+
+def _source_format(path: Path) -> Optional[Target]:
+    suffix = path.suffix.lower()
+    if suffix in CSES_SUFFIXES:
+        return "cses"
+    if suffix in CW2_SUFFIXES:
+        return "cw2"
+    return None
+
+
+def collect_jobs(inputs: list[Path], output_dir: Path, to: str = "auto",
+                 recursive: bool = False, overwrite: bool = False) -> list[tuple[str, str, str, bool]]:
+    """展开输入文件 / 目录，返回 (源文件, 输出文件, 目标格式, 是否覆盖)"""
+    jobs = []
+    for item in inputs:
+        if item.is_dir():
+            files = sorted(p for p in (item.rglob("*") if recursive else item.iterdir()) if p.is_file())
+            base = item
+        else:
+            files, base = [item], item.parent
+        for path in files:
+            source = _source_format(path)
+            if source is None:
+                continue
+            target = ("cw2" if source == "cses" else "cses") if to == "auto" else to
+            if target == source:
+                continue  # 已经是目标格式
+            suffix = ".json" if target == "cw2" else ".yaml"
+            output = output_dir / path.relative_to(base).with_suffix(suffix)
+            jobs.append((str(path), str(output), target, overwrite))
+    return jobs
+
+
+def convert_file(job: tuple[str, str, str, bool]) -> dict:
+    """转换单个文件（在子进程中执行，参数与返回值均可 pickle）"""
+    source, output, target, overwrite = job
+    result = {"source": source, "output": output, "target": target, "status": "ok", "error": None,
+              "ms": 0.0, "subjects": 0, "days": 0}
+    start = time.perf_counter()
+    output_path = Path(output)
+    try:
+        if output_path.exists() and not overwrite:
+            result["status"] = "skipped"
+            result["error"] = "output exists"
+            return result
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if target == "cw2":
+            schedule = ScheduleConverter.from_cses(source).to_schedule()
+            ScheduleConverter.from_schedule(schedule)  # 校验输出
+            data = schedule.model_dump(mode="json")
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            result["subjects"], result["days"] = len(schedule.subjects), len(schedule.days)
+        else:
+            cses = ScheduleConverter.from_cw2(source).to_cses_dict()
+            ScheduleConverter.from_cses_data(cses)  # 校验输出
+            with open(output_path, "w", encoding="utf-8") as f:
+                yaml.dump(cses, f, Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False)
+            result["subjects"], result["days"] = len(cses["subjects"]), len(cses["schedules"])
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+    finally:
+        result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def _setup_logging(verbose: bool):
+    logger.remove()
+    if verbose:
+        logger.add(sys.stderr, level="DEBUG")
+
+
+def run(jobs: list[tuple[str, str, str, bool]], workers: int, verbose: bool = False) -> list[dict]:
+    if workers <= 1 or len(jobs) <= 1:
+        return [convert_file(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_logging, initargs=(verbose,)) as pool:
+        return list(pool.map(convert_file, jobs, chunksize=chunksize))
+
+
+def summarize(results: list[dict], seconds: float, workers: int) -> dict:
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("ok", "skipped", "failed")}
+    return {
+        "files": len(results),
+        **counts,
+        "seconds": round(seconds, 3),
+        "workers": workers,
+        "yaml_backend": "libyaml" if YAML_DUMPER is not yaml.SafeDumper else "python",
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.convertor",
+        description="Batch convert CSES YAML <-> Class Widgets 2 JSON schedules",
+    )
+    parser.add_argument("inputs", nargs="+", type=Path, help="files or directories to convert")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output directory")
+    parser.add_argument("--to", choices=("auto", "cw2", "cses"), default="auto",
+                        help="target format (auto: .yaml -> cw2, .json -> cses)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="descend into sub-directories")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--overwrite", action="store_true", help="replace existing output files")
+    parser.add_argument("--report", type=Path, help="write a JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep converter logging")
+    args = parser.parse_args(argv)
+
+    _setup_logging(args.verbose)
+    for item in args.inputs:
+        if not item.exists():
+            parser.error(f"no such file or directory: {item}")
+
+    jobs = collect_jobs(args.inputs, args.output, args.to, args.recursive, args.overwrite)
+    workers = max(1, min(args.jobs, len(jobs)))
+    start = time.perf_counter()
+    results = run(jobs, workers, args.verbose)
+    summary = summarize(results, time.perf_counter() - start, workers)
+
+    for r in results:
+        if r["status"] == "failed":
+            print(f"FAILED  {r['source']}: {r['error']}", file=sys.stderr)
+    print(
+        f"{summary['files']} file(s): {summary['ok']} converted, {summary['skipped']} skipped, "
+        f"{summary['failed']} failed in {summary['seconds']:.2f}s "
+        f"({summary['workers']} worker(s), {summary['yaml_backend']} YAML)"
+    )
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        report = {"timestamp": datetime.now().isoformat(timespec="seconds"), "summary": summary, "files": results}
+        args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import calendar
 import json
 from collections import defaultdict
 
@@ -6,10 +7,13 @@ from pathlib import Path
 from datetime import date, datetime
 from typing import Optional, TYPE_CHECKING
 
-from PySide6.QtCore import QLocale
-from PySide6.QtWidgets import QApplication
 from loguru import logger
 
+try:  # 命令行批量转换时可以不依赖 Qt
+    from PySide6.QtCore import QLocale, QCoreApplication
+except ImportError:
+    QLocale = QCoreApplication = None
+
 from src import __SCHEDULE_SCHEMA_VERSION__, __CSES_SCHEMA_VERSION__
 from src.core.schedule.model import (
     ScheduleData,
@@ -21,20 +25,30 @@ from src.core.schedule.model import (
 )
 from src.core.utils import generate_id
 
+# 有 libyaml 时使用 C 实现，大文件解析 / 输出快一个数量级
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _translate(context: str, text: str) -> str:
+    if QCoreApplication is None:
+        return text
+    return QCoreApplication.translate(context, text)
+
 
 class ScheduleConverter:
     """
     Universal timetable converter (with validation)
     """
 
-    def __init__(self, data: dict, source_format: str):
+    def __init__(self, data: Optional[dict], source_format: str, schedule: Optional[ScheduleData] = None):
         self.data = data
         self.source_format = source_format  # 'cses' or 'cw2'
-        self.schedule: Optional[ScheduleData] = None
+        self.schedule: Optional[ScheduleData] = schedule
 
         self._validate()  # run validation
 
-        if source_format == "cw2":
+        if source_format == "cw2" and self.schedule is None:
             self.schedule = ScheduleData.model_validate(data)
 
     @staticmethod
@@ -53,17 +67,19 @@ class ScheduleConverter:
 
     @staticmethod
     def get_localized_day_name(dow: int) -> str:
+        if QLocale is None:
+            return calendar.day_name[(dow - 1) % 7]
         locale = QLocale()
         return locale.dayName(dow, QLocale.FormatType.LongFormat)
 
     @staticmethod
     def get_localized_week_label(week_str: str) -> str:
         if week_str == "all":
-            return QApplication.translate("Schedule", "All Weeks")
+            return _translate("Schedule", "All Weeks")
         elif week_str == "odd":
-            return QApplication.translate("Schedule", "Odd Weeks")
+            return _translate("Schedule", "Odd Weeks")
         elif week_str == "even":
-            return QApplication.translate("Schedule", "Even Weeks")
+            return _translate("Schedule", "Even Weeks")
         else:
             return week_str
 
@@ -72,7 +88,7 @@ class ScheduleConverter:
     def from_cses(cls, path: str | Path) -> "ScheduleConverter":
         try:
             with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=YAML_LOADER)
             return cls(data, "cses")
         except FileNotFoundError:
             logger.error(f"CSES file not found: {path}")
@@ -84,6 +100,18 @@ class ScheduleConverter:
             logger.error(f"Unexpected error loading CSES: {e}")
             raise
 
+    @classmethod
+    def from_cses_data(cls, data: dict) -> "ScheduleConverter":
+        """已解析的 CSES 数据（dict）"""
+        if not isinstance(data, dict):
+            raise ValueError("CSES data must be a mapping")
+        return cls(data, "cses")
+
+    @classmethod
+    def from_schedule(cls, schedule: ScheduleData) -> "ScheduleConverter":
+        """内存中的 CW2 课表，不经过文件"""
+        return cls(None, "cw2", schedule)
+
     @classmethod
     def from_cw2(cls, path: str | Path) -> "ScheduleConverter":
         try:
@@ -112,6 +140,9 @@ class ScheduleConverter:
                 raise ValueError(f"CSES data is missing required keys: {missing}")
             if self.data.get("version") != __CSES_SCHEMA_VERSION__:
                 raise ValueError(f"CSES schema version not supported: {self.data.get('version')}")
+        elif self.source_format == "cw2" and self.schedule is not None:
+            if self.schedule.meta.version != __SCHEDULE_SCHEMA_VERSION__:
+                raise ValueError(f"CW2 schema version not supported: {self.schedule.meta.version}")
         elif self.source_format == "cw2":
             if "meta" not in self.data or "version" not in self.data["meta"]:
                 raise ValueError("CW2 data missing 'meta' or 'version'")
@@ -248,7 +279,7 @@ class ScheduleConverter:
                     subj_name = (
                         subjects_map.get(entry.subjectId).name
                         if entry.subjectId and entry.subjectId in subjects_map
-                        else QApplication.translate("ScheduleConverter", "Class")
+                        else _translate("ScheduleConverter", "Class")
                     )
                     base_classes.append({
                         "subject": subj_name,
@@ -321,13 +352,26 @@ class ScheduleConverter:
             "schedules": schedules
         }
 
+    # In-memory
+    def to_schedule(self) -> ScheduleData:
+        """转换为 CW2 课表对象"""
+        if self.source_format == "cw2":
+            return self.schedule
+        return self._convert_cses_to_cw2()
+
+    def to_cses_dict(self) -> dict:
+        """转换为 CSES 数据（可直接 yaml.safe_dump）"""
+        if self.source_format != "cw2":
+            raise ValueError("Current data is not in CW2 format, cannot export to CSES.")
+        return self._convert_cw2_to_cses()
+
     # Export
     def to_cw2(self, output: str | Path) -> Path:
         if self.source_format != "cses":
             raise ValueError("Current data is not in CSES format, cannot export to CW2.")
         output = Path(output)
         try:
-            schedule = self._convert_cses_to_cw2()
+            schedule = self.to_schedule()
             with open(output, "w", encoding="utf-8") as f:
                 json.dump(schedule.model_dump(), f, ensure_ascii=False, indent=2)
             logger.info(f"Converted to CW2 JSON: {output}")
@@ -341,18 +385,11 @@ class ScheduleConverter:
             raise ValueError("Current data is not in CW2 format, cannot export to CSES.")
         output = Path(output)
         try:
-            cses = self._convert_cw2_to_cses()
+            cses = self.to_cses_dict()
             with open(output, "w", encoding="utf-8") as f:
-                yaml.safe_dump(cses, f, allow_unicode=True, sort_keys=False)
+                yaml.dump(cses, f, Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False)
             logger.info(f"Converted to CSES YAML: {output}")
             return output
         except Exception as e:
             logger.error(f"Failed to export to CSES: {e}")
             raise
-
-
-if __name__ == "__main__":
-    from src.core.directories import SCHEDULES_PATH
-    ScheduleConverter.from_cw2(Path(SCHEDULES_PATH / "default.json")).to_cses(Path(SCHEDULES_PATH / "New Schedule 1.yaml"))
-    # ScheduleConverter.from_cses(Path(SCHEDULES_PATH / "New Schedule 1.yaml")).to_cw2(Path(SCHEDULES_PATH / "New Schedule 1w.json"))
-
@@ -0,0 +1,411 @@
+"""
+总课表 CSV 批量导入：按班级拆分为独立的 CW2 课表
+
+CSV 每行一节课，列为 class, weekday, period, start, end, subject, teacher, room（可选 weeks: all/odd/even），
+表头也可以使用中文（班级、星期、节次、开始、结束、科目、教师、教室、单双周）。
+
+- 逐行流式读取，不保留原始行；每个班级只保存去重后的科目表和 (星期, 单双周, 节次) -> 课程
+- 输入按班级分组（--grouped）时，一个班级读完即交给进程池写出，内存只与单个班级的大小有关
+- 每个班级先组装成 CSES 数据，再经 ScheduleConverter 校验并转换为 CW2
+- 某天同时有每周和单双周的课时，每周的课并入单周、双周两天；同一天时间重叠的课被丢弃并记入报告
+
+用法::
+
+    python -m src.core.convertor.csv_import master.csv -o schedules/ --start-date 2025-09-01
+    python -m src.core.convertor.csv_import master.csv -o out/ --grouped --jobs 8 --report report.json
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from loguru import logger
+
+from src import __CSES_SCHEMA_VERSION__
+from src.core.convertor.converter import ScheduleConverter
+
+COLUMNS = {
+    "class": ("class", "class_name", "班级", "班级名称"),
+    "weekday": ("weekday", "day", "day_of_week", "星期", "周几"),
+    "period": ("period", "lesson", "节次", "第几节"),
+    "start": ("start", "start_time", "开始", "开始时间"),
+    "end": ("end", "end_time", "结束", "结束时间"),
+    "subject": ("subject", "科目", "课程"),
+    "teacher": ("teacher", "教师", "老师", "任课教师"),
+    "room": ("room", "location", "教室", "地点"),
+    "weeks": ("weeks", "week", "单双周"),
+}
+REQUIRED = ("class", "weekday", "start", "end", "subject")
+
+WEEKDAYS = {
+    "mon": 1, "monday": 1, "tue": 2, "tuesday": 2, "wed": 3, "wednesday": 3, "thu": 4, "thursday": 4,
+    "fri": 5, "friday": 5, "sat": 6, "saturday": 6, "sun": 7, "sunday": 7,
+    "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "日": 7, "天": 7, "七": 7,
+}
+WEEKS = {"": "all", "all": "all", "全部": "all", "每周": "all", "odd": "odd", "单": "odd", "单周": "odd",
+         "even": "even", "双": "even", "双周": "even"}
+MAX_ERRORS = 20  # 每个班级 / 全局最多保留的错误信息条数
+
+
+class RowError(ValueError):
+    pass
+
+
+def _weekday(value: str) -> int:
+    value = value.strip().lower()
+    if value.isdigit() and 1 <= int(value) <= 7:
+        return int(value)
+    value = re.sub(r"^(星期|周|礼拜)", "", value)
+    if value in WEEKDAYS:
+        return WEEKDAYS[value]
+    raise RowError(f"invalid weekday '{value}'")
+
+
+def _time(value: str) -> str:
+    """统一为 CSES 的 HH:MM:SS"""
+    value = value.strip().replace("：", ":")
+    for fmt in ("%H:%M", "%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%H:%M:%S")
+        except ValueError:
+            continue
+    raise RowError(f"invalid time '{value}'")
+
+
+def _safe_filename(name: str) -> str:
+    return re.sub(r'[\\/:*?"<>|]+', "_", name).strip(" .") or "class"
+
+
+@dataclass
+class ClassReport:
+    name: str
+    output: Optional[str] = None
+    status: str = "pending"  # ok / failed / skipped
+    rows: int = 0
+    subjects: int = 0
+    entries: int = 0
+    duplicates: int = 0  # 同一 (星期, 单双周, 节次) 出现多次，以后出现的为准
+    conflicts: int = 0  # 同名科目的教师 / 教室不一致，沿用首次出现的值
+    overlaps: int = 0  # 与同一天前一节课时间重叠而被丢弃的课程
+    errors: list[str] = field(default_factory=list)
+    ms: float = 0.0
+
+
+@dataclass
+class ImportReport:
+    source: str
+    rows: int = 0
+    skipped_rows: int = 0
+    errors: list[str] = field(default_factory=list)  # 无法归属到班级的行
+    classes: list[ClassReport] = field(default_factory=list)
+    seconds: float = 0.0
+    workers: int = 1
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for c in self.classes if c.status == "failed")
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["failed"] = self.failed
+        return data
+
+    def summary(self) -> str:
+        ok = sum(1 for c in self.classes if c.status == "ok")
+        skipped = sum(1 for c in self.classes if c.status == "skipped")
+        return (
+            f"{self.rows} row(s), {len(self.classes)} class(es): {ok} written, {skipped} skipped, "
+            f"{self.failed} failed, {self.skipped_rows} row(s) rejected in {self.seconds:.2f}s "
+            f"({self.workers} worker(s))"
+        )
+
+
+class _ClassBuilder:
+    """单个班级的去重累积结果"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.report = ClassReport(name)
+        self.subjects: dict[str, tuple[Optional[str], Optional[str]]] = {}  # 科目 -> (教师, 教室)
+        # (星期, 单双周, 节次 / 开始时间) -> (开始, 结束, 科目)
+        self.lessons: dict[tuple[int, str, str], tuple[str, str, str]] = {}
+
+    def add(self, row: dict[str, str]):
+        self.report.rows += 1
+        missing = [key for key in REQUIRED if not row.get(key, "").strip()]
+        if missing:
+            raise RowError(f"missing {', '.join(missing)}")
+        subject = sys.intern(row["subject"].strip())
+        weekday = _weekday(row["weekday"])
+        weeks = WEEKS.get(row.get("weeks", "").strip().lower())
+        if weeks is None:
+            raise RowError(f"invalid weeks '{row['weeks']}'")
+        start, end = _time(row["start"]), _time(row["end"])
+        if end <= start:
+            raise RowError(f"end time {end} is not after start time {start}")
+
+        teacher = row.get("teacher", "").strip() or None
+        room = row.get("room", "").strip() or None
+        known = self.subjects.get(subject)
+        if known is None:
+            self.subjects[subject] = (teacher and sys.intern(teacher), room and sys.intern(room))
+        elif (teacher and teacher != known[0]) or (room and room != known[1]):
+            self.report.conflicts += 1
+
+        key = (weekday, weeks, row.get("period", "").strip() or start)
+        if key in self.lessons:
+            self.report.duplicates += 1
+        self.lessons[key] = (start, end, subject)
+
+    def _days(self) -> dict[tuple[int, str], list[tuple[str, str, str]]]:
+        """
+        按 (星期, 单双周) 组成每天的课程
+        某天有单双周课程时，每周都上的课并入单周和双周两天，不再单独生成 all 日程
+        （课表只取第一个匹配的日程，分开存放会让单双周的课丢失）；同一节次以单双周的课为准
+        """
+        by_weekday: dict[int, dict[str, dict[str, tuple[str, str, str]]]] = {}
+        for (weekday, weeks, period), lesson in self.lessons.items():
+            by_weekday.setdefault(weekday, {}).setdefault(weeks, {})[period] = lesson
+
+        days = {}
+        for weekday, groups in by_weekday.items():
+            every_week = groups.get("all", {})
+            if not groups.keys() - {"all"}:
+                days[(weekday, "all")] = list(every_week.values())
+                continue
+            for weeks in ("odd", "even"):
+                days[(weekday, weeks)] = list({**every_week, **groups.get(weeks, {})}.values())
+        return days
+
+    def _drop_overlaps(self, weekday: int, weeks: str, lessons: list[tuple[str, str, str]]) -> list[tuple[str, str, str]]:
+        kept = []
+        for start, end, subject in sorted(lessons):
+            if kept and start < kept[-1][1]:
+                self.report.overlaps += 1
+                if len(self.report.errors) < MAX_ERRORS:
+                    self.report.errors.append(
+                        f"weekday {weekday} ({weeks}): {subject} {start}-{end} overlaps "
+                        f"{kept[-1][2]} {kept[-1][0]}-{kept[-1][1]}, dropped"
+                    )
+                continue
+            kept.append((start, end, subject))
+        return kept
+
+    def to_cses(self) -> dict:
+        days = {
+            key: self._drop_overlaps(*key, lessons) for key, lessons in sorted(self._days().items())
+        }
+        return {
+            "version": __CSES_SCHEMA_VERSION__,
+            "subjects": [
+                {"name": name, "teacher": teacher, "room": room}
+                for name, (teacher, room) in self.subjects.items()
+            ],
+            "schedules": [
+                {
+                    "name": f"{self.name} {weekday} {weeks}",
+                    "enable_day": weekday,
+                    "weeks": weeks,
+                    "classes": [
+                        {"subject": subject, "start_time": start, "end_time": end}
+                        for start, end, subject in lessons
+                    ],
+                }
+                for (weekday, weeks), lessons in days.items()
+            ],
+        }
+
+
+def _open_rows(path: Path, encoding: str, delimiter: Optional[str]) -> Iterator[tuple[int, dict[str, str]]]:
+    """逐行读取 CSV，表头映射为标准列名；返回 (行号, 行)"""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        if delimiter is None:
+            sample = f.read(8192)
+            f.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+            except csv.Error:
+                delimiter = ","
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV file is empty")
+
+        aliases = {alias: key for key, names in COLUMNS.items() for alias in names}
+        columns = [aliases.get(h.strip().lower()) for h in header]
+        missing = [key for key in REQUIRED if key not in columns]
+        if missing:
+            raise ValueError(f"CSV header is missing required columns: {missing}")
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield reader.line_num, {key: value for key, value in zip(columns, row) if key}
+
+
+def write_class(name: str, cses: dict, output: str, start_date: Optional[str], cycle: int,
+                overwrite: bool) -> dict:
+    """在子进程中把单个班级的 CSES 数据转换为 CW2 并写出"""
+    result = {"status": "ok", "output": output, "subjects": 0, "entries": 0, "error": None, "ms": 0.0}
+    start = time.perf_counter()
+    try:
+        path = Path(output)
+        if path.exists() and not overwrite:
+            result.update(status="skipped", error="output exists")
+            return result
+        schedule = ScheduleConverter.from_cses_data(cses).to_schedule()
+        schedule.meta.maxWeekCycle = cycle
+        if start_date:
+            schedule.meta.startDate = start_date
+        ScheduleConverter.from_schedule(schedule)  # 校验版本
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(schedule.model_dump(mode="json"), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        result["subjects"] = len(schedule.subjects)
+        result["entries"] = sum(len(day.entries) for day in schedule.days)
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    finally:
+        result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def import_csv(path: Path | str, output_dir: Path | str, *, jobs: int = 1, grouped: bool = False,
+               start_date: Optional[str] = None, cycle: int = 2, overwrite: bool = False,
+               encoding: str = "utf-8-sig", delimiter: Optional[str] = None) -> ImportReport:
+    """
+    读取总课表 CSV，为每个班级写出 <output_dir>/<班级>.json
+    grouped=True 表示同一班级的行是连续的，读完一个班级即写出并释放
+    """
+    path, output_dir = Path(path), Path(output_dir)
+    if start_date:
+        datetime.strptime(start_date, "%Y-%m-%d")  # 提前校验格式
+    report = ImportReport(source=str(path), workers=max(1, jobs))
+    begin = time.perf_counter()
+
+    builders: dict[str, _ClassBuilder] = {}
+    finished: set[str] = set()  # grouped 模式下已写出的班级
+    pending: list[tuple[ClassReport, Future | dict]] = []
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+    def flush(builder: _ClassBuilder):
+        builder.report.subjects = len(builder.subjects)
+        output = str(output_dir / f"{_safe_filename(builder.name)}.json")
+        args = (builder.name, builder.to_cses(), output, start_date, cycle, overwrite)
+        pending.append((builder.report, pool.submit(write_class, *args) if pool else write_class(*args)))
+        report.classes.append(builder.report)
+
+    def reject(message: str, target: Optional[ClassReport] = None):
+        report.skipped_rows += 1
+        errors = target.errors if target else report.errors
+        if len(errors) < MAX_ERRORS:
+            errors.append(message)
+
+    try:
+        current: Optional[_ClassBuilder] = None
+        for line, row in _open_rows(path, encoding, delimiter):
+            report.rows += 1
+            name = row.get("class", "").strip()
+            if not name:
+                reject(f"line {line}: empty class")
+                continue
+            if grouped and current is not None and name != current.name:
+                flush(builders.pop(current.name))
+                finished.add(current.name)
+                current = None
+            if name in finished:
+                reject(f"line {line}: rows of class '{name}' are not contiguous")
+                continue
+            builder = builders.get(name)
+            if builder is None:
+                builder = builders[name] = _ClassBuilder(name)
+            current = builder
+            try:
+                builder.add(row)
+            except RowError as e:
+                reject(f"line {line}: {e}", builder.report)
+
+        for builder in builders.values():
+            flush(builder)
+        builders.clear()
+
+        for class_report, outcome in pending:
+            result = outcome.result() if isinstance(outcome, Future) else outcome
+            class_report.status = result["status"]
+            class_report.output = result["output"]
+            class_report.entries = result["entries"]
+            class_report.ms = result["ms"]
+            if result["error"]:
+                class_report.errors.append(result["error"])
+    finally:
+        if pool:
+            pool.shutdown()
+
+    report.seconds = round(time.perf_counter() - begin, 3)
+    logger.info(f"Imported {path}: {report.summary()}")
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.convertor.csv_import",
+        description="Split a master timetable CSV into one Class Widgets 2 schedule per class",
+    )
+    parser.add_argument("csv", type=Path, help="master timetable CSV")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output directory")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--grouped", action="store_true",
+                        help="rows of each class are contiguous; write classes as soon as they end")
+    parser.add_argument("--start-date", help="semester start date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--cycle", type=int, default=2, help="week cycle length")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV encoding, e.g. gbk")
+    parser.add_argument("--delimiter", help="CSV delimiter (sniffed by default)")
+    parser.add_argument("--overwrite", action="store_true", help="replace existing output files")
+    parser.add_argument("--report", type=Path, help="write a JSON report to this file")
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    if not args.csv.is_file():
+        parser.error(f"no such file: {args.csv}")
+    try:
+        report = import_csv(
+            args.csv, args.output, jobs=args.jobs, grouped=args.grouped, start_date=args.start_date,
+            cycle=max(1, args.cycle), overwrite=args.overwrite, encoding=args.encoding, delimiter=args.delimiter,
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    for line in report.errors:
+        print(f"REJECTED  {line}", file=sys.stderr)
+    for c in report.classes:
+        status = c.status.upper()
+        print(f"{status:<8} {c.name}: {c.rows} row(s), {c.subjects} subject(s), {c.entries} entr(ies)"
+              + (f", {c.duplicates} duplicate(s)" if c.duplicates else "")
+              + (f", {c.conflicts} conflict(s)" if c.conflicts else "")
+              + (f", {c.overlaps} overlap(s)" if c.overlaps else ""))
+        for error in c.errors:
+            print(f"         {error}")
+    print(report.summary())
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+iCalendar (ICS) 导出
+
+按日期解析课表（weeks / 周期周 / 调休 / override 与运行时一致），并压缩成 RRULE：
+
+- 同一内容在同一周期周的多个星期几合并为一条 BYDAY 规则，INTERVAL 为周期长度
+- 各周期周都相同的内容只输出一条 INTERVAL=1 的规则
+- 调休日在原规则中用 EXDATE 排除，再单独输出调休后当天的事件
+
+事件由生成器逐个产生、逐行写出，内存占用只与课表本身的大小有关，与导出的日期范围无关；
+多个课表可以传入惰性生成的 IcsExporter 序列，一次只持有一份课表。
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from src.core.schedule.model import ScheduleData, Entry, EntryType
+from src.core.schedule.service import ScheduleServices
+from src.core.utils import get_week_number, get_cycle_week
+
+ICS_DAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+DISPLAY_TYPES = (EntryType.CLASS, EntryType.ACTIVITY)
+PRODID = "-//Class Widgets 2//Schedule Export//EN"
+DEFAULT_WEEKS = 20
+
+# (标题, 地点, 描述, 类型, 开始时间, 结束时间)
+type Content = tuple[str, Optional[str], Optional[str], str, str, str]
+
+
+def _fmt(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> Iterator[str]:
+    """按 RFC 5545 折行：每行不超过 75 字节，不拆开多字节字符"""
+    if len(line.encode("utf-8")) <= 75:
+        yield line
+        return
+    chunk, size, limit = [], 0, 75
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            yield "".join(chunk)
+            chunk, size, limit = [" "], 1, 75
+        chunk.append(char)
+        size += width
+    yield "".join(chunk)
+
+
+def _at(day: date, hhmm: str) -> datetime:
+    return datetime.combine(day, datetime.strptime(hhmm, "%H:%M").time())
+
+
+@dataclass
+class IcsEvent:
+    uid: str
+    summary: str
+    start: datetime
+    end: datetime
+    location: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    rrule: Optional[str] = None
+    exdates: list[datetime] = field(default_factory=list)
+
+    def lines(self, stamp: str) -> Iterator[str]:
+        yield "BEGIN:VEVENT"
+        yield f"UID:{self.uid}"
+        yield f"DTSTAMP:{stamp}"
+        yield f"DTSTART:{_fmt(self.start)}"
+        yield f"DTEND:{_fmt(self.end)}"
+        if self.rrule:
+            yield f"RRULE:{self.rrule}"
+        if self.exdates:
+            yield "EXDATE:" + ",".join(_fmt(d) for d in self.exdates)
+        yield f"SUMMARY:{_escape(self.summary)}"
+        if self.location:
+            yield f"LOCATION:{_escape(self.location)}"
+        if self.description:
+            yield f"DESCRIPTION:{_escape(self.description)}"
+        if self.category:
+            yield f"CATEGORIES:{self.category.upper()}"
+        yield "END:VEVENT"
+
+
+class IcsExporter:
+    """单个课表在 [start, end] 内的事件"""
+
+    def __init__(self, schedule: ScheduleData, start: Optional[date] = None, end: Optional[date] = None,
+                 reschedule: Optional[dict[str, int]] = None):
+        self.schedule = schedule
+        self.cycle = schedule.meta.maxWeekCycle or 1
+        self.semester_start = datetime.strptime(schedule.meta.startDate, "%Y-%m-%d").date()
+        self.start = start or self.semester_start
+        self.end = end or self.start + timedelta(weeks=DEFAULT_WEEKS, days=-1)
+
+        # 调休：日期 -> 按星期几上课；与原本相同的日期无需处理
+        self.shifted: dict[date, int] = {}
+        for date_str, weekday in (reschedule or {}).items():
+            try:
+                day, weekday = datetime.strptime(date_str, "%Y-%m-%d").date(), int(weekday)
+            except (TypeError, ValueError):
+                continue
+            if self.start <= day <= self.end and weekday != day.isoweekday():
+                self.shifted[day] = weekday
+
+        self._services = ScheduleServices(None)
+        self._subjects = {s.id: s for s in schedule.subjects}
+        self._days: dict[tuple[int, int], list[Content]] = {}  # (星期, 周期周) -> 当天内容
+
+    def cycle_week(self, day: date) -> int:
+        return get_cycle_week(get_week_number(self.schedule.meta.startDate, datetime.combine(day, time())), self.cycle)
+
+    def _content(self, entry: Entry) -> Content:
+        subject = self._subjects.get(entry.subjectId) if entry.subjectId else None
+        summary = (subject.name if subject else None) or entry.title or entry.type.value.capitalize()
+        location = subject.location if subject else None
+        description = subject.teacher if subject else None
+        return summary, location, description, entry.type.value, entry.startTime, entry.endTime
+
+    def _resolved(self, weekday: int, week: int) -> list[Content]:
+        key = (weekday, week)
+        if key not in self._days:
+            day = self._services.resolve_day(self.schedule, weekday, week, self.cycle)
+            self._days[key] = [] if day is None else [
+                self._content(e) for e in ScheduleServices.get_all_entries(day) if e.type in DISPLAY_TYPES
+            ]
+        return self._days[key]
+
+    def _uid(self, content: Content, *parts: object) -> str:
+        digest = hashlib.sha1(repr((self.schedule.meta.id, content, parts)).encode("utf-8")).hexdigest()[:20]
+        return f"{digest}@classwidgets"
+
+    def _event(self, content: Content, day: date, uid: str) -> IcsEvent:
+        summary, location, description, category, start, end = content
+        return IcsEvent(uid=uid, summary=summary, start=_at(day, start), end=_at(day, end),
+                        location=location, description=description, category=category)
+
+    def _matches(self, day: date, weekdays: frozenset[int], week: Optional[int]) -> bool:
+        return day.isoweekday() in weekdays and (week is None or self.cycle_week(day) == week)
+
+    def _series(self, content: Content, weekdays: frozenset[int], week: Optional[int]) -> Optional[IcsEvent]:
+        """week 为 None 表示每周都有；否则只在该周期周出现"""
+        # 规律以 7 * 周期 天重复，两个周期内找不到前两次出现即可停止
+        found: list[date] = []
+        day, limit = self.start, min(self.end, self.start + timedelta(days=14 * self.cycle))
+        while day <= limit and len(found) < 2:
+            if self._matches(day, weekdays, week):
+                found.append(day)
+            day += timedelta(days=1)
+        if not found:
+            return None
+
+        uid = self._uid(content, sorted(weekdays), week)
+        event = self._event(content, found[0], uid)
+        if len(found) == 1:
+            return None if found[0] in self.shifted else event
+
+        interval = 1 if week is None else self.cycle
+        byday = ",".join(ICS_DAYS[d - 1] for d in sorted(weekdays))
+        rule = f"FREQ=WEEKLY;UNTIL={_fmt(datetime.combine(self.end, time(23, 59, 59)))}"
+        if interval > 1:
+            # 周次按开学日所在星期几起算，与 get_week_number 一致
+            rule += f";INTERVAL={interval};WKST={ICS_DAYS[self.semester_start.weekday()]}"
+        event.rrule = f"{rule};BYDAY={byday}"
+        event.exdates = [
+            _at(d, content[4]) for d in sorted(self.shifted)
+            if d >= found[0] and self._matches(d, weekdays, week)
+        ]
+        return event
+
+    def events(self) -> Iterator[IcsEvent]:
+        if self.end < self.start:
+            return
+
+        # 内容 -> 周期周 -> 星期几
+        slots: dict[Content, dict[int, set[int]]] = {}
+        for weekday in range(1, 8):
+            for week in range(1, self.cycle + 1):
+                for content in self._resolved(weekday, week):
+                    slots.setdefault(content, {}).setdefault(week, set()).add(weekday)
+
+        for content, by_week in slots.items():
+            weekday_sets = {frozenset(v) for v in by_week.values()}
+            if len(by_week) == self.cycle and len(weekday_sets) == 1:
+                rules = [(None, weekday_sets.pop())]
+            else:
+                rules = [(week, frozenset(weekdays)) for week, weekdays in sorted(by_week.items())]
+            for week, weekdays in rules:
+                if event := self._series(content, weekdays, week):
+                    yield event
+
+        for day, weekday in sorted(self.shifted.items()):
+            for content in self._resolved(weekday, self.cycle_week(day)):
+                yield self._event(content, day, self._uid(content, day.isoformat()))
+
+
+def calendar_lines(exporters: Iterable[IcsExporter], name: Optional[str] = None) -> Iterator[str]:
+    """生成完整的 VCALENDAR（已折行，不含换行符）"""
+    stamp = _fmt(datetime.now(timezone.utc)) + "Z"
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    if name:
+        yield from _fold(f"X-WR-CALNAME:{_escape(name)}")
+    for exporter in exporters:
+        for event in exporter.events():
+            for line in event.lines(stamp):
+                yield from _fold(line)
+    yield "END:VCALENDAR"
+
+
+def write_ics(path: Path | str, exporters: Iterable[IcsExporter], name: Optional[str] = None) -> int:
+    """逐行写出 ICS 文件，返回写入的 VEVENT 数量"""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for line in calendar_lines(exporters, name):
+            if line == "BEGIN:VEVENT":
+                count += 1
+            f.write(line)
+            f.write("\r\n")
+    return count
@@ -1,21 +1,79 @@
-import json
+from datetime import datetime, timedelta
 from pathlib import Path
-from PySide6.QtCore import QObject, Slot
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Slot, Signal, QThread
 from PySide6.QtWidgets import QFileDialog, QApplication
 from loguru import logger
 
 from .converter import ScheduleConverter
+from .ics import IcsExporter, write_ics
+from .worker import ConvertWorker
+from src.core.parser import ScheduleParser
 from src.core.schedule.model import ScheduleData
 
 
 class ScheduleIO(QObject):
+    importFinished = Signal(str)  # 导入后的课表名
+    importFailed = Signal(str)
+    exportFinished = Signal(str)  # 输出路径
+    exportFailed = Signal(str)
+
     def __init__(self, parent):
         super().__init__()
         self.manager = parent
+        self._thread: Optional[QThread] = None
+        self._worker: Optional[ConvertWorker] = None
+
+    def _run_in_thread(self, task: Callable[[], object],
+                       on_done: Callable[[object], None], on_error: Callable[[str], None]) -> bool:
+        """在后台线程执行 task，线程退出后在主线程回调"""
+        if self._thread is not None:
+            logger.warning("Another schedule conversion is still running")
+            return False
+
+        self._thread = QThread()
+        self._worker = ConvertWorker(task)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        outcome: dict = {}
+
+        def on_finished(result):
+            outcome["result"] = result
+            self._thread.quit()
+
+        def on_failed(msg: str):
+            outcome["error"] = msg
+            self._thread.quit()
+
+        def on_thread_finished():
+            self._worker.deleteLater()
+            self._thread.deleteLater()
+            self._thread = None
+            self._worker = None
+            if "error" in outcome:
+                on_error(outcome["error"])
+            else:
+                on_done(outcome["result"])
+
+        self._worker.finished.connect(on_finished)
+        self._worker.error.connect(on_failed)
+        self._thread.finished.connect(on_thread_finished)
+        self._thread.start()
+        return True
+
+    def _current_copy(self, filename: str) -> Optional[ScheduleData]:
+        """当前课表直接使用内存中的数据；其余课表返回 None，由后台任务读取文件"""
+        if filename == self.manager.current_schedule_name:
+            return self.manager.schedule.model_copy(deep=True)
+        return None
 
     @Slot(str, result=bool)
     def exportToCSES(self, filename: str) -> bool:
-        """Export current CW2 schedule to CSES YAML file."""
+        """
+        Export CW2 schedule to CSES YAML file.
+        转换和写文件在后台进行，结果通过 exportFinished / exportFailed 通知
+        """
         try:
             path = self.manager.schedules_dir / f"{filename}.json"
             default_name = path.stem + ".yaml"
@@ -27,16 +85,77 @@ class ScheduleIO(QObject):
             )
             if not output_path:
                 return False
-            ScheduleConverter.from_cw2(path).to_cses(Path(output_path))
-            logger.success(f"Exported schedule to {output_path}")
-            return True
+
+            current = self._current_copy(filename)
         except Exception as e:
             logger.exception(f"Export failed: {e}")
             return False
 
+        def task() -> str:
+            schedule = current if current is not None else ScheduleParser(path).load()
+            ScheduleConverter.from_schedule(schedule).to_cses(Path(output_path))
+            return output_path
+
+        def on_done(result: str):
+            logger.success(f"Exported schedule to {result}")
+            self.exportFinished.emit(result)
+
+        def on_error(msg: str):
+            logger.error(f"Export failed: {msg}")
+            self.exportFailed.emit(msg)
+
+        return self._run_in_thread(task, on_done, on_error)
+
+    @Slot(str, result=bool)
+    def exportToICS(self, filename: str) -> bool:
+        """
+        导出为 iCalendar，范围为开学日起 configs.schedule.ics_export_weeks 周（含调休）
+        结果通过 exportFinished / exportFailed 通知
+        """
+        try:
+            path = self.manager.schedules_dir / f"{filename}.json"
+            output_path, _ = QFileDialog.getSaveFileName(
+                None,
+                QApplication.translate("ExportScheduleDialog", "Export Schedule"),
+                path.stem + ".ics",
+                QApplication.translate("ExportScheduleDialog", "iCalendar Format (*.ics)")
+            )
+            if not output_path:
+                return False
+
+            current = self._current_copy(filename)
+            config = self.manager.app_central.configs.schedule
+            reschedule = dict(config.reschedule_day)
+            weeks = max(1, config.ics_export_weeks)
+        except Exception as e:
+            logger.exception(f"Export failed: {e}")
+            return False
+
+        def task() -> str:
+            schedule = current if current is not None else ScheduleParser(path).load()
+            start = datetime.strptime(schedule.meta.startDate, "%Y-%m-%d").date()
+            end = start + timedelta(weeks=weeks, days=-1)
+            count = write_ics(output_path, [IcsExporter(schedule, start, end, reschedule)], filename)
+            logger.debug(f"Wrote {count} events to {output_path}")
+            return output_path
+
+        def on_done(result: str):
+            logger.success(f"Exported schedule to {result}")
+            self.exportFinished.emit(result)
+
+        def on_error(msg: str):
+            logger.error(f"Export failed: {msg}")
+            self.exportFailed.emit(msg)
+
+        return self._run_in_thread(task, on_done, on_error)
+
     @Slot(result=bool)
     def importCSES(self) -> bool:
-        """导入并转换 CSES"""
+        """
+        导入并转换 CSES
+        解析与转换在后台进行，完成后交给 ScheduleManager 导入（同名课表已存在时增量合并），
+        结果通过 importFinished / importFailed 通知
+        """
         file_path, _ = QFileDialog.getOpenFileName(
             None,
             QApplication.translate("ImportScheduleDialog", "Import CSES Schedule"),
@@ -47,30 +166,25 @@ class ScheduleIO(QObject):
             logger.info("User cancelled import.")
             return False
 
-        try:
-            path = Path(file_path)
-            if not path.exists():
-                logger.error(f"Selected file does not exist: {file_path}")
-                return False
+        path = Path(file_path)
+        if not path.exists():
+            logger.error(f"Selected file does not exist: {file_path}")
+            return False
 
-            # 转换并保存
-            dest_path = self.manager.schedules_dir / f"{path.stem} - CSES.json"
-            ScheduleConverter.from_cses(path).to_cw2(dest_path)
+        name = f"{path.stem} - CSES"
 
-            with open(dest_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        def task() -> ScheduleData:
+            return ScheduleConverter.from_cses(path).to_schedule()
 
-            self.manager.schedule = ScheduleData.model_validate(data)
-            self.manager.current_schedule_name = dest_path.stem
-            self.manager.schedule_path = dest_path
+        def on_done(schedule: ScheduleData):
+            if self.manager.applyImport(name, schedule):
+                logger.success(f"Imported CSES schedule from {file_path}")
+                self.importFinished.emit(name)
+            else:
+                self.importFailed.emit(f"Failed to import '{name}'")
 
-            # 保存并触发信号
-            self.manager.save()
-            self.manager.scheduleSwitched.emit(self.manager.schedule)
-            self.manager.scheduleModified.emit(self.manager.schedule)
+        def on_error(msg: str):
+            logger.error(f"Import failed: {msg}")
+            self.importFailed.emit(msg)
 
-            logger.success(f"Imported CSES schedule from {file_path}")
-            return True
-        except Exception as e:
-            logger.exception(f"Import failed: {e}")
-            return False
+        return self._run_in_thread(task, on_done, on_error)
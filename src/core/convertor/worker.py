@@ -0,0 +1,20 @@
+from typing import Callable
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+
+class ConvertWorker(QObject):
+    """在后台线程执行格式转换与文件读写，避免大课表阻塞 GUI"""
+    finished = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, task: Callable[[], object]):
+        super().__init__()
+        self.task = task
+
+    @Slot()
+    def run(self):
+        try:
+            self.finished.emit(self.task())
+        except Exception as e:
+            self.error.emit(str(e))
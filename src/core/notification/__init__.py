@@ -1,4 +1,5 @@
 from .model import NotificationLevel, NotificationData, NotificationProviderConfig
 from .manager import NotificationManager
+from .history import NotificationHistory, NotificationHistoryModel
 from .provider import NotificationProvider
 from .service import NotificationService
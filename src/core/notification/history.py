@@ -0,0 +1,401 @@
+"""
+通知历史
+
+已发送的通知记录在 SQLite（configs/notifications.db，只追加）中，按来源、级别与时间建立索引：
+- 最近 RING_SIZE 条同时保存在内存环形缓冲区里，打开历史记录的第一页不需要读盘
+- 新记录先进入缓冲区，FLUSH_DELAY_MS 内的记录在一个事务中批量写入
+- 轮换：超过 RETENTION_DAYS 天或超过 MAX_RECORDS 条的旧记录被删除
+- NotificationHistoryModel 按页（PAGE_SIZE 条）从新到旧懒加载，列表滚动到底部时才读取下一页
+"""
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass, astuple
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt, QTimer, Signal, Slot, Property
+from loguru import logger
+
+if TYPE_CHECKING:
+    from .model import NotificationPayload
+
+HISTORY_FILENAME = "notifications.db"
+SCHEMA_VERSION = 1
+RING_SIZE = 200
+PAGE_SIZE = 50
+FLUSH_DELAY_MS = 1000
+RETENTION_DAYS = 90
+MAX_RECORDS = 20000
+ROTATE_EVERY = 500  # 每写入多少条检查一次轮换
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    provider_id TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    message TEXT,
+    icon TEXT,
+    count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_history_time ON history (time);
+CREATE INDEX IF NOT EXISTS idx_history_provider ON history (provider_id, id);
+CREATE INDEX IF NOT EXISTS idx_history_level ON history (level, id);
+"""
+_COLUMNS = "id, time, provider_id, level, title, message, icon, count"
+
+
+@dataclass(slots=True)
+class HistoryRecord:
+    id: int  # 递增，越大越新
+    time: float  # Unix 时间戳（秒）
+    provider_id: str
+    level: int
+    title: str
+    message: Optional[str] = None
+    icon: Optional[str] = None
+    count: int = 1
+
+    def matches(self, provider_id: Optional[str] = None, level: Optional[int] = None,
+                since: Optional[float] = None) -> bool:
+        return ((provider_id is None or self.provider_id == provider_id)
+                and (level is None or self.level == level)
+                and (since is None or self.time >= since))
+
+
+class NotificationHistory(QObject):
+    """通知历史存储（GUI 线程使用）"""
+    appended = Signal(object)  # HistoryRecord
+    cleared = Signal()
+
+    def __init__(self, path: Path, ring_size: int = RING_SIZE,
+                 retention_days: float = RETENTION_DAYS, max_records: int = MAX_RECORDS):
+        super().__init__()
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self.max_records = max_records
+        self._conn: Optional[sqlite3.Connection] = None
+        self._ring: deque[HistoryRecord] = deque(maxlen=ring_size)
+        # 缓冲区是否包含全部记录（数据库中的记录不多于缓冲区容量时）
+        self._ring_complete = False
+        self._pending: list[HistoryRecord] = []
+        self._next_id = 1
+        self._since_rotate = 0
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_DELAY_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    # 数据库
+    def _open(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL 下提交时不再等待 fsync
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.execute("SELECT 1 FROM history LIMIT 1").fetchall()
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as e:
+            backup = self.path.with_name(f"{self.path.name}.bak")
+            logger.warning(f"Notification history is corrupted: {e}, starting a new one (backup: {backup.name})")
+            for suffix in ("-wal", "-shm"):
+                self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+            self.path.replace(backup)
+            self._conn = self._open()
+
+        self._rotate()
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM history ORDER BY id DESC LIMIT ?", (self._ring.maxlen,)
+        ).fetchall()
+        self._ring.extend(HistoryRecord(*row) for row in reversed(rows))
+        self._ring_complete = len(rows) < self._ring.maxlen
+        if rows:
+            self._next_id = rows[0][0] + 1
+        return self._conn
+
+    def _rotate(self):
+        conn = self._conn
+        cutoff = time.time() - self.retention_days * 86400
+        with conn:
+            removed = conn.execute("DELETE FROM history WHERE time < ?", (cutoff,)).rowcount
+            removed += conn.execute(
+                "DELETE FROM history WHERE id <= (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_records,)
+            ).rowcount
+        self._since_rotate = 0
+        if removed:
+            while self._ring and self._ring[0].time < cutoff:
+                self._ring.popleft()
+            logger.debug(f"Notification history rotated: {removed} old records removed")
+
+    @Slot()
+    def flush(self) -> None:
+        """把缓冲的记录写入数据库"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        conn = self._connection()
+        pending, self._pending = self._pending, []
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO history ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [astuple(record) for record in pending]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save notification history: {e}")
+            return
+        self._since_rotate += len(pending)
+        if self._since_rotate >= ROTATE_EVERY:
+            self._rotate()
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # 记录与查询
+    def record(self, payload: "NotificationPayload") -> HistoryRecord:
+        """记录一条已发送的通知"""
+        self._connection()  # 首次记录时读取已有记录，确定新的 id
+        icon = payload.get("icon")
+        record = HistoryRecord(
+            id=self._next_id,
+            time=time.time(),
+            provider_id=payload["provider_id"],
+            level=int(payload["level"]),
+            title=payload["title"],
+            message=payload.get("message"),
+            icon=str(icon) if icon is not None else None,
+            count=payload.get("count", 1),
+        )
+        self._next_id += 1
+        if len(self._ring) == self._ring.maxlen:
+            self._ring_complete = False
+        self._ring.append(record)
+        self._pending.append(record)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+        self.appended.emit(record)
+        return record
+
+    def query(self, provider_id: Optional[str] = None, level: Optional[int] = None,
+              since: Optional[float] = None, before: Optional[int] = None,
+              limit: int = PAGE_SIZE) -> list[HistoryRecord]:
+        """
+        从新到旧查询记录
+        before 为上一页最后一条记录的 id（第一页为 None）
+        """
+        self._connection()
+        # 缓冲区是最新的一段连续记录，满足条件的记录够一页时不读数据库
+        result = []
+        for record in reversed(self._ring):
+            if before is not None and record.id >= before:
+                continue
+            if since is not None and record.time < since:
+                return result
+            if record.matches(provider_id, level):
+                result.append(record)
+                if len(result) >= limit:
+                    return result
+        if self._ring_complete:
+            return result
+
+        self.flush()
+        clauses, params = [], []
+        for clause, value in (("provider_id = ?", provider_id), ("level = ?", level),
+                              ("time >= ?", since), ("id < ?", before)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        try:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM history {where} ORDER BY id DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to query notification history: {e}")
+            return []
+        return [HistoryRecord(*row) for row in rows]
+
+    def recent(self, limit: int = 10) -> list[HistoryRecord]:
+        """最近的若干条记录（从新到旧）"""
+        return self.query(limit=limit)
+
+    def count(self, provider_id: Optional[str] = None, level: Optional[int] = None,
+              since: Optional[float] = None) -> int:
+        self.flush()
+        clauses, params = [], []
+        for clause, value in (("provider_id = ?", provider_id), ("level = ?", level), ("time >= ?", since)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._connection().execute(f"SELECT COUNT(*) FROM history {where}", params).fetchone()[0]
+
+    def clear(self) -> None:
+        conn = self._connection()
+        self._flush_timer.stop()
+        self._pending.clear()
+        self._ring.clear()
+        self._ring_complete = True
+        with conn:
+            conn.execute("DELETE FROM history")
+        self.cleared.emit()
+
+
+class NotificationHistoryModel(QAbstractListModel):
+    """通知历史列表（从新到旧，按页懒加载）"""
+    RecordIdRole = Qt.UserRole + 1
+    TimeRole = Qt.UserRole + 2
+    ProviderIdRole = Qt.UserRole + 3
+    LevelRole = Qt.UserRole + 4
+    TitleRole = Qt.UserRole + 5
+    MessageRole = Qt.UserRole + 6
+    IconRole = Qt.UserRole + 7
+    CountRole = Qt.UserRole + 8
+
+    filterChanged = Signal()
+
+    def __init__(self, history: NotificationHistory, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.history = history
+        self._records: list[HistoryRecord] = []
+        self._exhausted = False
+        self._provider_filter = ""
+        self._level_filter = -1
+        self._days = 0
+        history.appended.connect(self._on_appended)
+        history.cleared.connect(self.reload)
+
+    def roleNames(self):
+        return {
+            self.RecordIdRole: b"recordId",
+            self.TimeRole: b"time",
+            self.ProviderIdRole: b"providerId",
+            self.LevelRole: b"level",
+            self.TitleRole: b"title",
+            self.MessageRole: b"message",
+            self.IconRole: b"icon",
+            self.CountRole: b"count",
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def data(self, index, role):
+        if not index.isValid() or index.row() >= len(self._records):
+            return None
+        r = self._records[index.row()]
+        if role == self.RecordIdRole:
+            return r.id
+        if role == self.TimeRole:
+            return r.time * 1000  # 毫秒，QML 中 new Date(time)
+        if role == self.ProviderIdRole:
+            return r.provider_id
+        if role == self.LevelRole:
+            return r.level
+        if role == self.TitleRole:
+            return r.title
+        if role == self.MessageRole:
+            return r.message or ""
+        if role == self.IconRole:
+            return r.icon or ""
+        if role == self.CountRole:
+            return r.count
+        return None
+
+    # 筛选条件
+    def _filters(self) -> dict:
+        return {
+            "provider_id": self._provider_filter or None,
+            "level": self._level_filter if self._level_filter >= 0 else None,
+            "since": time.time() - self._days * 86400 if self._days > 0 else None,
+        }
+
+    def _get_provider_filter(self) -> str:
+        return self._provider_filter
+
+    def _set_provider_filter(self, value: str):
+        if value != self._provider_filter:
+            self._provider_filter = value
+            self.filterChanged.emit()
+            self.reload()
+
+    def _get_level_filter(self) -> int:
+        return self._level_filter
+
+    def _set_level_filter(self, value: int):
+        if value != self._level_filter:
+            self._level_filter = value
+            self.filterChanged.emit()
+            self.reload()
+
+    def _get_days(self) -> int:
+        return self._days
+
+    def _set_days(self, value: int):
+        if value != self._days:
+            self._days = value
+            self.filterChanged.emit()
+            self.reload()
+
+    providerFilter = Property(str, _get_provider_filter, _set_provider_filter, notify=filterChanged)  # 空为全部
+    levelFilter = Property(int, _get_level_filter, _set_level_filter, notify=filterChanged)  # -1 为全部
+    days = Property(int, _get_days, _set_days, notify=filterChanged)  # 最近几天，0 为全部
+
+    # 懒加载
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        before = self._records[-1].id if self._records else None
+        page = self.history.query(**self._filters(), before=before, limit=PAGE_SIZE)
+        if len(page) < PAGE_SIZE:
+            self._exhausted = True
+        if page:
+            start = len(self._records)
+            self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+            self._records.extend(page)
+            self.endInsertRows()
+
+    @Slot()
+    def reload(self) -> None:
+        """清空已加载的记录，视图需要时重新从第一页加载"""
+        self.beginResetModel()
+        self._records.clear()
+        self._exhausted = False
+        self.endResetModel()
+
+    @Slot()
+    def clear(self) -> None:
+        """删除全部历史记录"""
+        self.history.clear()
+
+    def _on_appended(self, record: HistoryRecord):
+        # 还未加载过时不必插入，视图加载第一页时会读到它
+        if not self._records and not self._exhausted:
+            return
+        if not record.matches(**self._filters()):
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._records.insert(0, record)
+        self.endInsertRows()
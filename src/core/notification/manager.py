@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import time
+from collections import deque
 from typing import Optional, TYPE_CHECKING
-from threading import Lock
 
-from PySide6.QtCore import Signal, QObject, Slot
+from PySide6.QtCore import Signal, QObject, Slot, QTimer, Qt, Property
 from loguru import logger
 
 if TYPE_CHECKING:
@@ -14,10 +15,17 @@ if TYPE_CHECKING:
     from src.core.notification.model import NotificationPayload
 
 from src.core.notification import NotificationProviderConfig
+from src.core.notification.pipeline import NotificationQueue, QueuedNotification, MAX_QUEUED
+from src.core.notification.history import NotificationHistory, NotificationHistoryModel, HISTORY_FILENAME
 
 
 class NotificationManager(QObject):
+    """
+    通知经 NotificationQueue 排队（优先级、限流、合并、过期），在 GUI 线程发送；
+    dispatch() 可以在任意线程调用。已发送的通知记录在 NotificationHistory 中
+    """
     notified = Signal(dict)
+    _wake = Signal()  # 跨线程唤醒 GUI 线程取出队列
 
     def __init__(self, config_manager: "ConfigManager", app_central: "AppCentral") -> None:
         super().__init__()
@@ -25,8 +33,16 @@ class NotificationManager(QObject):
         self.configs: "ConfigManager" = config_manager
         self.app_central: "AppCentral" = app_central
         self._qml_ready: bool = False
-        self._pending_notifications: list["NotificationPayload"] = []
-        self._lock: Lock = Lock()
+        self.queue = NotificationQueue()
+        # 已发送、等待 QML 就绪后再显示的应用内通知 (payload, 入队时间)
+        self._pending_app: deque[tuple["NotificationPayload", float]] = deque(maxlen=MAX_QUEUED)
+        self.history = NotificationHistory(config_manager.path / HISTORY_FILENAME)
+        self._history_model = NotificationHistoryModel(self.history, self)
+        # 被限流的通知等令牌恢复后再发送
+        self._drain_timer = QTimer(self)
+        self._drain_timer.setSingleShot(True)
+        self._drain_timer.timeout.connect(self._drain)
+        self._wake.connect(self._drain, Qt.ConnectionType.QueuedConnection)
 
     def register_provider(self, provider: "NotificationProvider") -> None:
         if not hasattr(provider, "id") or not hasattr(provider, "name"):
@@ -58,34 +74,27 @@ class NotificationManager(QObject):
     def set_qml_ready(self, ready: bool = True) -> None:
         """
         设置 QML 是否已准备就绪
-        当 QML 准备好后，会自动发送所有待处理的通知
+        系统通知、提示音与历史记录不等待 QML；应用内通知就绪前暂存（有界、会过期），就绪后自动显示
         """
-        pending = None
-        with self._lock:
-            self._qml_ready = ready
-            if ready and self._pending_notifications:
-                logger.info(f"QML ready, flushing {len(self._pending_notifications)} pending notifications")
-                pending = list(self._pending_notifications)
-                self._pending_notifications.clear()
-
-        if ready and pending:
-            for payload in pending:
-                self.notified.emit(payload)
+        self._qml_ready = ready
+        if ready:
+            if self._pending_app:
+                logger.info(f"QML ready, showing {len(self._pending_app)} pending notifications")
+            now = time.monotonic()
+            while self._pending_app:
+                payload, enqueued_at = self._pending_app.popleft()
+                if now - enqueued_at <= self.queue.ttl:
+                    self.notified.emit(payload)
+            self._drain()
 
     def flush_pending_notifications(self) -> None:
         """
         手动刷新待处理的通知
         """
-        with self._lock:
-            if not self._pending_notifications:
-                return
-            pending = list(self._pending_notifications)
-            self._pending_notifications.clear()
-        
-        for payload in pending:
-            self.notified.emit(payload)
+        self._drain()
 
     def dispatch(self, data: "NotificationData", cfg: Optional["NotificationProviderConfig"] = None) -> None:
+        """通知入队（线程安全），稍后在 GUI 线程发送"""
         # 记录通知分发信息
         logger.info(f"Dispatching notification: {data.provider_id} - {data.title} (Level: {data.level})")
 
@@ -100,49 +109,67 @@ class NotificationManager(QObject):
         if not getattr(cfg, "enabled", True):
             return
 
-        payload: "NotificationPayload" = data.model_dump()
         use_system_notify: bool = bool(getattr(cfg, "use_system_notify", False))
         use_app_notify: bool = bool(getattr(cfg, "use_app_notify", True))
-        payload["use_system"] = use_system_notify
 
         # 如果既不使用系统通知也不使用应用内通知，则直接返回
         if not use_system_notify and not use_app_notify:
             return
 
-        provider: Optional[NotificationProvider] = self.providers.get(data.provider_id)
-        provider_use_system = hasattr(provider, 'use_system_notify') and provider.use_system_notify if provider else False
+        payload: "NotificationPayload" = data.model_dump()
+        payload["use_system"] = use_system_notify
+        if self.queue.push(payload, use_app_notify):
+            self._wake.emit()
+        else:
+            logger.debug(f"Notification coalesced or dropped: {data.provider_id} - {data.title}")
+
+    @Slot()
+    def _drain(self) -> None:
+        """在 GUI 线程按优先级发送队列中可以发送的通知"""
+        ready, wait = self.queue.pop_ready()
+        for item in ready:
+            self._deliver(item)
+        if wait is not None:
+            self._drain_timer.start(max(1, int(wait * 1000)))
+
+    def _deliver(self, item: QueuedNotification) -> None:
+        payload = item.payload
+        try:
+            self.history.record(payload)
+        except Exception as e:
+            logger.error(f"Notification history error: {e}")
 
         # 发送系统通知
-        if use_system_notify and (provider_use_system or use_system_notify):
+        if payload["use_system"]:
             try:
                 if self.app_central and hasattr(self.app_central, "tray_icon") and self.app_central.tray_icon:
                     self.app_central.tray_icon.push_notification(
-                        title=data.title,
-                        text=data.message or "",
+                        title=payload["title"],
+                        text=payload["message"] or "",
                         icon=None
                     )
             except Exception as e:
                 logger.error(f"System notification error: {e}")
 
         # 发送应用内通知信号
-        if use_app_notify:
-            with self._lock:
-                if not self._qml_ready:
-                    logger.debug(f"QML not ready, queuing notification: {data.title}")
-                    self._pending_notifications.append(payload)
-            
+        if item.use_app:
             if self._qml_ready:
                 self.notified.emit(payload)
+            else:
+                self._pending_app.append((payload, item.enqueued_at))
 
-            if not data.silent:
+            if not payload["silent"]:
                 try:
-                    if self.app_central and hasattr(self.app_central, 'utils_backend') and self.app_central.utils_backend:
-                        self.app_central.utils_backend.playNotificationSound(data.provider_id, data.level)
+                    service = getattr(self.app_central, "notification_service", None) if self.app_central else None
+                    if service:
+                        service.play_sound(payload["level"], requested_at=item.enqueued_at)
                 except Exception as e:
                     logger.error(f"Sound playback error: {e}")
 
+    @Property(QObject, constant=True)
+    def historyModel(self) -> QObject:  # 通知历史（分页懒加载）
+        return self._history_model
 
-    
     def get_providers(self) -> list[dict[str, Optional[str | bool]]]:
         """
         获取所有已注册的通知提供者信息，用于前端展示
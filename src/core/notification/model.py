@@ -23,6 +23,7 @@ class NotificationData(BaseModel):
     closable: bool = True
     silent: bool = False      # 是否无声音
     use_system: bool = False # 系统通知 or 应用内
+    count: int = 1            # 排队期间合并的相同通知数量
 
 
 # 与 NotificationData 对应的字典结构
@@ -36,6 +37,7 @@ class NotificationPayload(TypedDict):
     closable: bool
     silent: bool
     use_system: bool
+    count: int
 
 class NotificationProviderConfig(BaseModel):
     enabled: bool = True
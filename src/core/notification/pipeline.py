@@ -0,0 +1,172 @@
+"""
+通知分发管线
+
+dispatch() 可以在任意线程调用：通知先进入有界优先队列，再由 GUI 线程按优先级取出发送。
+
+- 优先级：NotificationLevel 高的先发，同级按入队顺序
+- 有界：队列满时丢弃优先级最低且最早入队的一条；新通知的优先级比它们都低时丢弃新通知
+- 合并：队列中已有相同来源、标题与内容的通知时只增加它的 count；
+  刚发送过的相同通知在 DEDUP_WINDOW 秒内再次出现时直接丢弃
+- 限流：每个 Provider 一个令牌桶，超出速率的通知留在队列中稍后发送；SYSTEM 级别不受限
+- 过期：在队列中等待超过 QUEUE_TTL 秒的通知不再发送
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Optional, TYPE_CHECKING
+
+from .model import NotificationLevel
+
+if TYPE_CHECKING:
+    from .model import NotificationPayload
+
+MAX_QUEUED = 64
+QUEUE_TTL = 60.0
+DEDUP_WINDOW = 3.0
+RATE_BURST = 5  # 每个 Provider 可以连续发送的条数
+RATE_PER_SECOND = 1.0  # 之后每秒恢复的条数
+
+type NotificationKey = tuple[str, str, Optional[str]]  # (provider_id, title, message)
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now: float) -> float:
+        """距离下一个令牌还需多少秒"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+@dataclass(order=True)
+class QueuedNotification:
+    sort_key: tuple[int, int]  # (-level, 入队序号)，堆顶即最先发送的一条
+    payload: "NotificationPayload" = field(compare=False)
+    use_app: bool = field(compare=False, default=True)
+    key: NotificationKey = field(compare=False, default=("", "", None))
+    enqueued_at: float = field(compare=False, default=0.0)
+
+
+class NotificationQueue:
+    """线程安全的有界优先队列（不依赖 Qt，由 NotificationManager 在 GUI 线程取出）"""
+
+    def __init__(self, max_size: int = MAX_QUEUED, ttl: float = QUEUE_TTL, dedup_window: float = DEDUP_WINDOW,
+                 burst: int = RATE_BURST, rate: float = RATE_PER_SECOND,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.dedup_window = dedup_window
+        self.burst = burst
+        self.rate = rate
+        self._clock = clock
+        self._heap: list[QueuedNotification] = []
+        self._queued: dict[NotificationKey, QueuedNotification] = {}
+        self._recent: dict[NotificationKey, float] = {}  # 最近发送过的通知 -> 发送时间
+        self._buckets: dict[str, TokenBucket] = {}
+        self._seq = itertools.count()
+        self._lock = Lock()
+        self.stats: Counter[str] = Counter()  # enqueued / coalesced / deduplicated / dropped / expired / delivered
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def _bucket(self, provider_id: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(provider_id)
+        if bucket is None:
+            bucket = self._buckets[provider_id] = TokenBucket(self.burst, self.rate, now)
+        return bucket
+
+    def _remove(self, item: QueuedNotification):
+        self._heap.remove(item)
+        heapq.heapify(self._heap)
+        del self._queued[item.key]
+
+    def push(self, payload: "NotificationPayload", use_app: bool = True) -> bool:
+        """入队；被合并、去重或丢弃时返回 False"""
+        now = self._clock()
+        key = (payload["provider_id"], payload["title"], payload.get("message"))
+        with self._lock:
+            queued = self._queued.get(key)
+            if queued is not None:
+                queued.payload["count"] = queued.payload.get("count", 1) + 1
+                queued.use_app = queued.use_app or use_app
+                self.stats["coalesced"] += 1
+                return False
+            sent = self._recent.get(key)
+            if sent is not None and now - sent < self.dedup_window:
+                self.stats["deduplicated"] += 1
+                return False
+
+            item = QueuedNotification((-payload["level"], next(self._seq)), payload, use_app, key, now)
+            if len(self._heap) >= self.max_size:
+                # 优先级最低的几条里最早入队的一条
+                worst = max(self._heap, key=lambda q: (q.sort_key[0], -q.sort_key[1]))
+                if item.sort_key[0] > worst.sort_key[0]:
+                    self.stats["dropped"] += 1
+                    return False
+                self._remove(worst)
+                self.stats["dropped"] += 1
+            heapq.heappush(self._heap, item)
+            self._queued[key] = item
+            self.stats["enqueued"] += 1
+            return True
+
+    def pop_ready(self) -> tuple[list[QueuedNotification], Optional[float]]:
+        """
+        按优先级取出现在可以发送的通知；
+        另返回被限流的通知最早还需等待的秒数（没有被限流的通知时为 None）
+        """
+        now = self._clock()
+        ready: list[QueuedNotification] = []
+        blocked: list[QueuedNotification] = []
+        wait: Optional[float] = None
+        with self._lock:
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                if now - item.enqueued_at > self.ttl:
+                    del self._queued[item.key]
+                    self.stats["expired"] += 1
+                    continue
+                if item.payload["level"] < NotificationLevel.SYSTEM:
+                    bucket = self._bucket(item.payload["provider_id"], now)
+                    if not bucket.try_take(now):
+                        blocked.append(item)
+                        delay = bucket.wait_time(now)
+                        wait = delay if wait is None else min(wait, delay)
+                        continue
+                del self._queued[item.key]
+                self._recent[item.key] = now
+                ready.append(item)
+            for item in blocked:
+                heapq.heappush(self._heap, item)
+
+            self._recent = {k: t for k, t in self._recent.items() if now - t < self.dedup_window}
+            self.stats["delivered"] += len(ready)
+        return ready, wait
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._queued.clear()
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-from PySide6.QtCore import QObject, Signal, Slot, QUrl
-from PySide6.QtMultimedia import QSoundEffect
+from typing import Optional, TYPE_CHECKING
+from PySide6.QtCore import QObject, Signal, Slot
 from pathlib import Path
 from loguru import logger
 
 from .model import NotificationProviderConfig
+from .sounds import SoundBank
 from src.core.directories import ASSETS_PATH
 
 if TYPE_CHECKING:
@@ -23,7 +23,7 @@ class NotificationService(QObject):
         super().__init__()
         self.notification_manager: "NotificationManager" = notification_manager
         self.config_manager: "ConfigManager" = config_manager
-        self._sound_effects: dict[str, QSoundEffect] = {}
+        self.sound_bank = SoundBank(config_manager)
         
     @property
     def notificationProviders(self):
@@ -40,6 +40,7 @@ class NotificationService(QObject):
         if provider_id not in self.config_manager.notifications.providers:
             self.config_manager.notifications.providers[provider_id] = NotificationProviderConfig()
         self.config_manager.notifications.providers[provider_id].enabled = enabled
+        self.config_manager.notify(f"notifications.providers.{provider_id}")
 
     @Slot(str, bool)
     def setNotificationProviderSystemNotify(self, provider_id: str, use_system: bool) -> None:
@@ -49,6 +50,7 @@ class NotificationService(QObject):
         if provider_id not in self.config_manager.notifications.providers:
             self.config_manager.notifications.providers[provider_id] = NotificationProviderConfig()
         self.config_manager.notifications.providers[provider_id].use_system_notify = use_system
+        self.config_manager.notify(f"notifications.providers.{provider_id}")
 
     @Slot(str, bool)
     def setNotificationProviderAppNotify(self, provider_id: str, use_app: bool) -> None:
@@ -58,6 +60,7 @@ class NotificationService(QObject):
         if provider_id not in self.config_manager.notifications.providers:
             self.config_manager.notifications.providers[provider_id] = NotificationProviderConfig()
         self.config_manager.notifications.providers[provider_id].use_app_notify = use_app
+        self.config_manager.notify(f"notifications.providers.{provider_id}")
 
     # === 声音管理方法 ===
     @Slot(int, str)
@@ -66,6 +69,7 @@ class NotificationService(QObject):
         if not hasattr(self.config_manager.notifications, 'level_sounds'):
             self.config_manager.notifications.level_sounds = {}
         self.config_manager.notifications.level_sounds[level] = sound
+        self.config_manager.notify(f"notifications.level_sounds.{level}")
         logger.debug(f"Set sound for level {level}: {sound}")
 
     @Slot(int, result=str)
@@ -145,62 +149,17 @@ class NotificationService(QObject):
 
     @Slot(str, int)
     def playNotificationSound(self, provider_id: str, level: int) -> None:
-        """播放通知级别对应的铃声"""
+        """播放通知级别对应的铃声（音效已由 SoundBank 预加载）"""
+        self.play_sound(level)
+
+    def play_sound(self, level: int, requested_at: Optional[float] = None) -> None:
+        """requested_at 为通知入队时的 time.monotonic()，用于统计播放延迟"""
         try:
             if not self.getNotificationsEnabled():
                 return
-
-            # 获取全局级别声音配置
-            global_level_sounds = getattr(self.config_manager.notifications, 'level_sounds', {})
-            # 同时尝试整数键和字符串键，确保持有配置都能正常工作
-            custom_sound = global_level_sounds.get(level) or global_level_sounds.get(str(level), "")
-
-            # 根据级别设置默认声音文件
-            level_audio_mapping = {
-                0: "info.wav",      # INFO级别
-                1: "announcement.wav", # ANNOUNCEMENT级别
-                2: "warning.wav",   # WARNING级别
-                3: "system.wav",    # SYSTEM级别
-            }
-            audio_filename = level_audio_mapping.get(level, "info.wav")
-
-            # 如果配置了自定义声音文件路径，使用自定义路径
-            if custom_sound:
-                sound_path = Path(custom_sound)
-                if sound_path.is_absolute():
-                    sound_file = str(sound_path)
-                else:
-                    sound_file = str(ASSETS_PATH / "audio" / sound_path)
-            else:
-                sound_file = str(ASSETS_PATH / "audio" / audio_filename)
-
-            # 检查声音文件是否存在
-            if not Path(sound_file).exists():
-                return
-
-            # 使用Qt的QSoundEffect播放声音
-            # 创建唯一的键来标识不同的声音效果
-            effect_key = f"{provider_id}_{level}"
-            
-            # 获取或创建声音效果对象
-            if effect_key not in self._sound_effects:
-                self._sound_effects[effect_key] = QSoundEffect()
-            
-            effect = self._sound_effects[effect_key]
-            
-            # 设置声音源
-            source_url = QUrl.fromLocalFile(sound_file)
-            effect.setSource(source_url)
-            
-            # 设置音量
-            volume = self.getNotificationVolume()
-            effect.setVolume(volume)
-            
-            # 播放声音
-            effect.play()
-            
+            self.sound_bank.play(level, requested_at)
         except Exception as e:
-            logger.error(f"Failed to play notification sound for provider {provider_id}, level {level}: {e}")
+            logger.error(f"Failed to play notification sound for level {level}: {e}")
 
     @Slot(result=bool)
     def selectNotificationSound(self) -> bool:
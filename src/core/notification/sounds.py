@@ -0,0 +1,129 @@
+"""
+通知音效库
+
+启动时（以及声音、音量配置变化时）解析每个级别对应的音频文件，
+每个不同的文件保留一个已加载好的 QSoundEffect，播放时只需调用 play()，
+不再在每次通知时检查文件、重新 setSource（会重新读取和解码）和设置音量。
+另记录从通知入队到开始播放的延迟，便于排查铃声滞后。
+"""
+from __future__ import annotations
+
+import statistics
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from PySide6.QtCore import QObject, QUrl
+from PySide6.QtMultimedia import QSoundEffect
+from loguru import logger
+
+from src.core.directories import ASSETS_PATH
+from .model import NotificationLevel
+
+if TYPE_CHECKING:
+    from src.core.config.manager import ConfigManager
+
+AUDIO_PATH = ASSETS_PATH / "audio"
+DEFAULT_SOUNDS = {
+    NotificationLevel.INFO: "info.wav",
+    NotificationLevel.ANNOUNCEMENT: "announcement.wav",
+    NotificationLevel.WARNING: "warning.wav",
+    NotificationLevel.SYSTEM: "system.wav",
+}
+LATENCY_SAMPLES = 50
+
+
+def resolve_sound(level: int, custom: Optional[str]) -> Optional[Path]:
+    """级别对应的音频文件：自定义（绝对路径或相对 assets/audio）优先，否则使用默认；不存在时为 None"""
+    if custom:
+        path = Path(custom)
+        if not path.is_absolute():
+            path = AUDIO_PATH / path
+    else:
+        path = AUDIO_PATH / DEFAULT_SOUNDS.get(level, DEFAULT_SOUNDS[NotificationLevel.INFO])
+    return path if path.is_file() else None
+
+
+class SoundBank(QObject):
+    def __init__(self, config_manager: "ConfigManager"):
+        super().__init__()
+        self.config_manager = config_manager
+        self._levels: dict[int, Path] = {}  # 级别 -> 音频文件
+        self._effects: dict[Path, QSoundEffect] = {}  # 每个文件一个已加载的音效
+        self._loaded = False
+        self._requested: dict[QSoundEffect, float] = {}  # 等待开始播放的音效 -> 请求时间
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)  # 秒
+        config_manager.configChanged.connect(self._on_config_changed)
+
+    def _on_config_changed(self, path: str):
+        if not self._loaded or path.startswith("notifications.providers"):
+            return
+        if path in ("", "notifications") or path.startswith("notifications."):
+            self.reload()
+
+    def reload(self) -> None:
+        """重新解析各级别的音频文件并预加载；已加载的文件不会重复加载"""
+        notifications = self.config_manager.notifications
+        level_sounds = getattr(notifications, "level_sounds", {}) or {}
+        volume = float(getattr(notifications, "volume", 1.0))
+
+        levels: dict[int, Path] = {}
+        for level in NotificationLevel:
+            # 同时尝试整数键和字符串键，确保旧配置也能正常工作
+            custom = level_sounds.get(int(level)) or level_sounds.get(str(int(level)), "")
+            path = resolve_sound(level, custom)
+            if path is not None:
+                levels[int(level)] = path
+
+        used = set(levels.values())
+        for path in list(self._effects):
+            if path not in used:
+                self._effects.pop(path).deleteLater()
+        for path in used:
+            effect = self._effects.get(path)
+            if effect is None:
+                effect = self._effects[path] = QSoundEffect(self)
+                effect.playingChanged.connect(lambda e=effect: self._on_playing_changed(e))
+                effect.setSource(QUrl.fromLocalFile(str(path)))
+            effect.setVolume(volume)
+
+        self._levels = levels
+        self._loaded = True
+        logger.debug(f"Sound bank loaded: {len(self._effects)} sounds for {len(levels)} levels")
+
+    def play(self, level: int, requested_at: Optional[float] = None) -> bool:
+        """
+        播放级别对应的音效
+        requested_at 为通知入队的 time.monotonic()，用于统计延迟
+        """
+        if not self._loaded:
+            self.reload()
+        path = self._levels.get(level)
+        effect = self._effects.get(path) if path else None
+        if effect is None:
+            return False
+        if effect.isPlaying():
+            effect.stop()
+        self._requested[effect] = requested_at if requested_at is not None else time.monotonic()
+        effect.play()
+        return True
+
+    def _on_playing_changed(self, effect: QSoundEffect):
+        requested = self._requested.pop(effect, None) if effect.isPlaying() else None
+        if requested is not None:
+            latency = time.monotonic() - requested
+            self.latencies.append(latency)
+            logger.debug(f"Notification sound started {latency * 1000:.1f} ms after dispatch")
+
+    def latency_stats(self) -> dict[str, float]:
+        """最近若干次从入队到开始播放的延迟（毫秒）"""
+        if not self.latencies:
+            return {}
+        samples = sorted(self.latencies)
+        return {
+            "count": len(samples),
+            "median_ms": round(statistics.median(samples) * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+            "last_ms": round(self.latencies[-1] * 1000, 2),
+        }
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
+from pydantic import ValidationError
+
 if TYPE_CHECKING:
     from src.core.schedule.model import ScheduleData
 
 from src.core.schedule.model import ScheduleData
-from src.core.utils.json_loader import JsonLoader
 from src import __SCHEDULE_SCHEMA_VERSION__
 
 
 class ScheduleParser:
     def __init__(self, path: Path | str) -> None:
         self.path: Path | str = path
-        self.loader: JsonLoader = JsonLoader(self.path)
         self.schedule: Optional[ScheduleData] = None
-        self.schedule_dict: Optional[dict] = None
+
+    @property
+    def schedule_dict(self) -> Optional[dict]:
+        return self.schedule.model_dump() if self.schedule is not None else None
 
     @staticmethod
     def validate(data: dict) -> bool:
@@ -30,23 +32,28 @@ class ScheduleParser:
         )
 
     def load(self) -> ScheduleData:
+        # pretty / compact 两种存储格式都由 pydantic-core 直接解析，不经过 json 模块和中间 dict
         try:
-            data = self.loader.load()
+            data = Path(self.path).read_bytes()
         except FileNotFoundError:
             raise FileNotFoundError("Schedule File not found")
-        except json.decoder.JSONDecodeError as e:
-            raise json.decoder.JSONDecodeError(f"JSON Decode Error: {e}", e.doc, e.pos)
         except Exception as e:
             raise ValueError(f"Unexpected error: {e}")
 
-        if not self.validate(data):
+        if not data.strip():
+            raise ValueError("Invalid Schedule File")
+        try:
+            schedule = ScheduleData.model_validate_json(data)
+        except ValidationError as e:
+            if any(err["type"] == "json_invalid" for err in e.errors()):
+                raise ValueError(f"Schedule file is not a valid JSON format: {self.path}\n详情: {e.errors()[0]['msg']}")
+            raise
+
+        # meta.version 有默认值，但文件中必须显式写出
+        if "version" not in schedule.meta.model_fields_set:
             raise ValueError("Invalid Schedule File")
-
-        schedule = ScheduleData.model_validate(data)
-
         if schedule.meta.version != __SCHEDULE_SCHEMA_VERSION__:
             raise ValueError(f"Unsupported schema version: {schedule.meta.version}")
 
         self.schedule = schedule
-        self.schedule_dict = schedule.model_dump()
         return self.schedule
@@ -1,2 +1,17 @@
-from .api import PluginAPI, CW2Plugin
-from .manager import PluginManager
\ No newline at end of file
+# 按需导入（PEP 562）：独立运行的插件进程只需要 PluginAPI 等，不加载 PluginManager 与插件宿主
+_LAZY = {
+    "PluginAPI": ".api",
+    "CW2Plugin": ".api",
+    "PluginManager": ".manager",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,6 +8,7 @@ from .components import (
     BaseAPI, WidgetsAPI, NotificationAPI, ScheduleAPI, ThemeAPI,
     RuntimeAPI, ConfigAPI, AutomationAPI, UiAPI
 )
+from .profiler import PluginProfiler
 
 # 用于 type hint 避免循环导入
 from typing import TYPE_CHECKING
@@ -23,6 +24,7 @@ class PluginAPI:
     def __init__(self, app: "AppCentral"):
         self._app = app
         self._current_plugin = None  # 当前插件上下文
+        self.profiler: PluginProfiler = PluginProfiler()  # 统计各插件的耗时
         
         self.widgets: WidgetsAPI = WidgetsAPI(self)
         self.notification: NotificationAPI = NotificationAPI(self)
@@ -33,6 +35,10 @@ class PluginAPI:
         self.automation: AutomationAPI = AutomationAPI(self)
         self.ui: 'UiAPI' = UiAPI(self)
 
+        # 插件连接到 API 信号的处理函数逐个计时
+        for name in ("widgets", "notification", "schedule", "theme", "runtime", "config", "automation", "ui"):
+            self.profiler.instrument(getattr(self, name), name)
+
     def set_current_plugin(self, plugin):
         """设置当前插件上下文"""
         self._current_plugin = plugin
@@ -1,6 +1,7 @@
+import inspect
 import sys
 from pathlib import Path
-from typing import Optional, cast
+from typing import Any, Callable, Optional, cast
 from datetime import datetime
 from PySide6.QtCore import Signal, QObject
 from loguru import logger
@@ -17,6 +18,7 @@ from src.core.plugin.models import (
     RuntimeEntryChangedPayload,
     RuntimeSubjectPayload,
     RuntimeRemainingTimePayload,
+    RuntimeSnapshot,
     SettingsPagePayload,
 )
 
@@ -124,9 +126,20 @@ class NotificationAPI(BaseAPI):
 
 
 class ScheduleAPI(BaseAPI):
+    changed = Signal(dict)  # 课表变化（revision + 变化的 subjects / days / overrides id）
+
+    def __init__(self, plugin_api):
+        super().__init__(plugin_api)
+        self._app.schedule_manager.scheduleChanged.connect(self.changed.emit)
+
     def get(self):
         return self._app.schedule_manager.schedule
 
+    @property
+    def revision(self) -> int:
+        """当前课表修订号，可作为插件侧缓存的键"""
+        return self._app.schedule_manager.revision
+
     def reload(self):
         return self._app.schedule_manager.reload()
 
@@ -147,93 +160,200 @@ class ThemeAPI(BaseAPI):
         return self._app.themeManager.current_theme
 
 
+class RuntimeSubscriptions:
+    """
+    RuntimeAPI.subscribe 的订阅表：按主题记录上次的值，只在值变化时调用回调
+    （订阅时记录当前值，之后每次运行时更新比较一次）
+    """
+    TOPICS = {
+        "entry": "current_entry",          # 当前 Entry（无时为 None）
+        "status": "current_status",        # 当前日程状态
+        "day": "current_day_entries",      # 当天日程（换天或课表变化）
+        "countdown": "remaining_time",     # 剩余时间
+    }
+    _MISSING = object()
+
+    def __init__(self, plugin_api, key_of: Callable[[str], Any]):
+        self._plugin_api = plugin_api
+        self._key_of = key_of  # 主题 -> 用于比较的值（应尽量廉价，不做序列化）
+        self._callbacks: dict[str, list[Callable]] = {topic: [] for topic in self.TOPICS}
+        self._last: dict[str, Any] = {}
+
+    def add(self, topic: str, callback: Callable) -> Callable[[], None]:
+        if topic not in self.TOPICS:
+            raise ValueError(f"Unknown runtime topic {topic!r}, expected one of: {', '.join(self.TOPICS)}")
+        profiler = self._plugin_api.profiler
+        current_plugin = self._plugin_api.current_plugin
+        plugin_id = profiler.current or (current_plugin.meta.get("id") if current_plugin else None)
+        if plugin_id:
+            callback = profiler.wrap(plugin_id, f"runtime:{topic}", callback)
+
+        callbacks = self._callbacks[topic]
+        if not callbacks:
+            self._last[topic] = self._key_of(topic)
+        callbacks.append(callback)
+
+        def unsubscribe():
+            if callback in callbacks:
+                callbacks.remove(callback)
+        return unsubscribe
+
+    def dispatch(self, snapshot: Callable[[], RuntimeSnapshot]) -> None:
+        """比较有订阅的主题，变化时以快照中的新值调用回调"""
+        for topic, callbacks in self._callbacks.items():
+            if not callbacks:
+                continue
+            key = self._key_of(topic)
+            if key == self._last.get(topic, self._MISSING):
+                continue
+            self._last[topic] = key
+            value = getattr(snapshot(), self.TOPICS[topic])
+            for callback in list(callbacks):
+                try:
+                    callback(value)
+                except Exception as e:
+                    logger.exception(f"Runtime subscriber for {topic!r} failed: {e}")
+
+
 class RuntimeAPI(BaseAPI):
     """暴露 ScheduleRuntime 的状态给插件"""
     updated = Signal()       # 课表/时间更新
     statusChanged = Signal(str)  # 当前日程状态变化
-    entryChanged = Signal(dict)  # 当前 Entry 更新（RuntimeEntryChangedPayload）
+    entryChanged = Signal(dict)  # 当前 Entry 变化（RuntimeEntryChangedPayload）
 
     def __init__(self, plugin_api):
         super().__init__(plugin_api)
         self._runtime = self._app.runtime
+        self._snapshot: Optional[RuntimeSnapshot] = None
+        self._last_entry = self._runtime.current_entry
+        self._subscriptions = RuntimeSubscriptions(plugin_api, self._topic_key)
         self._runtime.updated.connect(self._on_runtime_updated)
         self._runtime.currentsChanged.connect(lambda t: self.statusChanged.emit(t.value))
 
+    def snapshot(self) -> RuntimeSnapshot:
+        """当前状态的只读快照；同一次运行时更新内只构建一次，下面的属性都从这里读取"""
+        if self._snapshot is None:
+            self._snapshot = self._build_snapshot()
+        return self._snapshot
+
+    def subscribe(self, topic: str, callback: Callable) -> Callable[[], None]:
+        """
+        只在关注的值变化时被调用：topic 为 entry / status / day / countdown，
+        callback 收到快照中对应的新值；返回取消订阅的函数
+        """
+        return self._subscriptions.add(topic, callback)
+
     # ------------------- 时间 -------------------
     @property
     def current_time(self) -> datetime:
-        return self._runtime.current_time
+        return self.snapshot().current_time
 
     @property
     def current_day_of_week(self) -> int:
-        return self._runtime.current_day_of_week
+        return self.snapshot().current_day_of_week
 
     @property
     def current_week(self) -> int:
-        return self._runtime.current_week
+        return self.snapshot().current_week
 
     @property
     def current_week_of_cycle(self) -> int:
-        return self._runtime.current_week_of_cycle
+        return self.snapshot().current_week_of_cycle
 
     @property
     def time_offset(self) -> int:
-        return self._runtime.time_offset
+        return self.snapshot().time_offset
 
     # ------------------- 日程 -------------------
     @property
     def schedule_meta(self) -> Optional[RuntimeMetaPayload]:
-        if not self._runtime.schedule_meta:
-            return None
-        return cast(RuntimeMetaPayload, self._runtime.schedule_meta.model_dump())
+        return self.snapshot().schedule_meta
 
     @property
     def current_day_entries(self) -> list[RuntimeEntryPayload]:
-        if not self._runtime.current_day:
-            return []
-        return cast(list[RuntimeEntryPayload], [e.model_dump() for e in self._runtime.current_day.entries])
+        return list(self.snapshot().current_day_entries)
 
     @property
     def current_entry(self) -> Optional[RuntimeEntryPayload]:
-        if not self._runtime.current_entry:
-            return None
-        return cast(RuntimeEntryPayload, self._runtime.current_entry.model_dump())
+        return self.snapshot().current_entry
 
     @property
     def next_entries(self) -> list[RuntimeEntryPayload]:
-        if not self._runtime.next_entries:
-            return []
-        return cast(list[RuntimeEntryPayload], [e.model_dump() for e in self._runtime.next_entries])
+        return list(self.snapshot().next_entries)
 
     @property
     def remaining_time(self) -> RuntimeRemainingTimePayload:
-        if not self._runtime.remaining_time:
-            return {"minute": 0, "second": 0}
-        r = self._runtime.remaining_time
-        return {"minute": r.seconds // 60, "second": r.seconds % 60}
+        return self.snapshot().remaining_time
 
     @property
     def progress(self) -> float:
-        return self._runtime.get_progress_percent() or 0.0
+        return self.snapshot().progress
 
     @property
     def current_status(self) -> str:
-        return self._runtime.current_status.value if self._runtime.current_status else EntryType.FREE.value
+        return self.snapshot().current_status
 
     @property
     def current_subject(self) -> Optional[RuntimeSubjectPayload]:
-        if not self._runtime.current_subject:
-            return None
-        return cast(RuntimeSubjectPayload, self._runtime.current_subject.model_dump())
+        return self.snapshot().current_subject
 
     @property
     def current_title(self) -> Optional[str]:
-        return self._runtime.current_title
+        return self.snapshot().current_title
+
+    def _build_snapshot(self) -> RuntimeSnapshot:
+        r = self._runtime
+        remaining = r.remaining_time
+        return RuntimeSnapshot(
+            current_time=r.current_time,
+            current_day_of_week=r.current_day_of_week,
+            current_week=r.current_week,
+            current_week_of_cycle=r.current_week_of_cycle,
+            time_offset=r.time_offset,
+            schedule_meta=cast(RuntimeMetaPayload, r.schedule_meta.model_dump()) if r.schedule_meta else None,
+            current_day_entries=[e.model_dump() for e in r.current_day.entries] if r.current_day else (),
+            current_entry=cast(RuntimeEntryPayload, r.current_entry.model_dump()) if r.current_entry else None,
+            next_entries=[e.model_dump() for e in r.next_entries] if r.next_entries else (),
+            remaining_time={"minute": remaining.seconds // 60, "second": remaining.seconds % 60}
+            if remaining else {"minute": 0, "second": 0},
+            progress=r.progress,  # ScheduleRuntime 每次刷新时已算好
+            current_status=r.current_status.value if r.current_status else EntryType.FREE.value,
+            current_subject=cast(RuntimeSubjectPayload, r.current_subject.model_dump()) if r.current_subject else None,
+            current_title=r.current_title,
+        )
+
+    def _topic_key(self, topic: str) -> Any:
+        r = self._runtime
+        if topic == "entry":
+            return r.current_entry
+        if topic == "status":
+            return r.current_status
+        if topic == "day":
+            return r.current_day_of_week, r.current_day
+        return r.remaining_time
 
     def _on_runtime_updated(self):
+        self._snapshot = None
         self.updated.emit()
-        payload = cast(RuntimeEntryChangedPayload, self.current_entry or {})
-        self.entryChanged.emit(payload)
+        entry = self._runtime.current_entry
+        if entry != self._last_entry:
+            self._last_entry = entry
+            # 信号负载为副本：接收方修改它不影响共用的快照
+            self.entryChanged.emit(cast(RuntimeEntryChangedPayload, dict(self.current_entry or {})))
+        self._subscriptions.dispatch(self.snapshot)
+
+
+def plugin_on_change(callback: Callable[..., Any]) -> Callable[[str], None]:
+    """
+    兼容插件自己设置的 _on_change：旧版本以无参数调用，新版本会传入变化的路径
+    """
+    try:
+        params = inspect.signature(callback).parameters.values()
+    except (TypeError, ValueError):
+        return callback
+    if any(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.VAR_POSITIONAL) for p in params):
+        return callback
+    return lambda path="": callback()
 
 
 class ConfigAPI(BaseAPI):
@@ -246,8 +366,9 @@ class ConfigAPI(BaseAPI):
         """
         注册插件配置 Model
         """
-        if plugin_id in self._cm.plugins.configs:
-            saved_config = self._cm.plugins.configs[plugin_id]
+        store = self._cm.plugin_store
+        saved_config = store.get(plugin_id)  # 插件加载时才读取它的配置文件
+        if saved_config:
             try:
                 # 使用模型解析已保存的配置
                 validated = type(model).model_validate(saved_config)
@@ -257,28 +378,33 @@ class ConfigAPI(BaseAPI):
                         setattr(model, field, getattr(validated, field))
             except Exception as e:
                 logger.warning(f"Failed to load saved config for {plugin_id}: {e}")
-                # 如果解析失败，保存当前模型到配置
-                self._cm.plugins.configs[plugin_id] = model.model_dump()
-        else:
-            # 用模型默认值初始化
-            self._cm.plugins.configs[plugin_id] = model.model_dump()
         self._plugin_models[plugin_id] = model
+        store.bind_model(plugin_id, model)
         original_on_change = getattr(model, '_on_change', None)
+        if original_on_change:
+            original_on_change = plugin_on_change(original_on_change)
 
-        def _sync_to_config_manager():
+        def _sync_to_config_manager(path: str = ""):
             if original_on_change:
                 try:
-                    original_on_change()
+                    original_on_change(path)
                 except Exception as e:
                     logger.error(f"Error in original _on_change for {plugin_id}: {e}")
 
-            # 同步到 ConfigManager
+            # 同步到插件配置文件：只更新变化的路径，不影响主配置
             try:
-                self._cm.plugins.configs[plugin_id] = model.model_dump()
-                self._cm._config._on_change()
+                if not path:
+                    dump = model.model_dump(mode="json")
+                    if dump != store.get(plugin_id):
+                        store.replace(plugin_id, dump)
+                    return
+                value = model
+                for key in path.split("."):
+                    value = getattr(value, key)
+                store.update(plugin_id, path, value)
             except Exception as e:
                 logger.error(f"Failed to sync config for {plugin_id}: {e}")
-        model._on_change = _sync_to_config_manager
+        model._bind_on_change(_sync_to_config_manager)
         model._on_change()
 
         logger.debug(f"Plugin: {plugin_id} registered config model: {model}")
@@ -286,12 +412,22 @@ class ConfigAPI(BaseAPI):
     def get_plugin_model(self, plugin_id: str) -> Optional[ConfigBaseModel]:
         return self._plugin_models.get(plugin_id)
 
+    def batch(self):
+        """连续修改多个配置项时合并为一次通知与保存：with api.config.batch(): ..."""
+        return self._cm.batch()
+
     def save(self):
-        return self._cm.save()
+        """请求保存；与其他变更合并，在变更平息后于后台写入"""
+        return self._cm.request_save()
 
 
 class AutomationAPI(BaseAPI):
     def register(self, task):
+        profiler = self._plugin_api.profiler
+        plugin_id = profiler.current or (self.current_plugin.meta.get("id") if self.current_plugin else None)
+        if plugin_id:
+            # 每次 update() 计入该插件的耗时
+            task.update = profiler.wrap(plugin_id, f"automation:{task.name}", task.update)
         self._app.automation_manager.add_task(task)
 
 
@@ -0,0 +1,470 @@
+"""
+独立进程插件宿主（主进程一侧）
+
+选择独立运行的外部插件（cwplugin.json 中 "isolated": true，或用户在设置中开启）
+不在主进程中导入，而是在子进程（src/app.py --plugin-host）中加载，
+通过本地套接字代理 PluginAPI：运行时快照、通知、插件配置与自动化任务。
+
+- 主进程从不等待插件进程：写入只进入套接字缓冲区，积压过多时丢弃运行时更新，之后补发完整快照
+- 运行时每次更新只发送变化的字段
+- 心跳超时（插件卡住）或进程退出（崩溃）后单独重启该插件进程，短时间内多次失败则停止重启
+"""
+from __future__ import annotations
+
+import os
+import secrets
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+from PySide6.QtCore import QCoreApplication, QObject, QProcess, QProcessEnvironment, QTimer, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from loguru import logger
+from pydantic_core import to_jsonable_python
+
+from src.core.automations.base import AutomationTask
+from src.core.directories import ROOT_PATH, SRC_PATH
+from src.core.notification import NotificationData, NotificationLevel, NotificationProvider
+from src.core.plugin.ipc import TOKEN_ENV, Message, MessageBuffer, diff_snapshot, encode_message
+
+if TYPE_CHECKING:
+    from src.core.central import AppCentral
+    from src.core.plugin.api import PluginAPI
+    from src.core.plugin.components import RuntimeAPI
+    from src.core.plugin.models import PluginMeta
+
+START_TIMEOUT_MS = 15000
+STOP_TIMEOUT_MS = 3000
+HEARTBEAT_INTERVAL_MS = 5000
+HANG_TIMEOUT = 15.0  # 秒
+MAX_BACKLOG = 1024 * 1024  # 未写出的字节数超过此值时不再发送运行时更新
+RESTART_DELAYS = (1, 5, 30)  # 秒；CRASH_WINDOW 内失败次数超过此长度后不再自动重启
+CRASH_WINDOW = 600.0
+
+def runtime_snapshot(runtime: "RuntimeAPI") -> dict[str, Any]:
+    """RuntimeAPI 当前快照的可序列化形式"""
+    return to_jsonable_python(runtime.snapshot().to_dict(), fallback=str)
+
+
+def host_command(server_name: str, plugin_dir: Path) -> tuple[str, list[str]]:
+    """启动插件进程的命令（打包后直接使用主程序）"""
+    args = ["--plugin-host", server_name, str(plugin_dir)]
+    if getattr(sys, "frozen", False):
+        return sys.executable, args
+    return sys.executable, [str(SRC_PATH / "app.py"), *args]
+
+
+class RemoteAutomationTask(AutomationTask):
+    """插件进程中的自动化任务在主进程中的代理：每次 update() 只发送一条 tick"""
+
+    def __init__(self, central: "AppCentral", host: "PluginHost", task_name: str):
+        super().__init__(central)
+        self.host = host
+        self.task_name = task_name
+
+    @property
+    def name(self) -> str:
+        return f"{self.host.plugin_id}/{self.task_name}"
+
+    def update(self) -> None:
+        self.host.send({"t": "tick", "task": self.task_name})
+
+
+class PluginHost(QObject):
+    """一个独立运行的插件进程"""
+    stateChanged = Signal(str)
+
+    STOPPED = "stopped"
+    STARTING = "starting"
+    RUNNING = "running"
+    RESTARTING = "restarting"
+    FAILED = "failed"
+
+    def __init__(self, meta: "PluginMeta", pool: "PluginHostPool"):
+        super().__init__(pool)
+        self.meta = meta
+        self.plugin_id: str = meta["id"]
+        self.pool = pool
+        self.state = self.STOPPED
+
+        self._server: Optional[QLocalServer] = None
+        self._socket: Optional[QLocalSocket] = None
+        self._process: Optional[QProcess] = None
+        self._buffer = MessageBuffer()
+        self._token = ""
+        self._sent_runtime: Optional[dict[str, Any]] = None  # 插件进程已有的运行时快照
+        self._providers: dict[str, NotificationProvider] = {}
+        self._tasks: dict[str, RemoteAutomationTask] = {}
+        self._failures: deque[float] = deque()
+        self._last_seen = 0.0
+        self._stopping = False
+        self._restart_requested = False
+        self._authenticated = False
+
+        self._handlers: dict[str, Callable[..., Any]] = {
+            "notification.register_provider": self._register_provider,
+            "notification.push": self._push_notification,
+            "config.get": lambda: self.pool.app.configs.plugin_store.get(self.plugin_id),
+            "config.replace": lambda data: self.pool.app.configs.plugin_store.replace(self.plugin_id, data),
+            "config.update": lambda path, value: self.pool.app.configs.plugin_store.update(
+                self.plugin_id, path, value
+            ),
+            "automation.register": self._register_task,
+            "runtime.snapshot": self._resync_runtime,
+        }
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setInterval(HEARTBEAT_INTERVAL_MS)
+        self._heartbeat.timeout.connect(self._check_alive)
+        self._start_timer = QTimer(self)
+        self._start_timer.setSingleShot(True)
+        self._start_timer.timeout.connect(self._on_start_timeout)
+        self._restart_timer = QTimer(self)
+        self._restart_timer.setSingleShot(True)
+        self._restart_timer.timeout.connect(self.start)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            self.stateChanged.emit(state)
+
+    # 进程
+    def start(self) -> None:
+        if self._process is not None:
+            return
+        self._stopping = False
+        self._authenticated = False
+        self._token = secrets.token_hex(16)
+        self._buffer = MessageBuffer()
+        self._sent_runtime = None
+
+        self._server = QLocalServer(self)
+        name = f"cw2-plugin-{os.getpid()}-{secrets.token_hex(4)}"
+        QLocalServer.removeServer(name)
+        if not self._server.listen(name):
+            logger.error(f"Plugin host {self.plugin_id}: cannot listen on {name}: {self._server.errorString()}")
+            self._teardown()
+            self._on_failure()
+            return
+        self._server.newConnection.connect(self._on_new_connection)
+
+        self._process = QProcess(self)
+        self._process.setProcessChannelMode(QProcess.ProcessChannelMode.ForwardedChannels)
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert(TOKEN_ENV, self._token)
+        self._process.setProcessEnvironment(env)
+        self._process.setWorkingDirectory(str(ROOT_PATH))
+        self._process.finished.connect(self._on_finished)
+        self._process.errorOccurred.connect(self._on_process_error)
+        program, args = host_command(self._server.fullServerName(), Path(self.meta["_path"]))
+        self._process.start(program, args)
+
+        self._set_state(self.STARTING)
+        self._start_timer.start(START_TIMEOUT_MS)
+        logger.info(f"Starting plugin host for {self.plugin_id}")
+
+    def stop(self) -> None:
+        """请求插件进程退出（异步，超时后强制结束）"""
+        self._stopping = True
+        self._restart_timer.stop()
+        if self._process is None:
+            self._set_state(self.STOPPED)
+            return
+        self.send({"t": "stop"})
+        process = self._process
+        QTimer.singleShot(STOP_TIMEOUT_MS, lambda: self._kill(process))
+
+    def restart(self) -> None:
+        """手动重启：清除失败记录"""
+        self._failures.clear()
+        if self._process is None:
+            self.start()
+            return
+        self._restart_requested = True
+        self.stop()
+
+    def shutdown(self, timeout_ms: int = 1000) -> None:
+        """退出程序时同步结束插件进程"""
+        self._stopping = True
+        self._restart_timer.stop()
+        process = self._process
+        if process is None:
+            return
+        if self.send({"t": "stop"}):
+            self._socket.waitForBytesWritten(timeout_ms)
+        if not process.waitForFinished(timeout_ms):
+            process.kill()
+            process.waitForFinished(timeout_ms)
+
+    def _kill(self, process: Optional[QProcess] = None):
+        """结束插件进程；指定 process 时只在它仍是当前进程时结束（延迟调用时进程可能已重启）"""
+        if process is not None and process is not self._process:
+            return
+        if self._process is not None and self._process.state() != QProcess.ProcessState.NotRunning:
+            logger.warning(f"Killing plugin host {self.plugin_id}")
+            self._process.kill()
+
+    def _on_start_timeout(self):
+        if self.state == self.STARTING:
+            logger.error(f"Plugin host {self.plugin_id} did not start within {START_TIMEOUT_MS} ms")
+            self._kill()
+
+    def _on_process_error(self, error: QProcess.ProcessError):
+        logger.error(f"Plugin host {self.plugin_id} process error: {error.name}")
+        if error == QProcess.ProcessError.FailedToStart:
+            self._teardown()
+            self._on_failure()
+
+    def _on_finished(self, exit_code: int, exit_status: QProcess.ExitStatus):
+        self._teardown()
+        if self._restart_requested:
+            self._restart_requested = False
+            self.start()
+            return
+        if self._stopping:
+            logger.info(f"Plugin host {self.plugin_id} stopped")
+            self._set_state(self.STOPPED)
+            return
+        logger.error(f"Plugin host {self.plugin_id} exited unexpectedly (code {exit_code}, {exit_status.name})")
+        self._on_failure()
+
+    def _teardown(self):
+        self._heartbeat.stop()
+        self._start_timer.stop()
+        self._authenticated = False
+        for task in self._tasks.values():
+            self.pool.app.automation_manager.remove_task(task.name)
+        self._tasks.clear()
+        if self._socket is not None:
+            self._socket.abort()
+            self._socket.deleteLater()
+            self._socket = None
+        if self._server is not None:
+            self._server.close()
+            self._server.deleteLater()
+            self._server = None
+        if self._process is not None:
+            self._process.deleteLater()
+            self._process = None
+
+    def _on_failure(self):
+        now = time.monotonic()
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > CRASH_WINDOW:
+            self._failures.popleft()
+        if len(self._failures) > len(RESTART_DELAYS):
+            logger.error(f"Plugin host {self.plugin_id} failed {len(self._failures)} times, giving up")
+            self._set_state(self.FAILED)
+            self.pool.notify_failed(self)
+            return
+        delay = RESTART_DELAYS[len(self._failures) - 1]
+        logger.info(f"Restarting plugin host {self.plugin_id} in {delay} s")
+        self._set_state(self.RESTARTING)
+        self._restart_timer.start(delay * 1000)
+
+    # 通信
+    def _on_new_connection(self):
+        while self._server is not None and self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            if self._socket is not None:
+                socket.abort()
+                continue
+            self._socket = socket
+            socket.readyRead.connect(self._on_ready_read)
+            socket.disconnected.connect(self._on_disconnected)
+
+    def _on_disconnected(self):
+        if self._process is not None and not self._stopping:
+            logger.warning(f"Plugin host {self.plugin_id} disconnected")
+            process = self._process
+            QTimer.singleShot(STOP_TIMEOUT_MS, lambda: self._kill(process))
+
+    def _on_ready_read(self):
+        socket = self._socket
+        if socket is None:
+            return
+        try:
+            messages = self._buffer.feed(bytes(socket.readAll()))
+        except ValueError as e:
+            logger.error(f"Plugin host {self.plugin_id}: {e}")
+            self._kill()
+            return
+        self._last_seen = time.monotonic()
+        for message in messages:
+            self._handle(message)
+
+    def _handle(self, message: Message):
+        kind = message.get("t")
+        if not self._authenticated:
+            if kind != "hello" or not secrets.compare_digest(str(message.get("token", "")), self._token):
+                logger.error(f"Plugin host {self.plugin_id}: invalid handshake")
+                self._kill()
+                return
+            self._authenticated = True
+            snapshot = self.pool.snapshot()
+            self._sent_runtime = snapshot
+            self.send({"t": "init", "runtime": snapshot})
+            return
+        if kind == "call":
+            self._handle_call(message)
+        elif kind == "ready":
+            # 插件加载完成；此后开始心跳检测（加载时间由 START_TIMEOUT_MS 限制）
+            self._start_timer.stop()
+            self._heartbeat.start()
+            self._set_state(self.RUNNING)
+            logger.success(f"Plugin host {self.plugin_id} is running")
+
+    def _handle_call(self, message: Message):
+        call_id = message.get("id")
+        method = message.get("method", "")
+        handler = self._handlers.get(method)
+        try:
+            if handler is None:
+                raise AttributeError(f"Unknown method: {method}")
+            value = handler(*message.get("args", []))
+        except Exception as e:
+            logger.warning(f"Plugin {self.plugin_id} call {method} failed: {e}")
+            if call_id is not None:
+                self.send({"t": "error", "id": call_id, "message": str(e)})
+            return
+        if call_id is not None:
+            self.send({"t": "result", "id": call_id, "value": value})
+
+    def send(self, message: Message) -> bool:
+        """非阻塞发送；未连接时返回 False"""
+        socket = self._socket
+        if socket is None or not self._authenticated:
+            return False
+        socket.write(encode_message(message))
+        return True
+
+    def _check_alive(self):
+        if time.monotonic() - self._last_seen > HANG_TIMEOUT:
+            logger.error(f"Plugin host {self.plugin_id} has not responded for {HANG_TIMEOUT:.0f} s")
+            self._kill()
+            return
+        self.send({"t": "ping"})
+
+    # API
+    def push_runtime(self, snapshot: dict[str, Any]) -> None:
+        socket = self._socket
+        if socket is None or self.state != self.RUNNING:
+            return
+        if socket.bytesToWrite() > MAX_BACKLOG:
+            self._sent_runtime = None  # 插件进程跟不上，之后补发完整快照
+            return
+        if self._sent_runtime is None:
+            message = {"t": "runtime", "diff": snapshot, "full": True}
+        else:
+            message = {"t": "runtime", "diff": diff_snapshot(self._sent_runtime, snapshot)}
+        if self.send(message):
+            self._sent_runtime = snapshot
+
+    def _resync_runtime(self) -> dict[str, Any]:
+        self._sent_runtime = self.pool.snapshot()
+        return self._sent_runtime
+
+    def _register_provider(self, provider_id: str, name: str, icon: Optional[str] = None,
+                           use_system_notify: bool = False) -> None:
+        self._providers[provider_id] = NotificationProvider(
+            id=provider_id,
+            name=name,
+            icon=icon,
+            manager=self.pool.app.notification,
+            use_system_notify=use_system_notify,
+        )
+
+    def _push_notification(self, provider_id: str, level: int, title: str, message: Optional[str],
+                           duration: int, closable: bool) -> None:
+        provider = self._providers.get(provider_id)
+        if provider is None:
+            raise KeyError(f"Notification provider {provider_id} is not registered")
+        provider.push(level, title, message, duration, closable)
+
+    def _register_task(self, task_name: str) -> None:
+        task = self._tasks.get(task_name)
+        if task is None:
+            task = self._tasks[task_name] = RemoteAutomationTask(self.pool.app, self, task_name)
+        self.pool.app.automation_manager.add_task(task)
+
+
+class PluginHostPool(QObject):
+    """管理全部插件进程，并把 API 信号转发给它们"""
+    hostStateChanged = Signal(str, str)  # plugin_id, state
+
+    def __init__(self, api: "PluginAPI", app_central: "AppCentral"):
+        super().__init__()
+        self.api = api
+        self.app = app_central
+        self.hosts: dict[str, PluginHost] = {}
+        self._snapshot: Optional[dict[str, Any]] = None
+
+        api.runtime.updated.connect(self._on_runtime_updated)
+        api.runtime.statusChanged.connect(lambda status: self.broadcast("runtime.statusChanged", status))
+        api.notification.pushed.connect(lambda payload: self.broadcast("notification.pushed", payload))
+        api.schedule.changed.connect(lambda change: self.broadcast("schedule.changed", change))
+        api.theme.changed.connect(lambda theme_id: self.broadcast("theme.changed", theme_id))
+
+    def snapshot(self) -> dict[str, Any]:
+        if self._snapshot is None:
+            self._snapshot = runtime_snapshot(self.api.runtime)
+        return self._snapshot
+
+    def start(self, meta: "PluginMeta") -> PluginHost:
+        host = self.hosts.get(meta["id"])
+        if host is None:
+            host = self.hosts[meta["id"]] = PluginHost(meta, self)
+            host.stateChanged.connect(lambda state, pid=meta["id"]: self.hostStateChanged.emit(pid, state))
+        host.start()
+        return host
+
+    def stop(self, plugin_id: str, wait: bool = False) -> None:
+        host = self.hosts.pop(plugin_id, None)
+        if host is None:
+            return
+        if wait:
+            host.shutdown()
+        else:
+            host.stop()
+
+    def restart(self, plugin_id: str) -> bool:
+        host = self.hosts.get(plugin_id)
+        if host is None:
+            return False
+        host.restart()
+        return True
+
+    def shutdown(self) -> None:
+        for host in self.hosts.values():
+            host.shutdown()
+
+    def state(self, plugin_id: str) -> str:
+        host = self.hosts.get(plugin_id)
+        return host.state if host else PluginHost.STOPPED
+
+    def broadcast(self, name: str, *args) -> None:
+        for host in self.hosts.values():
+            host.send({"t": "event", "name": name, "args": list(args)})
+
+    def notify_failed(self, host: PluginHost) -> None:
+        name = host.meta.get("name", host.plugin_id)
+        self.app.notification.dispatch(NotificationData(
+            provider_id="com.classwidgets.plugins",
+            level=NotificationLevel.WARNING,
+            title=QCoreApplication.translate("PluginHost", "Plugin stopped"),
+            message=QCoreApplication.translate(
+                "PluginHost", "{name} kept crashing or stopped responding and has been stopped."
+            ).format(name=name),
+            duration=10000,
+            silent=True,
+        ))
+
+    def _on_runtime_updated(self):
+        self._snapshot = None
+        if not any(host.state == PluginHost.RUNNING for host in self.hosts.values()):
+            return
+        snapshot = self.snapshot()  # 所有插件进程共用同一份快照
+        for host in self.hosts.values():
+            host.push_runtime(snapshot)
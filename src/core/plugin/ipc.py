@@ -0,0 +1,63 @@
+"""
+独立进程插件的 IPC 协议
+
+主进程与插件进程通过本地套接字（QLocalServer / QLocalSocket）通信，
+每条消息为 4 字节大端长度 + JSON（pydantic-core 序列化）。
+
+消息（"t" 为类型）：
+- 插件进程 -> 主进程
+  hello   {token}                      连接后第一条，token 不符时断开
+  call    {id?, method, args}          调用主进程的 API；带 id 时需要回复 result / error
+  pong    {}                           心跳回复
+- 主进程 -> 插件进程
+  init    {meta, runtime}              连接成功，附带完整的运行时快照
+  runtime {diff, full}                 运行时快照中变化的字段（full 为 true 时为完整快照）
+  event   {name, args}                 其他 API 信号，如 notification.pushed
+  tick    {task}                       执行一次已注册的自动化任务
+  result  {id, value} / error {id, message}
+  ping    {}
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+from pydantic_core import from_json, to_json
+
+TOKEN_ENV = "CW2_PLUGIN_HOST_TOKEN"  # 主进程通过环境变量把握手 token 交给插件进程
+HEADER = struct.Struct(">I")
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+type Message = dict[str, Any]
+
+
+def encode_message(message: Message) -> bytes:
+    body = to_json(message, fallback=str)
+    return HEADER.pack(len(body)) + body
+
+
+class MessageBuffer:
+    """按长度前缀拆分收到的字节流；不完整的消息留到下次"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[Message]:
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= HEADER.size:
+            (size,) = HEADER.unpack_from(self._buffer)
+            if size > MAX_MESSAGE_SIZE:
+                self._buffer.clear()
+                raise ValueError(f"IPC message too large: {size} bytes")
+            end = HEADER.size + size
+            if len(self._buffer) < end:
+                break
+            messages.append(from_json(bytes(self._buffer[HEADER.size:end])))
+            del self._buffer[:end]
+        return messages
+
+
+def diff_snapshot(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """新快照中与旧快照不同的字段"""
+    return {key: value for key, value in new.items() if key not in old or old[key] != value}
@@ -204,7 +204,8 @@ class PluginLoader:
                 )
             
             PluginClass = meta["_class"]
-            plugin_instance = PluginClass(self.api)
+            with self.api.profiler.measure(plugin_id, "init"):
+                plugin_instance = PluginClass(self.api)
             
             # 注入PATH和meta
             plugin_instance.PATH = meta["_path"]
@@ -213,7 +214,8 @@ class PluginLoader:
             if not isinstance(plugin_instance, CW2Plugin):
                 raise TypeError("Builtin plugin must inherit from CW2Plugin")
             
-            plugin_instance.on_load()
+            with self.api.profiler.measure(plugin_id, "on_load"):
+                plugin_instance.on_load()
             logger.success(f"Loaded builtin plugin {meta['name']} ({plugin_id}) v{meta['version']}")
             return plugin_instance
             
@@ -270,7 +272,8 @@ class PluginLoader:
                 PluginClass = getattr(module, "Plugin")
                 
                 try:
-                    plugin_instance = PluginClass(self.api)
+                    with self.api.profiler.measure(plugin_id, "init"):
+                        plugin_instance = PluginClass(self.api)
                 except Exception as e:
                     logger.exception(f"Failed to instantiate plugin {plugin_id}: {e}")
                     cleanup()
@@ -285,7 +288,8 @@ class PluginLoader:
                     raise TypeError("Plugin class must inherit from CW2Plugin (runtime class)")
                 
                 try:
-                    plugin_instance.on_load()
+                    with self.api.profiler.measure(plugin_id, "on_load"):
+                        plugin_instance.on_load()
                 except Exception as e:
                     logger.exception(f"Plugin {plugin_id} on_load raised: {e}")
                     try:
@@ -13,6 +13,7 @@ from loguru import logger
 from src.core.directories import PLUGINS_PATH
 from src.core.plugin import CW2Plugin, PluginAPI
 from src.core.plugin.loader import PluginLoader, check_api_version
+from src.core.plugin.host import PluginHostPool
 from src.core.plugin.models import PluginMeta, PluginConflict
 from src.core.plugin.worker import PluginImportWorker
 from src.core.plugin.api import __version__ as __API_VERSION__
@@ -27,6 +28,7 @@ class PluginManager(QObject):
     pluginListChanged = Signal()
     pluginImportSucceeded = Signal()
     pluginImportFailed = Signal(str)
+    pluginHostStateChanged = Signal(str, str)  # plugin_id, state
 
     def __init__(self, plugin_api: PluginAPI, app_central: "AppCentral"):
         """
@@ -46,6 +48,9 @@ class PluginManager(QObject):
 
         # 创建 PluginLoader 实例
         self.loader: PluginLoader = PluginLoader(plugin_api, self.external_path)
+        # 独立进程运行的插件
+        self.hosts: PluginHostPool = PluginHostPool(plugin_api, app_central)
+        self.hosts.hostStateChanged.connect(self.pluginHostStateChanged)
 
         # 连接到 retranslate 信号
         app_central.retranslate.connect(self._on_retranslate)
@@ -119,8 +124,22 @@ class PluginManager(QObject):
     
     # 加载启用插件
     def load_plugins(self) -> None:
-        """加载已启用的插件实例（批量）"""
-        self._plugins = self.loader.load_plugins(self.metas, list(self.enabled_plugins))
+        """加载已启用的插件实例（批量）；独立运行的插件在各自的进程中加载"""
+        in_process = []
+        for pid in self.enabled_plugins:
+            meta = next((m for m in self.metas if m["id"] == pid), None)
+            if meta and self.is_isolated(meta):
+                logger.info(f"Loading plugin {meta['name']} ({pid}) v{meta['version']} in a separate process")
+                self.hosts.start(meta)
+            else:
+                in_process.append(pid)
+        self._plugins = self.loader.load_plugins(self.metas, in_process)
+
+    def is_isolated(self, meta: PluginMeta) -> bool:
+        """外部插件可以在 cwplugin.json 中声明 "isolated": true，或由用户在设置中开启"""
+        if meta.get("_type") == "builtin":
+            return False
+        return bool(meta.get("isolated")) or meta["id"] in self.app_central.configs.plugins.isolated
 
     def _on_retranslate(self) -> None:
         """翻译变更时重新扫描插件以更新翻译"""
@@ -152,6 +171,7 @@ class PluginManager(QObject):
 
     def cleanup(self) -> None:
         """卸载全部插件（用于退出时）"""
+        self.hosts.shutdown()
         for pid, plugin in list(self._plugins.items()):
             try:
                 plugin.on_unload()
@@ -335,6 +355,30 @@ class PluginManager(QObject):
         self.app_central.configs.plugins.enabled = list(self.enabled_plugins)
         self.pluginListChanged.emit()
 
+    @Slot(str, result=bool)
+    def isPluginIsolated(self, pid: str) -> bool:
+        meta = next((m for m in self.metas if m["id"] == pid), None)
+        return bool(meta) and self.is_isolated(meta)
+
+    @Slot(str, bool)
+    def setPluginIsolated(self, pid: str, isolated: bool):
+        """切换插件是否在独立进程中运行（重启后生效）"""
+        current = [p for p in self.app_central.configs.plugins.isolated if p != pid]
+        if isolated:
+            current.append(pid)
+        self.app_central.configs.plugins.isolated = current
+        self.pluginListChanged.emit()
+
+    @Slot(str, result=str)
+    def pluginHostState(self, pid: str) -> str:
+        """独立运行插件的进程状态：stopped / starting / running / restarting / failed"""
+        return self.hosts.state(pid)
+
+    @Slot(str, result=bool)
+    def restartPluginHost(self, pid: str) -> bool:
+        """单独重启插件进程，不影响主程序与其他插件"""
+        return self.hosts.restart(pid)
+
     @Slot(str, result=bool)
     def openPluginFolder(self, pid: str) -> bool:
         """
@@ -374,6 +418,7 @@ class PluginManager(QObject):
 
         try:
             # 终止插件运行
+            self.hosts.stop(pid, wait=True)
             if pid in self._plugins:
                 try:
                     self._plugins[pid].on_unload()
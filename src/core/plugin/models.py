@@ -1,5 +1,8 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
 from pathlib import Path
-from typing import NotRequired, Optional, TypedDict
+from types import MappingProxyType
+from typing import Any, Mapping, NotRequired, Optional, TypedDict
 
 from PySide6.QtCore import QUrl
 
@@ -52,6 +55,57 @@ class RuntimeRemainingTimePayload(TypedDict):
     second: int
 
 
+def _freeze(value: Any) -> Any:
+    """dict -> 只读 MappingProxyType，list -> tuple（递归）"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeSnapshot:
+    """
+    RuntimeAPI 某一时刻的完整状态（每次运行时更新只构建一次，各插件共用）
+    其中的 Entry / 科目等负载为只读映射（MappingProxyType），列表为 tuple；需要修改时用 to_dict() 取副本
+    """
+    current_time: Optional[datetime]
+    current_day_of_week: int
+    current_week: int
+    current_week_of_cycle: int
+    time_offset: int
+    schedule_meta: Optional[RuntimeMetaPayload]
+    current_day_entries: tuple[RuntimeEntryPayload, ...]
+    current_entry: Optional[RuntimeEntryPayload]
+    next_entries: tuple[RuntimeEntryPayload, ...]
+    remaining_time: RuntimeRemainingTimePayload
+    progress: float
+    current_status: str
+    current_subject: Optional[RuntimeSubjectPayload]
+    current_title: Optional[str]
+
+    def __post_init__(self):
+        for name in ("schedule_meta", "current_day_entries", "current_entry", "next_entries",
+                     "remaining_time", "current_subject"):
+            object.__setattr__(self, name, _freeze(getattr(self, name)))
+
+    def to_dict(self) -> dict[str, Any]:
+        """普通 dict / list 组成的副本，可修改、可序列化"""
+        return {name: _thaw(getattr(self, name)) for name in RUNTIME_FIELDS}
+
+
+RUNTIME_FIELDS = tuple(f.name for f in fields(RuntimeSnapshot))
+
+
 class SettingsPagePayload(TypedDict):
     id: str
     page: str
@@ -67,6 +121,7 @@ class PluginMeta(TypedDict, total=False):
     entry: str
     author: str
     icon: str | QUrl
+    isolated: bool  # 在独立进程中运行
     _type: str
     _class: type
     _path: Optional[Path]
@@ -0,0 +1,241 @@
+"""
+插件性能分析
+
+插件与界面运行在同一个线程中，界面卡顿时用来找出是哪个插件耗时：
+- PluginLoader 加载插件时统计构造与 on_load 的耗时
+- 插件通过 API 信号（如 api.runtime.updated）连接的每个处理函数，每次调用都计时
+- 插件通过 AutomationAPI 注册的自动化任务，每次 update() 都计时
+
+每个（插件, 钩子）记录调用次数、墙钟时间与 CPU 时间（当前线程）以及耗时直方图，
+在调试器中查看，也可以导出为 JSON。
+"""
+from __future__ import annotations
+
+import bisect
+import inspect
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Optional
+
+from PySide6.QtCore import QObject, Property, Signal, SignalInstance, Slot, QTimer
+from loguru import logger
+
+from src.core.directories import LOGS_PATH
+
+# 直方图各桶的上界（毫秒），最后一个桶收集更慢的调用
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+SLOW_CALL_MS = 100  # 超过此耗时的调用记录警告
+REFRESH_INTERVAL_MS = 1000
+
+
+@dataclass(slots=True)
+class HookStats:
+    count: int = 0
+    errors: int = 0
+    wall: float = 0.0  # 秒
+    cpu: float = 0.0  # 秒
+    max: float = 0.0  # 秒
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKET_BOUNDS_MS) + 1))
+
+    def add(self, wall: float, cpu: float):
+        self.count += 1
+        self.wall += wall
+        self.cpu += cpu
+        self.max = max(self.max, wall)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, wall * 1000)] += 1
+
+    def percentile(self, q: float) -> float:
+        """由直方图估算的分位数（毫秒，取所在桶的上界）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else round(self.max * 1000, 3)
+        return round(self.max * 1000, 3)
+
+
+def _max_args(func: Callable) -> Optional[int]:
+    """处理函数最多接收几个位置参数（None 为不限），与 Qt 一样多余的信号参数不传入"""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    count = 0
+    for p in parameters:
+        if p.kind == inspect.Parameter.VAR_POSITIONAL:
+            return None
+        if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+            count += 1
+    return count
+
+
+class ProfiledSignal:
+    """
+    替代 API 对象上的信号实例：在插件上下文中 connect 的处理函数会被计时，
+    其余用法（emit、disconnect、连接到其他信号）与原信号相同
+    """
+
+    def __init__(self, signal: SignalInstance, hook: str, profiler: "PluginProfiler"):
+        self._signal = signal
+        self._hook = hook
+        self._profiler = profiler
+        self._wrapped: dict[Callable, Callable] = {}
+
+    def connect(self, slot: Callable, *args):
+        plugin_id = self._profiler.current
+        if plugin_id is None or isinstance(slot, (SignalInstance, ProfiledSignal)):
+            return self._signal.connect(slot, *args)
+        wrapped = self._profiler.wrap(plugin_id, f"signal:{self._hook}", slot, _max_args(slot))
+        self._wrapped[slot] = wrapped
+        return self._signal.connect(wrapped, *args)
+
+    def disconnect(self, slot: Optional[Callable] = None):
+        if slot is None:
+            self._wrapped.clear()
+            return self._signal.disconnect()
+        return self._signal.disconnect(self._wrapped.pop(slot, slot))
+
+    def emit(self, *args):
+        return self._signal.emit(*args)
+
+    __call__ = emit  # 可以作为其他信号的槽
+
+    def __getattr__(self, name: str):
+        return getattr(self._signal, name)
+
+
+class PluginProfiler(QObject):
+    statsChanged = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = True
+        self._stats: dict[tuple[str, str], HookStats] = {}
+        self._context: list[str] = []  # 正在执行的插件（可嵌套）
+        self._started = time.time()
+        self._dirty = False
+        # 调用很频繁，统计结果按固定间隔通知界面
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self._notify)
+        self._refresh_timer.start()
+
+    @property
+    def current(self) -> Optional[str]:
+        """当前正在执行的插件 ID（不在插件代码中时为 None）"""
+        return self._context[-1] if self._context else None
+
+    def record(self, plugin_id: str, hook: str, wall: float, cpu: float, error: bool = False) -> None:
+        stats = self._stats.get((plugin_id, hook))
+        if stats is None:
+            stats = self._stats[(plugin_id, hook)] = HookStats()
+        stats.add(wall, cpu)
+        if error:
+            stats.errors += 1
+        self._dirty = True
+        if wall * 1000 >= SLOW_CALL_MS:
+            logger.warning(f"Plugin {plugin_id} blocked the UI thread for {wall * 1000:.1f} ms in {hook}")
+
+    @contextmanager
+    def measure(self, plugin_id: str, hook: str) -> Iterator[None]:
+        """统计代码块的耗时，并将其中连接的信号处理函数归属于该插件"""
+        self._context.append(plugin_id)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._context.pop()
+            if self.enabled:
+                self.record(plugin_id, hook, time.perf_counter() - wall, time.thread_time() - cpu, error)
+
+    def wrap(self, plugin_id: str, hook: str, func: Callable, max_args: Optional[int] = None) -> Callable:
+        @wraps(func)
+        def profiled(*args):
+            if max_args is not None:
+                args = args[:max_args]
+            with self.measure(plugin_id, hook):
+                return func(*args)
+        return profiled
+
+    def instrument(self, api: QObject, name: str) -> None:
+        """将 API 对象上的全部信号替换为 ProfiledSignal（在内部连接完成之后调用）"""
+        for attr, value in vars(type(api)).items():
+            if isinstance(value, Signal) and not attr.startswith("_"):
+                setattr(api, attr, ProfiledSignal(getattr(api, attr), f"{name}.{attr}", self))
+
+    # 结果
+    def summary(self) -> list[dict[str, Any]]:
+        """按总耗时从高到低排列"""
+        rows = []
+        for (plugin_id, hook), s in self._stats.items():
+            rows.append({
+                "plugin": plugin_id,
+                "hook": hook,
+                "count": s.count,
+                "errors": s.errors,
+                "total_ms": round(s.wall * 1000, 3),
+                "cpu_ms": round(s.cpu * 1000, 3),
+                "mean_ms": round(s.wall * 1000 / s.count, 3) if s.count else 0.0,
+                "p50_ms": s.percentile(0.5),
+                "p95_ms": s.percentile(0.95),
+                "max_ms": round(s.max * 1000, 3),
+                "buckets": list(s.buckets),
+            })
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows
+
+    def export(self, path: Optional[Path] = None) -> Path:
+        if path is None:
+            path = LOGS_PATH / f"plugin-profile-{datetime.now():%Y%m%d-%H%M%S}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "started": datetime.fromtimestamp(self._started).isoformat(timespec="seconds"),
+            "exported": datetime.now().isoformat(timespec="seconds"),
+            "bucket_bounds_ms": list(BUCKET_BOUNDS_MS),
+            "hooks": self.summary(),
+        }
+        path.write_text(json.dumps(report, indent=4, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"Plugin profile exported to {path}")
+        return path
+
+    def _notify(self):
+        if self._dirty:
+            self._dirty = False
+            self.statsChanged.emit()
+
+    # QML
+    @Property(list, notify=statsChanged)
+    def stats(self) -> list[dict[str, Any]]:
+        return self.summary()
+
+    @Property(list, constant=True)
+    def bucketBounds(self) -> list[float]:
+        return list(BUCKET_BOUNDS_MS)
+
+    @Slot()
+    def reset(self) -> None:
+        self._stats.clear()
+        self._started = time.time()
+        self.statsChanged.emit()
+
+    @Slot(result=str)
+    def exportReport(self) -> str:
+        try:
+            return str(self.export())
+        except OSError as e:
+            logger.error(f"Failed to export plugin profile: {e}")
+            return ""
@@ -0,0 +1,426 @@
+"""
+独立进程插件宿主（插件进程一侧）
+
+由 src/app.py --plugin-host <server> <plugin_dir> 启动：连接主进程，
+用 RemotePluginAPI 代替 PluginAPI 加载插件。RemotePluginAPI 的属性与信号与 PluginAPI 相同，
+其中运行时、通知、插件配置与自动化任务通过 IPC 代理；需要主进程内对象的接口
+（注册小组件、设置页面，读取课表与主题对象）在独立进程中不可用。
+"""
+from __future__ import annotations
+
+import contextlib
+import itertools
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from PySide6.QtCore import QCoreApplication, QObject, QTimer, Signal
+from PySide6.QtNetwork import QLocalSocket
+from loguru import logger
+from pydantic_core import to_jsonable_python
+
+from src.core.config.model import ConfigBaseModel
+from src.core.plugin.components import RuntimeSubscriptions, plugin_on_change
+from src.core.plugin.ipc import TOKEN_ENV, Message, MessageBuffer, encode_message
+from src.core.plugin.models import RUNTIME_FIELDS, RuntimeSnapshot
+from src.core.plugin.profiler import PluginProfiler
+
+CONNECT_TIMEOUT_MS = 10000
+CALL_TIMEOUT_MS = 10000
+
+
+class RemoteConnection(QObject):
+    """到主进程的连接；call(..., wait=True) 会阻塞插件进程直到收到回复"""
+    messageReceived = Signal(dict)
+    closed = Signal()
+
+    def __init__(self, server_name: str, token: str):
+        super().__init__()
+        self.server_name = server_name
+        self.token = token
+        self._socket = QLocalSocket(self)
+        self._buffer = MessageBuffer()
+        self._ids = itertools.count(1)
+        self._results: dict[int, Message] = {}
+        self._queued: list[Message] = []  # 等待回复期间收到的其他消息，稍后处理
+        self._blocking = False  # 同步等待期间 waitForReadyRead 也会发出 readyRead，由等待循环读取
+        self._socket.readyRead.connect(self._on_ready_read)
+        self._socket.disconnected.connect(self.closed)
+
+    def open(self) -> bool:
+        self._socket.connectToServer(self.server_name)
+        if not self._socket.waitForConnected(CONNECT_TIMEOUT_MS):
+            logger.error(f"Cannot connect to {self.server_name}: {self._socket.errorString()}")
+            return False
+        self.send({"t": "hello", "token": self.token})
+        return True
+
+    def send(self, message: Message) -> None:
+        self._socket.write(encode_message(message))
+        self._socket.flush()
+
+    def call(self, method: str, *args, wait: bool = False) -> Any:
+        message: Message = {"t": "call", "method": method, "args": to_jsonable_python(args, fallback=str)}
+        if not wait:
+            self.send(message)
+            return None
+        call_id = message["id"] = next(self._ids)
+        self.send(message)
+        with self._waiting():
+            while call_id not in self._results:
+                if not self._socket.waitForReadyRead(CALL_TIMEOUT_MS):
+                    raise TimeoutError(f"No reply to {method}")
+                self._read(dispatch=False)
+        reply = self._results.pop(call_id)
+        if reply["t"] == "error":
+            raise RuntimeError(reply.get("message", f"{method} failed"))
+        return reply.get("value")
+
+    def wait_for(self, kind: str) -> Optional[Message]:
+        """等待某类消息（用于启动时等待 init）"""
+        with self._waiting():
+            while True:
+                for message in self._queued:
+                    if message.get("t") == kind:
+                        self._queued.remove(message)
+                        return message
+                if not self._socket.waitForReadyRead(CONNECT_TIMEOUT_MS):
+                    return None
+                self._read(dispatch=False)
+
+    @contextlib.contextmanager
+    def _waiting(self):
+        previous, self._blocking = self._blocking, True
+        try:
+            yield
+        finally:
+            self._blocking = previous
+
+    def _on_ready_read(self):
+        if not self._blocking:
+            self._read(dispatch=True)
+
+    def _read(self, dispatch: bool):
+        for message in self._buffer.feed(bytes(self._socket.readAll())):
+            if message.get("t") in ("result", "error"):
+                self._results[message["id"]] = message
+            else:
+                self._queued.append(message)
+        if dispatch:
+            self._dispatch()
+        elif self._queued:
+            QTimer.singleShot(0, self._dispatch)
+
+    def _dispatch(self):
+        queued, self._queued = self._queued, []
+        for message in queued:
+            self.messageReceived.emit(message)
+
+
+def _unavailable(name: str):
+    raise RuntimeError(f"{name} is not available to plugins running in a separate process")
+
+
+class RemoteComponent(QObject):
+    def __init__(self, api: "RemotePluginAPI"):
+        super().__init__()
+        self._plugin_api = api
+
+    @property
+    def current_plugin(self):
+        return self._plugin_api.current_plugin
+
+    @property
+    def _connection(self) -> RemoteConnection:
+        return self._plugin_api.connection
+
+    def _resolve_path(self, path: str | Path) -> Path:
+        path = Path(path)
+        if not path.is_absolute() and self.current_plugin:
+            path = self.current_plugin.PATH / path
+        return path
+
+
+class RemoteWidgetsAPI(RemoteComponent):
+    def register(self, *args, **kwargs) -> None:
+        _unavailable("WidgetsAPI.register")
+
+
+class RemoteNotificationProvider(QObject):
+    """与 NotificationProvider.push 签名相同，通知由主进程发送"""
+
+    def __init__(self, connection: RemoteConnection, id: str, name: str,
+                 icon: Optional[str] = None, use_system_notify: bool = False):
+        super().__init__()
+        self.id = id
+        self.name = name
+        self.icon = icon
+        self.use_system_notify = use_system_notify
+        self._connection = connection
+        connection.call("notification.register_provider", id, name, icon, use_system_notify)
+
+    def push(self, level: int, title: str, message: Optional[str] = None,
+             duration: int = 4000, closable: bool = True) -> None:
+        self._connection.call("notification.push", self.id, int(level), title, message, duration, closable)
+
+
+class RemoteNotificationAPI(RemoteComponent):
+    pushed = Signal(dict)
+
+    def get_provider(self, provider_id: str, name: str = None, icon: Optional[str | Path] = None,
+                     use_system_notify: bool = False) -> RemoteNotificationProvider:
+        return self.register_provider(provider_id, name, icon, use_system_notify)
+
+    def register_provider(self, provider_id: str, name: str = None, icon: Optional[str | Path] = None,
+                          use_system_notify: bool = False) -> RemoteNotificationProvider:
+        if name is None:
+            name = f"Plugin Provider ({provider_id})"
+        icon_uri = self._resolve_path(icon).as_uri() if icon else None
+        return RemoteNotificationProvider(self._connection, provider_id, name, icon_uri, use_system_notify)
+
+
+class RemoteScheduleAPI(RemoteComponent):
+    changed = Signal(dict)
+
+    def get(self):
+        _unavailable("ScheduleAPI.get")
+
+    def reload(self):
+        _unavailable("ScheduleAPI.reload")
+
+
+class RemoteThemeAPI(RemoteComponent):
+    changed = Signal(str)
+
+    def __init__(self, api: "RemotePluginAPI"):
+        super().__init__(api)
+        self._current: Optional[str] = None
+        self.changed.connect(self._set_current)
+
+    def _set_current(self, theme_id: str):
+        self._current = theme_id
+
+    def current(self) -> Optional[str]:
+        return self._current
+
+
+class RemoteRuntimeAPI(RemoteComponent):
+    """由主进程推送的快照提供与 RuntimeAPI 相同的属性"""
+    updated = Signal()
+    statusChanged = Signal(str)
+    entryChanged = Signal(dict)
+
+    def __init__(self, api: "RemotePluginAPI"):
+        super().__init__(api)
+        self._values: dict[str, Any] = dict.fromkeys(RUNTIME_FIELDS)
+        self._snapshot: Optional[RuntimeSnapshot] = None
+        self._subscriptions = RuntimeSubscriptions(api, self._topic_key)
+
+    def apply(self, diff: dict[str, Any], full: bool = False) -> None:
+        if full:
+            self._values = dict.fromkeys(RUNTIME_FIELDS)
+        self._values.update(diff)
+        self._snapshot = None
+        self.updated.emit()
+        if full or "current_entry" in diff:
+            self.entryChanged.emit(dict(self._values["current_entry"] or {}))
+        self._subscriptions.dispatch(self.snapshot)
+
+    def snapshot(self) -> RuntimeSnapshot:
+        if self._snapshot is None:
+            values = dict(self._values)
+            values["current_time"] = datetime.fromisoformat(values["current_time"]) if values["current_time"] else None
+            for name in ("current_day_entries", "next_entries"):
+                values[name] = values[name] or ()
+            self._snapshot = RuntimeSnapshot(**values)
+        return self._snapshot
+
+    def subscribe(self, topic: str, callback: Callable) -> Callable[[], None]:
+        return self._subscriptions.add(topic, callback)
+
+    def _topic_key(self, topic: str) -> Any:
+        if topic == "day":
+            return self._values["current_day_of_week"], self._values["current_day_entries"]
+        return self._values[RuntimeSubscriptions.TOPICS[topic]]
+
+    def __getattr__(self, name: str):
+        if name in RUNTIME_FIELDS:
+            value = getattr(self.snapshot(), name)
+            return list(value) if isinstance(value, tuple) else value
+        raise AttributeError(name)
+
+
+class RemoteConfigAPI(RemoteComponent):
+    def __init__(self, api: "RemotePluginAPI"):
+        super().__init__(api)
+        self._plugin_models: dict[str, ConfigBaseModel] = {}
+
+    def register_plugin_model(self, plugin_id: str, model: ConfigBaseModel):
+        """与 ConfigAPI 相同；配置保存在主进程中（只能访问本插件的配置）"""
+        if self.current_plugin and plugin_id != self.current_plugin.meta.get("id"):
+            raise ValueError("Plugins running in a separate process can only register their own config")
+        saved_config = self._connection.call("config.get", wait=True)
+        if saved_config:
+            try:
+                validated = type(model).model_validate(saved_config)
+                for field in type(model).model_fields:
+                    setattr(model, field, getattr(validated, field))
+            except Exception as e:
+                logger.warning(f"Failed to load saved config for {plugin_id}: {e}")
+        self._plugin_models[plugin_id] = model
+        original_on_change = getattr(model, '_on_change', None)
+        if original_on_change:
+            original_on_change = plugin_on_change(original_on_change)
+
+        def _sync_to_host(path: str = ""):
+            if original_on_change:
+                try:
+                    original_on_change(path)
+                except Exception as e:
+                    logger.error(f"Error in original _on_change for {plugin_id}: {e}")
+            if not path:
+                self._connection.call("config.replace", model.model_dump(mode="json"))
+                return
+            value = model
+            for key in path.split("."):
+                value = getattr(value, key)
+            self._connection.call("config.update", path, value)
+        model._bind_on_change(_sync_to_host)
+        model._on_change()
+
+    def get_plugin_model(self, plugin_id: str) -> Optional[ConfigBaseModel]:
+        return self._plugin_models.get(plugin_id)
+
+    def batch(self):
+        return contextlib.nullcontext()
+
+    def save(self):
+        return None  # 由主进程保存
+
+
+class RemoteAutomationAPI(RemoteComponent):
+    def __init__(self, api: "RemotePluginAPI"):
+        super().__init__(api)
+        self.tasks: dict[str, Any] = {}
+
+    def register(self, task):
+        self.tasks[task.name] = task
+        self._connection.call("automation.register", task.name)
+
+    def run(self, name: str) -> None:
+        task = self.tasks.get(name)
+        if task is None or not getattr(task, "enabled", True):
+            return
+        try:
+            task.update()
+        except Exception as e:
+            logger.error(f"Error executing task '{name}': {e}")
+
+
+class RemoteUiAPI(RemoteComponent):
+    settingsPageRegistered = Signal()
+
+    @property
+    def pages(self):
+        return []
+
+    def register_settings_page(self, *args, **kwargs):
+        _unavailable("UiAPI.register_settings_page")
+
+    def unregister_settings_page(self, *args, **kwargs):
+        _unavailable("UiAPI.unregister_settings_page")
+
+
+class RemotePluginAPI:
+    """插件进程中的 PluginAPI"""
+
+    def __init__(self, connection: RemoteConnection):
+        self._app = None
+        self._current_plugin = None
+        self.connection = connection
+        self.profiler = PluginProfiler()
+
+        self.widgets = RemoteWidgetsAPI(self)
+        self.notification = RemoteNotificationAPI(self)
+        self.schedule = RemoteScheduleAPI(self)
+        self.theme = RemoteThemeAPI(self)
+        self.runtime = RemoteRuntimeAPI(self)
+        self.config = RemoteConfigAPI(self)
+        self.automation = RemoteAutomationAPI(self)
+        self.ui = RemoteUiAPI(self)
+
+        self._events = {
+            "runtime.statusChanged": self.runtime.statusChanged,
+            "notification.pushed": self.notification.pushed,
+            "schedule.changed": self.schedule.changed,
+            "theme.changed": self.theme.changed,
+        }
+        connection.messageReceived.connect(self._on_message)
+
+    def set_current_plugin(self, plugin):
+        self._current_plugin = plugin
+
+    @property
+    def current_plugin(self):
+        return self._current_plugin
+
+    def _on_message(self, message: Message):
+        kind = message.get("t")
+        if kind == "runtime":
+            self.runtime.apply(message.get("diff", {}), bool(message.get("full")))
+        elif kind == "event":
+            signal = self._events.get(message.get("name", ""))
+            if signal is not None:
+                signal.emit(*message.get("args", []))
+        elif kind == "tick":
+            self.automation.run(message.get("task", ""))
+        elif kind == "ping":
+            self.connection.send({"t": "pong"})
+
+
+def run_plugin_host(argv: list[str]) -> int:
+    """插件进程入口：--plugin-host <server> <plugin_dir>"""
+    index = argv.index("--plugin-host")
+    server_name, plugin_dir = argv[index + 1], Path(argv[index + 2])
+
+    logger.remove()
+    logger.add(sys.stderr, format=f"[plugin {plugin_dir.name}] {{time:HH:mm:ss}} | {{level: <8}} | {{message}}")
+
+    app = QCoreApplication(argv)
+    connection = RemoteConnection(server_name, os.environ.get(TOKEN_ENV, ""))
+    if not connection.open():
+        return 1
+    init = connection.wait_for("init")
+    if init is None:
+        logger.error("No response from the main process")
+        return 1
+
+    from src.core.plugin.loader import PluginLoader  # 导入较重，连接成功后再导入
+
+    api = RemotePluginAPI(connection)
+    api.runtime.apply(init.get("runtime", {}), full=True)
+    loader = PluginLoader(api, plugin_dir.parent)
+    meta = loader._load_meta(plugin_dir)
+    plugin = loader.load_plugin(meta) if meta else None
+    if plugin is None:
+        return 2
+
+    stopped = False
+
+    def stop():
+        nonlocal stopped
+        if stopped:
+            return
+        stopped = True
+        try:
+            plugin.on_unload()
+        except Exception as e:
+            logger.error(f"Failed to unload plugin: {e}")
+        app.quit()
+
+    connection.messageReceived.connect(lambda message: message.get("t") == "stop" and stop())
+    connection.closed.connect(stop)  # 主进程退出或断开
+    connection.send({"t": "ready"})
+    return app.exec()
@@ -1,8 +1,21 @@
-from .runtime import ScheduleRuntime
-from .service import ScheduleServices
-from .manager import ScheduleManager
 from .model import ScheduleData, MetaInfo, Timeline, Entry, EntryType, Subject, Timetable, WeekType
 
+# 依赖 Qt 的部分按需导入（PEP 562）
+_LAZY = {
+    "ScheduleRuntime": ".runtime",
+    "ScheduleServices": ".service",
+    "ScheduleManager": ".manager",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Schedule Version
 __version__ = 1
 SCHEMA_VERSION = __version__
@@ -0,0 +1,297 @@
+"""
+override 压缩 / 规范化
+
+换课和编辑器只会不断追加 Timetable，久而久之会留下失效、被遮蔽或不起作用的 override。
+压缩按条目逐个尝试以下改写，每一步都要求解析结果完全不变才会采纳：
+
+- 目标条目已不存在的 override 直接删除
+- weeks 列表去重排序，覆盖整个周期时改为 all
+- 在任何时段都不生效的 override 删除
+- 与原值相同、或被后面的 override 完全遮蔽的字段清空；字段全空则删除
+- 作用范围相同的 override 合并为一个
+
+“解析结果不变”同时按运行时（ScheduleServices，按顺序逐字段覆盖）和编辑器（按 weeks 优先级取一个）
+两种语义检查，并且分别在保留 / 去掉换课 override（swap_ 前缀）两种情况下检查，
+这样换课清理之后用户自己的 override 也不会被改坏。
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from src.core.schedule.model import ScheduleData, Entry, Timetable, WeekType
+from src.core.schedule.revision import entity_bytes
+from src.core.schedule.service import ScheduleServices
+
+FIELDS = ("subjectId", "title", "startTime", "endTime")
+EDITOR_FIELDS = ("subjectId", "title")  # ScheduleEditor.getEntryOverride 只应用这两项
+
+type Slot = tuple[int, int]  # (星期, 周期周)
+
+
+@dataclass
+class CompactionReport:
+    overrides_before: int = 0
+    overrides_after: int = 0
+    removed: dict[str, int] = field(default_factory=dict)  # 原因 -> 数量
+    merged: int = 0
+    fields_cleared: int = 0
+    weeks_collapsed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    resolve_ms_before: Optional[float] = None  # 解析整个周期所有日程的耗时
+    resolve_ms_after: Optional[float] = None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.removed or self.merged or self.fields_cleared or self.weeks_collapsed)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["changed"] = self.changed
+        data["bytes_saved"] = self.bytes_before - self.bytes_after
+        return data
+
+    def summary(self) -> str:
+        text = (
+            f"overrides {self.overrides_before} -> {self.overrides_after}, "
+            f"{self.bytes_before - self.bytes_after} bytes saved"
+        )
+        if self.resolve_ms_before is not None and self.resolve_ms_after is not None:
+            text += f", full-cycle resolve {self.resolve_ms_before:.1f}ms -> {self.resolve_ms_after:.1f}ms"
+        return text
+
+
+def _overrides_bytes(overrides: list[Timetable]) -> int:
+    return 2 + sum(len(entity_bytes(o)) + 1 for o in overrides) - (1 if overrides else 0)
+
+
+def _resolve_ms(schedule: ScheduleData) -> float:
+    services = ScheduleServices(None)
+    cycle = schedule.meta.maxWeekCycle or 1
+    start = time.perf_counter()
+    for weekday in range(1, 8):
+        for week in range(1, cycle + 1):
+            services.resolve_day(schedule, weekday, week, cycle)
+    return (time.perf_counter() - start) * 1000
+
+
+def _is_swap(o: Timetable) -> bool:
+    return o.id.startswith("swap_")
+
+
+def _scope_key(o: Timetable) -> tuple:
+    days = tuple(o.dayOfWeek) if o.dayOfWeek else None
+    weeks = tuple(o.weeks) if isinstance(o.weeks, list) else o.weeks
+    return days, weeks
+
+
+class _EntryCompactor:
+    """单个条目的 override 压缩；overrides 保持原有相对顺序"""
+
+    def __init__(self, entry: Entry, runtime_slots: list[Slot], editor_slots: list[Slot], cycle: int):
+        self.entry = entry
+        self.runtime_slots = runtime_slots
+        self.editor_slots = editor_slots
+        self.cycle = cycle
+        # id(override) -> (override, 各运行时时段是否生效, 各编辑器时段的优先级)；保留对象引用以免 id 被复用
+        self._scope_cache: dict[int, tuple[Timetable, tuple[bool, ...], tuple[int, ...]]] = {}
+
+    def _scope(self, o: Timetable) -> tuple[tuple[bool, ...], tuple[int, ...]]:
+        cached = self._scope_cache.get(id(o))
+        if cached is None:
+            runtime = tuple(
+                not (o.dayOfWeek and weekday not in o.dayOfWeek)
+                and not (o.weeks and not ScheduleServices._is_in_week(o.weeks, week, self.cycle))
+                for weekday, week in self.runtime_slots
+            )
+            editor = tuple(self._priority(o, weekday, week) for weekday, week in self.editor_slots)
+            cached = self._scope_cache[id(o)] = (o, runtime, editor)
+        return cached[1], cached[2]
+
+    def _priority(self, o: Timetable, weekday: int, week: int) -> int:
+        """与 ScheduleEditor.getEntryOverride 一致；-1 表示不适用"""
+        if o.dayOfWeek and weekday not in o.dayOfWeek:
+            return -1
+        if isinstance(o.weeks, list) and week in o.weeks:
+            return 3
+        if isinstance(o.weeks, int) and week >= o.weeks and (week - o.weeks) % self.cycle == 0:
+            return 2
+        if o.weeks == "all" or o.weeks is None:
+            return 1
+        return -1
+
+    # ── 两种语义下的解析结果 ─────────────────────────────
+
+    def _runtime(self, overrides: list[Timetable]) -> tuple:
+        base = tuple(getattr(self.entry, f) for f in FIELDS)
+        scoped = [(o, self._scope(o)[0]) for o in overrides]
+        result = []
+        for k in range(len(self.runtime_slots)):
+            values = list(base)
+            for o, applies in scoped:
+                if applies[k]:
+                    for i, f in enumerate(FIELDS):
+                        if getattr(o, f):
+                            values[i] = getattr(o, f)
+            result.append(tuple(values))
+        return tuple(result)
+
+    def _editor(self, overrides: list[Timetable]) -> tuple:
+        base = tuple(getattr(self.entry, f) for f in EDITOR_FIELDS)
+        scoped = [(o, self._scope(o)[1]) for o in overrides]
+        result = []
+        for k in range(len(self.editor_slots)):
+            best, best_priority = None, -1
+            for o, priorities in scoped:
+                if priorities[k] > best_priority:
+                    best, best_priority = o, priorities[k]
+            if best is None:
+                result.append(base)
+            else:
+                result.append(tuple(getattr(best, f) or v for f, v in zip(EDITOR_FIELDS, base)))
+        return tuple(result)
+
+    def signature(self, overrides: list[Timetable]) -> tuple:
+        user = [o for o in overrides if not _is_swap(o)]
+        if len(user) == len(overrides):
+            return self._runtime(overrides), self._editor(overrides)
+        return self._runtime(overrides), self._editor(overrides), self._runtime(user), self._editor(user)
+
+    # ── 压缩 ─────────────────────────────────────────────
+
+    def compact(self, overrides: list[Timetable], report: CompactionReport) -> list[Timetable]:
+        current = [o.model_copy() for o in overrides]
+        target = self.signature(current)
+        # 删除之后可能又能折叠 weeks / 合并，重复到不再变化为止
+        for _ in range(4):
+            before = len(current), report.weeks_collapsed, report.fields_cleared
+            current = self._round(current, target, report)
+            if (len(current), report.weeks_collapsed, report.fields_cleared) == before:
+                break
+        return current
+
+    def _round(self, current: list[Timetable], target: tuple, report: CompactionReport) -> list[Timetable]:
+        def accept(candidate: list[Timetable]) -> bool:
+            return self.signature(candidate) == target
+
+        # weeks 规范化
+        for i, o in enumerate(current):
+            if not isinstance(o.weeks, list) or not o.weeks:
+                continue
+            weeks = sorted(set(o.weeks))
+            if set(range(1, self.cycle + 1)) <= set(weeks):
+                candidate = current.copy()
+                candidate[i] = o.model_copy(update={"weeks": WeekType.ALL})
+                if accept(candidate):
+                    current = candidate
+                    report.weeks_collapsed += 1
+                    continue
+            if weeks != o.weeks:
+                candidate = current.copy()
+                candidate[i] = o.model_copy(update={"weeks": weeks})
+                if accept(candidate):
+                    current = candidate
+
+        # 整条删除（不生效 / 被遮蔽 / 与原值相同）
+        i = 0
+        while i < len(current):
+            candidate = current[:i] + current[i + 1:]
+            if accept(candidate):
+                # 单独存在时也不改变结果的是无效 override，否则是被其他 override 遮蔽
+                reason = "no-op" if self.signature(current[i:i + 1]) == self.signature([]) else "shadowed"
+                report.removed[reason] = report.removed.get(reason, 0) + 1
+                current = candidate
+            else:
+                i += 1
+
+        # 逐字段清空
+        for i in range(len(current)):
+            for f in FIELDS:
+                if not getattr(current[i], f):
+                    continue
+                candidate = current.copy()
+                candidate[i] = current[i].model_copy(update={f: None})
+                if accept(candidate):
+                    current = candidate
+                    report.fields_cleared += 1
+
+        # 合并作用范围相同的 override（不跨换课 / 用户两类）
+        i = 0
+        while i < len(current):
+            merged = False
+            for j in range(i + 1, len(current)):
+                a, b = current[i], current[j]
+                if _is_swap(a) != _is_swap(b) or _scope_key(a) != _scope_key(b):
+                    continue
+                combined = b.model_copy(update={f: getattr(b, f) or getattr(a, f) for f in FIELDS})
+                candidate = current[:i] + current[i + 1:j] + [combined] + current[j + 1:]
+                if accept(candidate):
+                    current = candidate
+                    report.merged += 1
+                    merged = True
+                    break
+            if not merged:
+                i += 1
+
+        return current
+
+
+def compact_overrides(schedule: ScheduleData, measure: bool = False) -> tuple[list[Timetable], CompactionReport]:
+    """
+    计算压缩后的 overrides（不修改 schedule）
+    measure=True 时额外计时压缩前后解析整个周期的耗时
+    """
+    cycle = schedule.meta.maxWeekCycle or 1
+    report = CompactionReport(
+        overrides_before=len(schedule.overrides),
+        bytes_before=_overrides_bytes(schedule.overrides),
+    )
+
+    entries: dict[str, Entry] = {}
+    editor_slots: dict[str, list[Slot]] = {}
+    for day in schedule.days:
+        weekdays = day.dayOfWeek or list(range(1, 8))
+        for entry in day.entries:
+            entries.setdefault(entry.id, entry)
+            slots = editor_slots.setdefault(entry.id, [])
+            slots.extend((wd, wk) for wd in weekdays for wk in range(1, cycle + 1) if (wd, wk) not in slots)
+
+    # 与 ScheduleServices.resolve_day 一致：每个 (星期, 周次) 取第一个匹配的日程
+    runtime_slots: dict[str, list[Slot]] = {}
+    for weekday in range(1, 8):
+        for week in range(1, cycle + 1):
+            for day in schedule.days:
+                if day.dayOfWeek and weekday in day.dayOfWeek \
+                        and ScheduleServices._is_in_week(day.weeks, week, cycle):
+                    for entry in day.entries:
+                        runtime_slots.setdefault(entry.id, []).append((weekday, week))
+                    break
+
+    by_entry: dict[str, list[int]] = {}
+    for pos, o in enumerate(schedule.overrides):
+        by_entry.setdefault(o.entryId, []).append(pos)
+
+    result: dict[int, Optional[Timetable]] = {}
+    for entry_id, positions in by_entry.items():
+        entry = entries.get(entry_id)
+        if entry is None:
+            report.removed["dangling"] = report.removed.get("dangling", 0) + len(positions)
+            result.update({pos: None for pos in positions})
+            continue
+        compactor = _EntryCompactor(entry, runtime_slots.get(entry_id, []), editor_slots.get(entry_id, []), cycle)
+        compacted = compactor.compact([schedule.overrides[pos] for pos in positions], report)
+        # 压缩结果只会删减 / 合并到靠后的位置，按剩余 override 的 id 放回原位置
+        kept = {o.id: o for o in compacted}
+        for pos in positions:
+            result[pos] = kept.get(schedule.overrides[pos].id)
+
+    overrides = [result[pos] for pos in range(len(schedule.overrides)) if result[pos] is not None]
+    report.overrides_after = len(overrides)
+    report.bytes_after = _overrides_bytes(overrides)
+
+    if measure:
+        report.resolve_ms_before = _resolve_ms(schedule)
+        report.resolve_ms_after = _resolve_ms(schedule.model_copy(update={"overrides": overrides}))
+    return overrides, report
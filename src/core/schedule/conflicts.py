@@ -0,0 +1,189 @@
+"""
+教师 / 教室占用索引（跨课表冲突检测）
+
+对 schedules 目录中的每个课表，按周期展开 (星期, 周期周) 的日程，
+建立倒排索引：(资源类型, 资源名, 星期, 周期周) -> 按开始时间排序的区间。
+文件按 mtime/大小增量重建；查询某一天的时间段时只需二分查找。
+refresh() 会解析课表，应在后台线程调用（ConflictIndexWorker）；重建完成后整体替换，查询不会读到半成品。
+"""
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field, asdict
+from datetime import date as Date, datetime
+from pathlib import Path
+from typing import Literal, Optional
+
+from loguru import logger
+
+from src.core.parser import ScheduleParser
+from src.core.schedule.model import ScheduleData, EntryType
+from src.core.schedule.service import ScheduleServices
+from src.core.utils import get_week_number, get_cycle_week
+
+type ResourceKind = Literal["teacher", "room"]
+
+
+def _minutes(value: str) -> Optional[int]:
+    try:
+        hour, minute = value.split(":")
+        return int(hour) * 60 + int(minute)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+
+@dataclass(frozen=True)
+class Booking:
+    """某个资源在某课表中的一次占用"""
+    kind: str
+    value: str  # 原始名称（未归一化）
+    schedule: str
+    entryId: str
+    subjectId: str
+    subjectName: str
+    startTime: str
+    endTime: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Bucket:
+    starts: list[int] = field(default_factory=list)
+    items: list[tuple[int, int, Booking]] = field(default_factory=list)
+    max_length: int = 0
+
+    def add(self, start: int, end: int, booking: Booking):
+        pos = bisect.bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.items.insert(pos, (start, end, booking))
+        self.max_length = max(self.max_length, end - start)
+
+    def overlapping(self, start: int, end: int) -> list[Booking]:
+        """与 [start, end) 重叠的占用；只扫描开始时间落在 [start - 最长区间, end) 内的部分"""
+        lo = bisect.bisect_left(self.starts, start - self.max_length)
+        hi = bisect.bisect_left(self.starts, end)
+        return [b for s, e, b in self.items[lo:hi] if e > start]
+
+
+@dataclass
+class _ScheduleIndex:
+    name: str
+    stamp: tuple[int, int]  # (mtime_ns, size)
+    start_date: str
+    max_week_cycle: int
+    buckets: dict[tuple[str, str, int, int], _Bucket] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, name: str, schedule: ScheduleData, stamp: tuple[int, int]) -> "_ScheduleIndex":
+        cycle = schedule.meta.maxWeekCycle or 1
+        index = cls(name=name, stamp=stamp, start_date=schedule.meta.startDate, max_week_cycle=cycle)
+        subjects = {s.id: s for s in schedule.subjects}
+        services = ScheduleServices(None)  # resolve_day 不依赖 app_central
+        for weekday in range(1, 8):
+            for week in range(1, cycle + 1):
+                day = services.resolve_day(schedule, weekday, week, cycle)
+                if day is None:
+                    continue
+                for entry in day.entries:
+                    if entry.type not in (EntryType.CLASS, EntryType.ACTIVITY):
+                        continue
+                    subject = subjects.get(entry.subjectId) if entry.subjectId else None
+                    start, end = _minutes(entry.startTime), _minutes(entry.endTime)
+                    if subject is None or start is None or end is None or end <= start:
+                        continue
+                    for kind, value in (("teacher", subject.teacher), ("room", subject.location)):
+                        if not _normalize(value):
+                            continue
+                        booking = Booking(
+                            kind=kind, value=value, schedule=name, entryId=entry.id,
+                            subjectId=subject.id, subjectName=subject.name,
+                            startTime=entry.startTime, endTime=entry.endTime,
+                        )
+                        key = (kind, _normalize(value), weekday, week)
+                        index.buckets.setdefault(key, _Bucket()).add(start, end, booking)
+        return index
+
+    def cycle_week(self, day: Date) -> int:
+        if not self.start_date:
+            return 1
+        week = get_week_number(self.start_date, datetime.combine(day, datetime.min.time()))
+        return get_cycle_week(week, self.max_week_cycle)
+
+
+class ResourceConflictIndex:
+    """
+    跨课表的教师 / 教室占用索引
+    refresh() 只重新解析 mtime/大小变化的课表；query() 只读取最近一次刷新的结果
+    """
+
+    def __init__(self, *roots: Path):
+        self.roots: list[Path] = list(roots)
+        self._indexes: dict[Path, _ScheduleIndex] = {}
+
+    def refresh(self) -> int:
+        """按 mtime/大小增量更新，返回重建的课表数量"""
+        indexes = dict(self._indexes)
+        seen: set[Path] = set()
+        rebuilt = 0
+        for root in self.roots:
+            if not root.is_dir():
+                continue
+            for path in root.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                seen.add(path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                cached = indexes.get(path)
+                if cached is not None and cached.stamp == stamp:
+                    continue
+                try:
+                    schedule = ScheduleParser(path).load()
+                except Exception as e:
+                    logger.debug(f"Skipping unreadable schedule in conflict index: {path.name} ({e})")
+                    indexes.pop(path, None)
+                    continue
+                indexes[path] = _ScheduleIndex.build(path.stem, schedule, stamp)
+                rebuilt += 1
+        for path in set(indexes) - seen:
+            del indexes[path]
+        self._indexes = indexes
+        return rebuilt
+
+    def query(self, kind: ResourceKind, value: str, day: Date, start_time: str, end_time: str,
+              exclude: Optional[set[str]] = None, weekday: Optional[int] = None) -> list[Booking]:
+        """
+        查询资源在 day 的 [start_time, end_time) 内的占用
+        exclude: 忽略的课表名（通常是当前课表自身）；weekday: 调休时实际按星期几上课
+        """
+        key_value = _normalize(value)
+        start, end = _minutes(start_time), _minutes(end_time)
+        if not key_value or start is None or end is None or end <= start:
+            return []
+        weekday = weekday or day.isoweekday()
+        hits = []
+        for index in self._indexes.values():
+            if exclude and index.name in exclude:
+                continue
+            bucket = index.buckets.get((kind, key_value, weekday, index.cycle_week(day)))
+            if bucket is not None:
+                hits.extend(bucket.overlapping(start, end))
+        return hits
+
+    def conflicts_for(self, teacher: Optional[str], location: Optional[str], day: Date,
+                      start_time: str, end_time: str, exclude: Optional[set[str]] = None,
+                      weekday: Optional[int] = None) -> list[Booking]:
+        """同时检查教师和教室"""
+        hits = []
+        if teacher:
+            hits += self.query("teacher", teacher, day, start_time, end_time, exclude, weekday)
+        if location:
+            hits += self.query("room", location, day, start_time, end_time, exclude, weekday)
+        return hits
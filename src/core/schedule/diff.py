@@ -0,0 +1,401 @@
+"""
+课程表差异与三方合并
+
+实体（科目 / 日程 / 课程条目 / 覆盖）优先按 id 匹配；id 对不上时（例如 CSES 导入
+每次都会重新生成 id）回退到“去掉 id、并把引用换算到同一 id 空间后的内容”匹配。
+合并在 model_dump 后的字典上进行，全程只用字典索引，整体为线性复杂度，
+最后只做一次 ScheduleData.model_validate。
+"""
+from __future__ import annotations
+
+import json
+from collections import defaultdict, deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Literal, Optional
+
+from src.core.schedule.model import ScheduleData
+
+KINDS = ("subjects", "days", "overrides")
+
+type Side = Literal["local", "remote"]
+type IdMap = dict[str, dict[str, str]]  # kind(subjects/days/entries/overrides) -> {other_id: ref_id}
+
+_MISSING = object()
+
+
+def _new_id_map() -> IdMap:
+    return {"subjects": {}, "days": {}, "entries": {}, "overrides": {}}
+
+
+def _dump(schedule: ScheduleData) -> dict:
+    return schedule.model_dump(mode="json")
+
+
+# ── id 对齐 ─────────────────────────────────────────────
+
+def _translate(item: dict, kind: str, id_map: IdMap) -> dict:
+    """把 other 空间的实体（连同其引用）换算到 ref 空间"""
+    subjects = id_map["subjects"]
+    entries = id_map["entries"]
+    if kind == "subjects":
+        return {**item, "id": subjects.get(item["id"], item["id"])}
+    if kind == "days":
+        return {
+            **item,
+            "id": id_map["days"].get(item["id"], item["id"]),
+            "entries": [_translate_entry(e, id_map) for e in item.get("entries", [])],
+        }
+    sid = item.get("subjectId")
+    return {
+        **item,
+        "id": id_map["overrides"].get(item["id"], item["id"]),
+        "entryId": entries.get(item["entryId"], item["entryId"]),
+        "subjectId": subjects.get(sid, sid) if sid else sid,
+    }
+
+
+def _translate_entry(entry: dict, id_map: IdMap) -> dict:
+    sid = entry.get("subjectId")
+    return {
+        **entry,
+        "id": id_map["entries"].get(entry["id"], entry["id"]),
+        "subjectId": id_map["subjects"].get(sid, sid) if sid else sid,
+    }
+
+
+def _entry_key(entry: dict) -> str:
+    return json.dumps({k: v for k, v in entry.items() if k != "id"}, sort_keys=True, ensure_ascii=False)
+
+
+def _content_key(item: dict, kind: str) -> str:
+    """去掉 id 后的内容键（item 需已换算到 ref 空间）"""
+    stripped = {k: v for k, v in item.items() if k != "id"}
+    if kind == "days":
+        stripped["entries"] = [{k: v for k, v in e.items() if k != "id"} for e in item.get("entries", [])]
+    return json.dumps(stripped, sort_keys=True, ensure_ascii=False)
+
+
+def _align_entries(ref_day: dict, other_day: dict, id_map: IdMap, other_entry_ids: set[str]) -> None:
+    """id 相同的一对日程内，按内容匹配 id 对不上的课程条目"""
+    other_ids = {e["id"] for e in other_day.get("entries", [])}
+    candidates: dict[str, deque[str]] = defaultdict(deque)
+    for e in ref_day.get("entries", []):
+        if e["id"] not in other_ids and e["id"] not in other_entry_ids:
+            candidates[_entry_key(e)].append(e["id"])
+    if not candidates:
+        return
+    ref_ids = {e["id"] for e in ref_day.get("entries", [])}
+    for e in other_day.get("entries", []):
+        if e["id"] in ref_ids:
+            continue
+        bucket = candidates.get(_entry_key(_translate_entry(e, id_map)))
+        if bucket:
+            id_map["entries"][e["id"]] = bucket.popleft()
+
+
+def align(ref: dict[str, list[dict]], other: dict[str, list[dict]]) -> IdMap:
+    """
+    计算 other → ref 的 id 映射
+    只有两侧都“落单”（id 在对侧不存在）的实体才参与内容匹配；
+    按 科目 → 日程（含条目）→ 覆盖 的顺序进行，保证引用先于引用者被换算
+    """
+    id_map = _new_id_map()
+    other_entry_ids = {e["id"] for d in other.get("days", []) for e in d.get("entries", [])}
+
+    for kind in KINDS:
+        ref_items = ref.get(kind, [])
+        other_items = other.get(kind, [])
+        ref_by_id = {i["id"]: i for i in ref_items}
+        other_ids = {i["id"] for i in other_items}
+
+        if kind == "days":
+            for o in other_items:
+                r = ref_by_id.get(o["id"])
+                if r is not None:
+                    _align_entries(r, o, id_map, other_entry_ids)
+
+        buckets: dict[str, deque[dict]] = defaultdict(deque)
+        for r in ref_items:
+            if r["id"] not in other_ids:
+                buckets[_content_key(r, kind)].append(r)
+        if not buckets:
+            continue
+
+        for o in other_items:
+            if o["id"] in ref_by_id:
+                continue
+            bucket = buckets.get(_content_key(_translate(o, kind, id_map), kind))
+            if not bucket:
+                continue
+            r = bucket.popleft()
+            id_map[kind][o["id"]] = r["id"]
+            if kind == "days":  # 内容相同 => 条目一一对应
+                for oe, re in zip(o.get("entries", []), r.get("entries", [])):
+                    if oe["id"] != re["id"]:
+                        id_map["entries"][oe["id"]] = re["id"]
+    return id_map
+
+
+def _translated(data: dict, id_map: IdMap) -> dict:
+    return {
+        "meta": data["meta"],
+        **{kind: [_translate(i, kind, id_map) for i in data.get(kind, [])] for kind in KINDS},
+    }
+
+
+# ── 差异 ─────────────────────────────────────────────
+
+@dataclass
+class EntityDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    renamed: dict[str, str] = field(default_factory=dict)  # 新 id -> 旧 id（内容匹配得到）
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.modified)
+
+
+@dataclass
+class ScheduleDiff:
+    meta_changed: bool = False
+    subjects: EntityDiff = field(default_factory=EntityDiff)
+    days: EntityDiff = field(default_factory=EntityDiff)
+    overrides: EntityDiff = field(default_factory=EntityDiff)
+
+    def is_empty(self) -> bool:
+        return not self.meta_changed and all(getattr(self, k).is_empty() for k in KINDS)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _without_id(meta: dict) -> dict:
+    return {k: v for k, v in meta.items() if k != "id"}
+
+
+def diff_schedules(old: ScheduleData, new: ScheduleData, match_content: bool = True) -> ScheduleDiff:
+    """比较两份课程表；match_content 为 True 时对 id 不同但内容相同的实体视为同一实体"""
+    old_data, new_data = _dump(old), _dump(new)
+    id_map = align(old_data, new_data) if match_content else _new_id_map()
+    new_data = _translated(new_data, id_map)
+
+    result = ScheduleDiff(meta_changed=_without_id(old_data["meta"]) != _without_id(new_data["meta"]))
+    for kind in KINDS:
+        before = {i["id"]: i for i in old_data[kind]}
+        after = {i["id"]: i for i in new_data[kind]}
+        setattr(result, kind, EntityDiff(
+            added=[i for i in after if i not in before],
+            removed=[i for i in before if i not in after],
+            modified=[i for i, v in after.items() if i in before and before[i] != v],
+            renamed={new_id: old_id for new_id, old_id in id_map[kind].items()},
+        ))
+    return result
+
+
+# ── 三方合并 ─────────────────────────────────────────────
+
+@dataclass
+class MergeConflict:
+    kind: str  # subject / day / entry / override / meta
+    id: str
+    # both_modified / both_added / modify_delete / delete_modify / dangling_reference
+    # 没有 base 的双方合并：differs（两侧不同，无法判断谁改的）/ local_only（仅本地有的日程或条目）
+    reason: str
+    resolution: str  # local / remote / dropped
+    fields: list[str] = field(default_factory=list)
+
+
+@dataclass
+class MergeResult:
+    schedule: ScheduleData
+    conflicts: list[MergeConflict] = field(default_factory=list)
+    stats: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "conflicts": [asdict(c) for c in self.conflicts],
+            "stats": dict(self.stats),
+        }
+
+
+def _ordered_union(primary: list[str], secondary: list[str]) -> list[str]:
+    """以 primary 的顺序为主，把 secondary 独有的 id 插到其在 secondary 中前一个共有 id 之后"""
+    in_primary = set(primary)
+    after: dict[Optional[str], list[str]] = defaultdict(list)
+    anchor = None
+    for i in secondary:
+        if i in in_primary:
+            anchor = i
+        else:
+            after[anchor].append(i)
+    result = list(after.get(None, ()))
+    for i in primary:
+        result.append(i)
+        result.extend(after.get(i, ()))
+    return result
+
+
+class _Merger:
+    # 没有 base 时仍保留的本地独有实体：科目与覆盖（含 swap_ 换课记录）不会与远端重复
+    KEEP_LOCAL_ONLY = ("subject", "override")
+
+    def __init__(self, prefer: Side, two_way: bool = False):
+        self.prefer = prefer
+        self.two_way = two_way  # 没有 base：不知道哪一侧改过，不同之处都按冲突处理
+        self.conflicts: list[MergeConflict] = []
+        self.stats: dict[str, int] = defaultdict(int)
+
+    def fields(self, kind: str, item_id: str, base: Optional[dict], local: dict, remote: dict,
+               skip: tuple[str, ...] = ()) -> dict:
+        """字段级三方合并，仅同一字段两侧改得不一样时才算冲突"""
+        merged: dict[str, Any] = {}
+        conflicted: list[str] = []
+        for key in dict.fromkeys([*local, *remote]):
+            if key in skip:
+                continue
+            lv, rv = local.get(key, _MISSING), remote.get(key, _MISSING)
+            bv = base.get(key, _MISSING) if base is not None else _MISSING
+            if lv == rv or bv == rv:
+                value = lv
+            elif bv == lv:
+                value = rv
+            else:
+                conflicted.append(key)
+                value = lv if self.prefer == "local" else rv
+            if value is not _MISSING:
+                merged[key] = value
+        if conflicted:
+            self.conflicts.append(MergeConflict(
+                kind=kind, id=item_id,
+                reason="both_modified" if base is not None else "differs" if self.two_way else "both_added",
+                resolution=self.prefer, fields=conflicted,
+            ))
+        return merged
+
+    def entity(self, kind: str, item_id: str, base: Optional[dict],
+               local: Optional[dict], remote: Optional[dict]) -> Optional[dict]:
+        if local == remote:
+            self.stats["unchanged" if local == base else "same_change"] += 1
+            return local
+        if self.two_way:
+            return self._two_way_entity(kind, item_id, local, remote)
+        if base == local:
+            self.stats["remote"] += 1
+            return remote
+        if base == remote:
+            self.stats["local"] += 1
+            return local
+        if local is None or remote is None:
+            reason = "delete_modify" if local is None else "modify_delete"
+            winner = local if self.prefer == "local" else remote
+            self.conflicts.append(MergeConflict(
+                kind=kind, id=item_id, reason=reason,
+                resolution=self.prefer if winner is not None else "dropped",
+            ))
+            return winner
+        self.stats["merged"] += 1
+        if kind == "day":
+            return self.day(item_id, base, local, remote)
+        return self.fields(kind, item_id, base, local, remote)
+
+    def _two_way_entity(self, kind: str, item_id: str,
+                        local: Optional[dict], remote: Optional[dict]) -> Optional[dict]:
+        if local is None:
+            self.stats["remote"] += 1
+            return remote
+        if remote is None:
+            if kind in self.KEEP_LOCAL_ONLY:
+                self.stats["local"] += 1
+                return local
+            # 本地独有的日程 / 条目可能与远端结构不同的同一天重复，按 prefer 决定并报告
+            keep = self.prefer == "local"
+            self.conflicts.append(MergeConflict(
+                kind=kind, id=item_id, reason="local_only", resolution="local" if keep else "dropped",
+            ))
+            return local if keep else None
+        self.stats["merged"] += 1
+        if kind == "day":
+            return self.day(item_id, None, local, remote)
+        return self.fields(kind, item_id, None, local, remote)
+
+    def day(self, day_id: str, base: Optional[dict], local: dict, remote: dict) -> dict:
+        merged = self.fields("day", day_id, base, local, remote, skip=("entries",))
+        base_entries = {e["id"]: e for e in (base or {}).get("entries", [])}
+        local_entries = {e["id"]: e for e in local.get("entries", [])}
+        remote_entries = {e["id"]: e for e in remote.get("entries", [])}
+        entries = []
+        for entry_id in _ordered_union(list(local_entries), list(remote_entries)):
+            entry = self.entity(
+                "entry", entry_id,
+                base_entries.get(entry_id), local_entries.get(entry_id), remote_entries.get(entry_id),
+            )
+            if entry is not None:
+                entries.append(entry)
+        entries.sort(key=lambda e: e.get("startTime") or "")
+        merged["entries"] = entries
+        return merged
+
+    def collection(self, kind: str, base: list[dict], local: list[dict], remote: list[dict]) -> list[dict]:
+        label = kind[:-1]  # subjects -> subject
+        base_by_id = {i["id"]: i for i in base}
+        local_by_id = {i["id"]: i for i in local}
+        remote_by_id = {i["id"]: i for i in remote}
+        result = []
+        for item_id in _ordered_union(list(local_by_id), list(remote_by_id)):
+            item = self.entity(
+                label, item_id, base_by_id.get(item_id), local_by_id.get(item_id), remote_by_id.get(item_id),
+            )
+            if item is not None:
+                result.append(item)
+        return result
+
+
+def merge_schedules(base: Optional[ScheduleData], local: ScheduleData, remote: ScheduleData,
+                    prefer: Side = "remote") -> MergeResult:
+    """
+    三方合并：base 为上次同步时的远端版本
+    两侧只改了一方的实体直接采用；同一字段两侧改得不同记为冲突，按 prefer 取值。
+    远端实体会先换算到本地 id 空间，本地覆盖 / 换课记录对条目的引用因此保持有效。
+    没有 base（首次同步，或从未记录过 base 的课表）时做双方合并，不把任何一侧当作祖先：
+    远端对齐到本地 id 后，相同的保留；两侧不同的字段记为冲突并按 prefer 取值；
+    本地独有的科目与覆盖（包括 swap_ 换课记录）保留；本地独有的日程 / 条目按 prefer 处理并记为冲突
+    """
+    local_data = _dump(local)
+    remote_data = _dump(remote)
+    if base is not None:
+        base_data = _dump(base)
+        local_data = _translated(local_data, align(base_data, local_data))
+        # 远端对齐到 “base + 本地新增” 的并集，这样两侧各自新增的相同实体也能认出来
+        reference = {}
+        for kind in KINDS:
+            base_ids = {i["id"] for i in base_data[kind]}
+            reference[kind] = base_data[kind] + [i for i in local_data[kind] if i["id"] not in base_ids]
+    else:
+        base_data = {"meta": None, **{kind: [] for kind in KINDS}}
+        reference = local_data
+    remote_data = _translated(remote_data, align(reference, remote_data))
+
+    merger = _Merger(prefer, two_way=base is None)
+    merged = {
+        "meta": merger.fields("meta", local_data["meta"].get("id", ""),
+                              base_data["meta"], local_data["meta"], remote_data["meta"], skip=("id",)),
+        **{kind: merger.collection(kind, base_data[kind], local_data[kind], remote_data[kind]) for kind in KINDS},
+    }
+    merged["meta"]["id"] = local_data["meta"].get("id") or remote_data["meta"].get("id")
+
+    # 清理悬空引用：指向已不存在条目的覆盖直接丢弃
+    entry_ids = {e["id"] for d in merged["days"] for e in d.get("entries", [])}
+    kept = []
+    for o in merged["overrides"]:
+        if o["entryId"] in entry_ids:
+            kept.append(o)
+        else:
+            merger.conflicts.append(MergeConflict(
+                kind="override", id=o["id"], reason="dangling_reference", resolution="dropped", fields=["entryId"],
+            ))
+    merged["overrides"] = kept
+
+    stats = dict(merger.stats)
+    stats["conflicts"] = len(merger.conflicts)
+    return MergeResult(schedule=ScheduleData.model_validate(merged), conflicts=merger.conflicts, stats=stats)
@@ -2,7 +2,7 @@ import json
 import shutil
 from datetime import datetime
 from pathlib import Path
-from PySide6.QtCore import QObject, Signal, Slot, Property, QUrl
+from PySide6.QtCore import QObject, Signal, Slot, Property, QUrl, QThread
 from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import QFileDialog, QApplication
 from loguru import logger
@@ -11,8 +11,15 @@ from typing import Optional, TYPE_CHECKING
 from src.core.convertor.slots import ScheduleIO
 from src.core.directories import SCHEDULES_PATH
 from src.core.schedule.model import ScheduleData, MetaInfo
+from src.core.schedule.revision import ScheduleFingerprint, ScheduleChanges
+from src.core.schedule.diff import MergeResult
+from src.core.schedule.worker import ScheduleMergeWorker, ConflictIndexWorker
+from src.core.schedule.snapshots import SnapshotStore, SnapshotInfo, RetentionPolicy
+from src.core.schedule.conflicts import ResourceConflictIndex
+from src.core.schedule.compaction import compact_overrides, CompactionReport
 from src.core.parser import ScheduleParser
 from src.core.utils import generate_id, get_default_subjects
+from src.core.utils.storage import StorageFormat, encode, to_pretty
 
 
 def _create_empty_schedule():
@@ -31,8 +38,11 @@ class ScheduleManager(QObject):
     initialized = Signal()
     scheduleSwitched = Signal(ScheduleData)
     scheduleModified = Signal(ScheduleData)
+    scheduleChanged = Signal(dict)  # ScheduleChanges.to_payload()：修订号 + 变化的实体 id
+    mergeFinished = Signal(dict)  # MergeResult.to_dict()：冲突列表 + 统计
+    mergeFailed = Signal(str)
 
-    def __init__(self, schedules_dir: Path, app_central):
+    def __init__(self, schedules_dir: Path, app_central, snapshots_dir: Optional[Path] = None):
         super().__init__()
         self.app_central = app_central
         self._converter = ScheduleIO(self)
@@ -43,12 +53,53 @@ class ScheduleManager(QObject):
         self.schedule: ScheduleData = _create_empty_schedule()
         self.current_schedule_name: Optional[str] = None  # 当前选中的课程表
 
+        self._revision = 0  # 跨课表单调递增，切换课表也不会回退
+        self._fingerprint: Optional[ScheduleFingerprint] = None
+
+        self.snapshots = SnapshotStore(snapshots_dir or self.schedules_dir.parent / "snapshots")
+        self._pruned_since_gc = 0
+
+        # 目录内所有课表的教师 / 教室占用，加载 / 保存后在后台按 mtime 增量更新，查询时只读
+        self.conflicts = ResourceConflictIndex(self.schedules_dir)
+        self._conflicts_thread: Optional[QThread] = None
+        self._conflicts_worker: Optional[ConflictIndexWorker] = None
+        self._conflicts_stale = False  # 刷新期间又有课表写入，结束后再刷新一次
+
+        self._compacted_revision = -1  # 最近一次 override 压缩时的修订号
+
+        self._merge_thread: Optional[QThread] = None
+        self._merge_worker: Optional[ScheduleMergeWorker] = None
+
         self.initialized.emit()
 
     @Property(QObject, notify=initialized)
     def scheduleIO(self):
         return self._converter
 
+    @Property(int, notify=scheduleModified)
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def fingerprint(self) -> Optional[ScheduleFingerprint]:
+        """最近一次修订的实体指纹，可用 fingerprint.hash_of(kind, id) 作缓存键"""
+        return self._fingerprint
+
+    def _commit_revision(self, changes: ScheduleChanges, fingerprint: ScheduleFingerprint):
+        self._revision += 1
+        self._fingerprint = fingerprint
+        self.schedule._revision = self._revision
+        changes.revision = self._revision
+
+    def _mark_switched(self):
+        """整表替换后（加载 / 导入 / 重命名）调用：全量变更并发出切换信号"""
+        fingerprint = ScheduleFingerprint.of(self.schedule)
+        changes = ScheduleChanges.full(fingerprint)
+        self._commit_revision(changes, fingerprint)
+        self.scheduleSwitched.emit(self.schedule)
+        self.scheduleModified.emit(self.schedule)
+        self.scheduleChanged.emit(changes.to_payload())
+
     @Slot(str, result=bool)
     def load(self, name: str, force: bool = False) -> bool:
         """加载课程表"""
@@ -72,16 +123,15 @@ class ScheduleManager(QObject):
         except Exception as e:  # 备份
             logger.error(f"Failed to load schedule: {e}")
             if path.exists():
-                backup_path = Path(self.schedule_path / "backup" / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-                logger.info(f"Original schedule backed up to {backup_path.name}")
-                self.save(backup_path)
+                backup_path = self.snapshots.preserve_broken(path)
+                logger.info(f"Original schedule backed up to {backup_path}")
             # 创建空课表
             self.schedule = _create_empty_schedule()
             self.save()
             return False
 
-        self.scheduleSwitched.emit(self.schedule)
-        self.scheduleModified.emit(self.schedule)
+        self._mark_switched()
+        self.refresh_conflicts()
         return True
 
     @Slot(result=bool)
@@ -91,23 +141,147 @@ class ScheduleManager(QObject):
             return False
         return self.load(self.current_schedule_name, force=True)
 
-    def modify(self, schedule: ScheduleData):
-        """ 接受外部修改（如编辑器）"""
+    def modify(self, schedule: ScheduleData) -> bool:
+        """
+        接受外部修改（如编辑器）
+        与上次的实体哈希比较，无实际变化时不发信号；返回是否产生了新修订
+        传入新的 ScheduleData 对象（恢复快照、导入合并）时还会发出 scheduleSwitched，
+        让编辑器等持有旧对象的地方重新绑定，否则它们的下一次修改会覆盖掉这次的结果
+        """
+        replaced = schedule is not self.schedule
+        if replaced:
+            schedule._revision = self._revision
         self.schedule = schedule
-        self.scheduleModified.emit(self.schedule)
+        fingerprint = ScheduleFingerprint.of(schedule)
+        changes = ScheduleChanges.between(self._fingerprint, fingerprint)
+        modified = not changes.is_empty()
+        if modified:
+            self._commit_revision(changes, fingerprint)
+            self.scheduleModified.emit(self.schedule)
+            self.scheduleChanged.emit(changes.to_payload())
+        if replaced:
+            self.scheduleSwitched.emit(self.schedule)
+        return modified
 
     @Slot(result=bool)
-    def save(self, path: Optional[Path] = None):
+    def save(self, path: Optional[Path] = None, reason: str = "save"):
         try:
             if path is None:
                 path = self.schedule_path
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.schedule.model_dump(), f, ensure_ascii=False, indent=4)
-                logger.success(f"Schedule saved to {path.name}")
-                return True
+            if path == self.schedule_path and self.app_central.configs.schedule.compact_on_save:
+                self.compact()
+            path.write_bytes(encode(self.schedule, self.storage_format))
+            logger.success(f"Schedule saved to {path.name}")
         except Exception as e:
             logger.error(f"Error saving schedule: {e}")
             return False
+        if path == self.schedule_path:
+            self.snapshot(reason)
+        self.refresh_conflicts()
+        return True
+
+    @property
+    def storage_format(self) -> StorageFormat:
+        return self.app_central.configs.storage_format
+
+    # override 压缩
+    def compact(self, measure: bool = False) -> Optional[CompactionReport]:
+        """压缩当前课表的 overrides（解析结果不变）；同一修订只做一次"""
+        if self._compacted_revision == self._revision and not measure:
+            return None
+        try:
+            overrides, report = compact_overrides(self.schedule, measure=measure)
+        except Exception as e:
+            logger.error(f"Failed to compact overrides: {e}")
+            return None
+        if report.changed:
+            self.schedule.overrides = overrides
+            self.modify(self.schedule)
+            logger.info(f"Compacted schedule overrides: {report.summary()}")
+        self._compacted_revision = self._revision
+        return report
+
+    @Slot(result=dict)
+    def compactOverrides(self) -> dict:
+        """手动压缩并保存，返回 CompactionReport.to_dict()（含体积与解析耗时变化）"""
+        report = self.compact(measure=True)
+        if report is None:
+            return {}
+        if report.changed:
+            self.save(reason="compact")
+        return report.to_dict()
+
+    # 冲突索引
+    def refresh_conflicts(self):
+        """在后台线程刷新教师 / 教室占用索引；正在刷新时记下，结束后再刷新一次"""
+        if self._conflicts_thread is not None:
+            self._conflicts_stale = True
+            return
+        self._conflicts_stale = False
+        self._conflicts_thread = QThread()
+        self._conflicts_worker = ConflictIndexWorker(self.conflicts)
+        self._conflicts_worker.moveToThread(self._conflicts_thread)
+        self._conflicts_thread.started.connect(self._conflicts_worker.run)
+        self._conflicts_worker.finished.connect(self._conflicts_thread.quit)
+        self._conflicts_worker.error.connect(self._conflicts_thread.quit)
+        self._conflicts_worker.error.connect(lambda msg: logger.error(f"Failed to refresh conflict index: {msg}"))
+        self._conflicts_thread.finished.connect(self._on_conflicts_refreshed)
+        self._conflicts_thread.start()
+
+    def _on_conflicts_refreshed(self):
+        self._conflicts_worker.deleteLater()
+        self._conflicts_thread.deleteLater()
+        self._conflicts_thread = None
+        self._conflicts_worker = None
+        if self._conflicts_stale:
+            self.refresh_conflicts()
+
+    # 快照
+    def snapshot(self, reason: str = "") -> Optional[SnapshotInfo]:
+        """为当前课表记录快照（内容与上一个快照相同则跳过），并按保留策略清理"""
+        config = self.app_central.configs.schedule.snapshots
+        if not config.enabled or not self.current_schedule_name:
+            return None
+        name = self.current_schedule_name
+        # 指纹与当前课表同步时复用其中的实体 JSON
+        fingerprint = self._fingerprint if self.schedule.revision == self._revision else None
+        try:
+            info = self.snapshots.snapshot(name, self.schedule, reason, self._revision, fingerprint)
+            if info is None:
+                return None
+            logger.debug(f"Schedule snapshot {info.id} ({reason}), {info.new_bytes} new bytes")
+            policy = RetentionPolicy(config.keep_recent, config.keep_daily, config.keep_weekly)
+            self._pruned_since_gc += self.snapshots.prune(name, policy)
+            if self._pruned_since_gc >= 10:  # 攒够再回收，避免每次保存都扫描全部清单
+                self.snapshots.gc()
+                self._pruned_since_gc = 0
+            return info
+        except Exception as e:
+            logger.error(f"Failed to snapshot schedule '{name}': {e}")
+            return None
+
+    @Slot(result=list)
+    def listSnapshots(self) -> list[dict]:
+        """当前课表的快照列表（新 -> 旧）"""
+        if not self.current_schedule_name:
+            return []
+        return self.snapshots.history(self.current_schedule_name)
+
+    @Slot(str, result=bool)
+    def restoreSnapshot(self, snapshot_id: str) -> bool:
+        """将当前课表恢复到指定快照（恢复前会先记录一次快照，可撤销）"""
+        if not self.current_schedule_name:
+            return False
+        try:
+            restored = self.snapshots.restore(self.current_schedule_name, snapshot_id)
+        except Exception as e:
+            logger.error(f"Failed to restore snapshot {snapshot_id}: {e}")
+            return False
+        self.snapshot("before restore")
+        self.modify(restored)  # 新对象：modify 会发出 scheduleSwitched
+        self.save(reason="restore")
+        logger.success(f"Schedule '{self.current_schedule_name}' restored to snapshot {snapshot_id}")
+        return True
 
     @Property(str, notify=scheduleSwitched)
     def currentScheduleName(self) -> Optional[str]:
@@ -135,10 +309,9 @@ class ScheduleManager(QObject):
             return False
         new_schedule = _create_empty_schedule()
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(new_schedule.model_dump(), f, ensure_ascii=False, indent=4)
-                logger.success(f"New schedule created: {name}")
-                return True
+            path.write_bytes(encode(new_schedule, self.storage_format))
+            logger.success(f"New schedule created: {name}")
+            return True
         except Exception as e:
             logger.error(f"Error creating new schedule: {e}")
             return False
@@ -155,6 +328,7 @@ class ScheduleManager(QObject):
             if path.exists():
                 path.unlink()
                 logger.info(f"Schedule deleted: {name}")
+            self._merge_base_path(name).unlink(missing_ok=True)
             return True
         except Exception as e:
             logger.error(f"Error deleting schedule: {e}")
@@ -186,6 +360,9 @@ class ScheduleManager(QObject):
 
         try:
             old_path.rename(new_path)
+            if self._merge_base_path(old_name).exists():
+                self._merge_base_path(old_name).rename(self._merge_base_path(new_name))
+            self.snapshots.rename(old_name, new_name)
             logger.success(f"Schedule renamed: {old_name} -> {new_name}")
 
             # 要更新 runtime 和当前记录
@@ -193,8 +370,7 @@ class ScheduleManager(QObject):
                 self.current_schedule_name = new_name
                 self.schedule_path = new_path
                 self.app_central.configs.schedule.current_schedule = new_name
-                self.scheduleSwitched.emit(self.schedule)
-                self.scheduleModified.emit(self.schedule)
+                self._mark_switched()
 
             return True
         except Exception as e:
@@ -227,20 +403,118 @@ class ScheduleManager(QObject):
             # 解析
             imported_schedule = ScheduleData.model_validate(data)
 
-            # 设置当前 schedule 并保存
-            self.schedule = imported_schedule
-            self.current_schedule_name = src_path.stem
-            self.schedule_path = self.schedules_dir / f"{self.current_schedule_name}.json"
-            self.save()  # 保存到本地
-
-            self.scheduleSwitched.emit(self.schedule)
-            self.scheduleModified.emit(self.schedule)
-            logger.success(f"Schedule imported from {src_path.name}")
-            return True
+            # 同名课表已存在时增量合并，否则直接导入
+            return self.applyImport(src_path.stem, imported_schedule)
         except Exception as e:
             logger.exception(f"Failed to import schedule: {e}")
             return False
 
+    # 增量导入
+    def _merge_base_path(self, name: str) -> Path:
+        return self.schedules_dir / "bases" / f"{name}.json"
+
+    def _save_merge_base(self, name: str, schedule: ScheduleData):
+        """记录本次导入的远端版本，作为下次三方合并的基准"""
+        path = self._merge_base_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(encode(schedule, StorageFormat.COMPACT))
+
+    def _load_merge_base(self, name: str) -> Optional[ScheduleData]:
+        path = self._merge_base_path(name)
+        if not path.exists():
+            return None
+        try:
+            return ScheduleParser(path).load()
+        except Exception as e:
+            logger.warning(f"Merge base for '{name}' is unreadable, falling back to two-way merge: {e}")
+            return None
+
+    def applyImport(self, name: str, remote: ScheduleData) -> bool:
+        """
+        导入 remote 为名为 name 的课表
+        同名课表不存在时直接写入并切换；已存在时在后台线程与本地版本三方合并，
+        完成后以增量修改的形式应用（mergeFinished / mergeFailed 通知结果）
+        """
+        path = self.schedules_dir / f"{name}.json"
+        if not path.exists():
+            self.schedule = remote
+            self.current_schedule_name = name
+            self.schedule_path = path
+            self.save(reason="import")
+            self._save_merge_base(name, remote)
+            self._mark_switched()
+            logger.success(f"Schedule imported as '{name}'")
+            return True
+
+        if self._merge_thread is not None:
+            logger.warning("Another schedule merge is still running")
+            return False
+
+        if name == self.current_schedule_name:
+            local = self.schedule.model_copy(deep=True)
+        else:
+            local = ScheduleParser(path).load()
+        started_revision = self._revision
+
+        self._merge_thread = QThread()
+        self._merge_worker = ScheduleMergeWorker(self._load_merge_base(name), local, remote)
+        self._merge_worker.moveToThread(self._merge_thread)
+        self._merge_thread.started.connect(self._merge_worker.run)
+        outcome: dict = {}
+
+        def on_finished(result: MergeResult):
+            outcome["result"] = result
+            self._merge_thread.quit()
+
+        def on_error(msg: str):
+            outcome["error"] = msg
+            self._merge_thread.quit()
+
+        def on_thread_finished():
+            # 线程真正退出后再释放引用并应用结果
+            self._merge_worker.deleteLater()
+            self._merge_thread.deleteLater()
+            self._merge_thread = None
+            self._merge_worker = None
+
+            if "error" in outcome:
+                logger.error(f"Schedule merge failed: {outcome['error']}")
+                self.mergeFailed.emit(outcome["error"])
+            elif name == self.current_schedule_name and self._revision != started_revision:
+                # 合并期间本地又被修改过，基于最新版本重来
+                logger.info("Schedule changed during merge, merging again")
+                self.applyImport(name, remote)
+            else:
+                self._apply_merge_result(name, remote, outcome["result"])
+
+        self._merge_worker.finished.connect(on_finished)
+        self._merge_worker.error.connect(on_error)
+        self._merge_thread.finished.connect(on_thread_finished)
+        self._merge_thread.start()
+        logger.info(f"Merging imported schedule into '{name}'...")
+        return True
+
+    def _apply_merge_result(self, name: str, remote: ScheduleData, result: MergeResult):
+        if name == self.current_schedule_name:
+            self.snapshot("before import")
+            # 只发出实际变化的实体；合并结果是新对象，modify 会发出 scheduleSwitched 让编辑器重新绑定
+            self.modify(result.schedule)
+        else:
+            self.schedule = result.schedule
+            self.current_schedule_name = name
+            self.schedule_path = self.schedules_dir / f"{name}.json"
+            self.app_central.configs.schedule.current_schedule = name
+            self._mark_switched()
+        self.save(reason="import")
+        self._save_merge_base(name, remote)
+
+        for conflict in result.conflicts:
+            logger.warning(
+                f"Merge conflict: {conflict.kind} {conflict.id} ({conflict.reason}) -> {conflict.resolution}"
+            )
+        logger.success(f"Schedule '{name}' merged, {len(result.conflicts)} conflict(s)")
+        self.mergeFinished.emit(result.to_dict())
+
     @Slot(str, result=bool)
     def export(self, filename: str) -> bool:
         """导出指定课程表"""
@@ -263,7 +537,8 @@ class ScheduleManager(QObject):
             return False  # 用户取消
 
         try:
-            shutil.copy(src_path, file_path)
+            # 导出始终使用便于阅读的 pretty 格式
+            Path(file_path).write_bytes(to_pretty(src_path.read_bytes()))
             logger.success(f"Schedule '{filename}' exported to: {file_path}")
             return True
         except Exception as e:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import Optional
 from enum import Enum
 
@@ -68,3 +68,10 @@ class ScheduleData(BaseModel):
     subjects: list[Subject] = []
     days: list[Timeline] = []
     overrides: list[Timetable] = []
+
+    _revision: int = PrivateAttr(default=0)  # 由 ScheduleManager 维护，单调递增
+
+    @property
+    def revision(self) -> int:
+        """当前修订号（0 表示未被 ScheduleManager 追踪）"""
+        return self._revision
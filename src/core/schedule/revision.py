@@ -0,0 +1,114 @@
+"""
+课程表修订追踪
+
+为 ScheduleData 的每个实体（科目 / 日程 / 覆盖）计算内容哈希，
+比较前后两次指纹即可得到“哪些实体变了”，空修改可直接丢弃。
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Optional, TYPE_CHECKING
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from src.core.schedule.model import ScheduleData
+
+
+def entity_bytes(model: BaseModel) -> bytes:
+    """实体的规范化 JSON（直接走 pydantic-core 序列化器，比 model_dump_json 少一层开销）"""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def entity_hash(model: BaseModel) -> str:
+    """实体内容哈希（blake2b-128，基于规范化 JSON），可跨进程 / 持久化使用"""
+    return hashlib.blake2b(entity_bytes(model), digest_size=16).hexdigest()
+
+
+def _order_hash(ids) -> str:
+    return hashlib.blake2b("\x1f".join(ids).encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True)
+class ScheduleFingerprint:
+    """
+    课程表在某一时刻的内容指纹
+    保存每个实体的规范化 JSON 而非摘要：比较是精确的，也省去逐个哈希的开销
+    """
+    meta: bytes
+    subjects: dict[str, bytes]
+    days: dict[str, bytes]
+    overrides: dict[str, bytes]
+    order: str  # days / overrides 的顺序参与解析结果，顺序变化也算修改
+
+    @classmethod
+    def of(cls, schedule: "ScheduleData") -> "ScheduleFingerprint":
+        days = {d.id: entity_bytes(d) for d in schedule.days}
+        overrides = {o.id: entity_bytes(o) for o in schedule.overrides}
+        return cls(
+            meta=entity_bytes(schedule.meta),
+            subjects={s.id: entity_bytes(s) for s in schedule.subjects},
+            days=days,
+            overrides=overrides,
+            order=_order_hash([*days, "|", *overrides]),
+        )
+
+    def hash_of(self, kind: str, entity_id: str) -> Optional[str]:
+        """某个实体的内容哈希（kind: subjects / days / overrides），不存在时返回 None"""
+        data = getattr(self, kind).get(entity_id)
+        if data is None:
+            return None
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass
+class ScheduleChanges:
+    """两次指纹之间变化的实体 id（新增、删除、修改都计入）"""
+    revision: int = 0
+    meta: bool = False
+    order: bool = False
+    subjects: set[str] = field(default_factory=set)
+    days: set[str] = field(default_factory=set)
+    overrides: set[str] = field(default_factory=set)
+
+    @staticmethod
+    def _changed(old: dict[str, bytes], new: dict[str, bytes]) -> set[str]:
+        return {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+
+    @classmethod
+    def between(cls, old: Optional[ScheduleFingerprint], new: ScheduleFingerprint) -> "ScheduleChanges":
+        if old is None:
+            return cls.full(new)
+        return cls(
+            meta=old.meta != new.meta,
+            order=old.order != new.order,
+            subjects=cls._changed(old.subjects, new.subjects),
+            days=cls._changed(old.days, new.days),
+            overrides=cls._changed(old.overrides, new.overrides),
+        )
+
+    @classmethod
+    def full(cls, fingerprint: ScheduleFingerprint) -> "ScheduleChanges":
+        """整表替换（加载 / 切换）时视为全部实体变化"""
+        return cls(
+            meta=True,
+            order=True,
+            subjects=set(fingerprint.subjects),
+            days=set(fingerprint.days),
+            overrides=set(fingerprint.overrides),
+        )
+
+    def is_empty(self) -> bool:
+        return not (self.meta or self.order or self.subjects or self.days or self.overrides)
+
+    def to_payload(self) -> dict:
+        """信号负载（QML / 插件友好）"""
+        return {
+            "revision": self.revision,
+            "meta": self.meta,
+            "order": self.order,
+            "subjects": sorted(self.subjects),
+            "days": sorted(self.days),
+            "overrides": sorted(self.overrides),
+        }
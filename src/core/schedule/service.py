@@ -8,6 +8,9 @@ from src.core.utils import get_week_number, get_cycle_week
 class ScheduleServices:
     def __init__(self, app_central):
         self.app_central = app_central
+        # (修订号, 星期, 周次) -> 已应用 override 的 Timeline；修订号变化即整体失效
+        self._day_cache: dict[tuple[int, int, int], Optional[Timeline]] = {}
+        self._day_cache_revision = -1
 
     def _get_reschedule_map(self) -> dict:
         return self.app_central.configs.schedule.reschedule_day
@@ -30,6 +33,24 @@ class ScheduleServices:
         max_week_cycle = schedule.meta.maxWeekCycle or 1
         current_week = get_cycle_week(raw_week_index, max_week_cycle)
 
+        # 仅缓存受 ScheduleManager 追踪的课表（revision > 0），返回值调用方只读
+        revision = schedule.revision
+        if revision > 0:
+            if revision != self._day_cache_revision:
+                self._day_cache.clear()
+                self._day_cache_revision = revision
+            key = (revision, weekday, current_week)
+            if key not in self._day_cache:
+                self._day_cache[key] = self.resolve_day(schedule, weekday, current_week, max_week_cycle)
+            return self._day_cache[key]
+        return self.resolve_day(schedule, weekday, current_week, max_week_cycle)
+
+    def resolve_day(self, schedule: ScheduleData, weekday: int, current_week: int,
+                    max_week_cycle: int) -> Optional[Timeline]:
+        """
+        指定 (星期, 周期周) 的日程：取第一个匹配的 Timeline，深拷贝并应用 override
+        不读取调休与配置，可在没有 app_central 时使用（如冲突索引、导出）
+        """
         for day in schedule.days:
             day_of_week_list = [day.dayOfWeek] if isinstance(day.dayOfWeek, int) else day.dayOfWeek
             if day_of_week_list and weekday in day_of_week_list:
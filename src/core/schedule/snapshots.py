@@ -0,0 +1,317 @@
+"""
+课程表快照仓库（内容寻址 + 去重）
+
+目录结构::
+
+    snapshots/
+        objects/ab/cdef...      zlib 压缩的实体 JSON，文件名即内容哈希
+        manifests/<课表名>/      每个快照一个清单 + index.json（列表用）
+        broken/                 无法解析的课表原文件
+
+meta、科目、日程各自一个对象，未变化的实体在快照之间共享；覆盖条目又小又多，
+按 id 哈希分到固定数量的桶里打包存储，顺序单独存成一个对象。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import zlib
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from src.core.schedule.model import ScheduleData
+from src.core.schedule.revision import entity_bytes, ScheduleFingerprint
+
+OVERRIDE_BUCKETS = 16
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _bucket_of(override_id: str) -> int:
+    return hashlib.blake2b(override_id.encode("utf-8"), digest_size=1).digest()[0] % OVERRIDE_BUCKETS
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+@dataclass
+class SnapshotInfo:
+    id: str
+    schedule: str
+    created: str  # ISO 时间
+    reason: str
+    revision: int
+    subjects: int
+    days: int
+    overrides: int
+    new_bytes: int  # 本次快照新写入的对象大小（压缩后）
+
+
+@dataclass
+class RetentionPolicy:
+    """保留最近 keep_recent 个；此外 keep_daily 天内每天保留一个，keep_weekly 周内每周保留一个"""
+    keep_recent: int = 20
+    keep_daily: int = 30
+    keep_weekly: int = 26
+
+
+class SnapshotStore:
+    def __init__(self, root: Path):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.manifests_dir = root / "manifests"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self._known: Optional[set[str]] = None  # 已存在的对象哈希，首次使用时扫描
+        self._latest_body: dict[str, dict] = {}  # 课表名 -> 最近一个快照的清单主体
+
+    # ── 对象 ─────────────────────────────────────────────
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _known_objects(self) -> set[str]:
+        if self._known is None:
+            self._known = {
+                p.parent.name + p.name
+                for p in self.objects_dir.glob("??/*") if not p.name.startswith(".")
+            }
+        return self._known
+
+    def _put(self, data: bytes) -> tuple[str, int]:
+        """写入对象，返回 (哈希, 新写入的字节数)；已存在则不重复写"""
+        digest = _digest(data)
+        known = self._known_objects()
+        if digest in known:
+            return digest, 0
+        path = self._object_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        _atomic_write(path, compressed)
+        known.add(digest)
+        return digest, len(compressed)
+
+    def _get(self, digest: str) -> bytes:
+        return zlib.decompress(self._object_path(digest).read_bytes())
+
+    # ── 清单 ─────────────────────────────────────────────
+
+    def _schedule_dir(self, name: str) -> Path:
+        return self.manifests_dir / name
+
+    def _read_index(self, name: str) -> list[dict]:
+        path = self._schedule_dir(name) / "index.json"
+        if not path.exists():
+            return []
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Snapshot index of '{name}' is unreadable, rebuilding: {e}")
+            return self._rebuild_index(name)
+
+    def _write_index(self, name: str, index: list[dict]):
+        _atomic_write(self._schedule_dir(name) / "index.json", json.dumps(index, ensure_ascii=False).encode("utf-8"))
+
+    def _rebuild_index(self, name: str) -> list[dict]:
+        index = []
+        for path in sorted(self._schedule_dir(name).glob("*.manifest.json")):
+            try:
+                index.append(json.loads(path.read_text(encoding="utf-8"))["info"])
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"Skipping broken snapshot manifest: {path.name}")
+        index.sort(key=lambda i: i["created"])
+        self._write_index(name, index)
+        return index
+
+    def _read_manifest(self, name: str, snapshot_id: str) -> dict:
+        path = self._schedule_dir(name) / f"{snapshot_id}.manifest.json"
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _latest(self, name: str) -> Optional[dict]:
+        if name not in self._latest_body:
+            index = self._read_index(name)
+            try:
+                self._latest_body[name] = self._read_manifest(name, index[-1]["id"])["body"] if index else None
+            except (OSError, ValueError, KeyError):
+                self._latest_body[name] = None
+        return self._latest_body[name]
+
+    # ── 公开接口 ─────────────────────────────────────────────
+
+    def snapshot(self, name: str, schedule: ScheduleData, reason: str = "", revision: int = 0,
+                 fingerprint: Optional[ScheduleFingerprint] = None) -> Optional[SnapshotInfo]:
+        """
+        为课表 name 记录一个快照；与最近一个快照内容完全相同时不记录，返回 None
+        fingerprint 与 schedule 内容一致时可直接复用其中的实体 JSON，省去重新序列化
+        """
+        if fingerprint is not None:
+            meta = fingerprint.meta
+            subjects = [fingerprint.subjects[s.id] for s in schedule.subjects]
+            days = [fingerprint.days[d.id] for d in schedule.days]
+            overrides = [fingerprint.overrides[o.id] for o in schedule.overrides]
+        else:
+            meta = entity_bytes(schedule.meta)
+            subjects = [entity_bytes(s) for s in schedule.subjects]
+            days = [entity_bytes(d) for d in schedule.days]
+            overrides = [entity_bytes(o) for o in schedule.overrides]
+
+        new_bytes = 0
+
+        def put(data: bytes) -> str:
+            nonlocal new_bytes
+            digest, written = self._put(data)
+            new_bytes += written
+            return digest
+
+        buckets: list[list[bytes]] = [[] for _ in range(OVERRIDE_BUCKETS)]
+        for o, data in zip(schedule.overrides, overrides):
+            buckets[_bucket_of(o.id)].append(data)
+
+        body = {
+            "meta": put(meta),
+            "subjects": [put(data) for data in subjects],
+            "days": [put(data) for data in days],
+            "overrides": {
+                "order": put(json.dumps([o.id for o in schedule.overrides]).encode("utf-8")),
+                "buckets": [put(b"[" + b",".join(sorted(b)) + b"]") if b else "" for b in buckets],
+            },
+        }
+
+        if body == self._latest(name):
+            return None
+
+        created = datetime.now()
+        snapshot_id = created.strftime("%Y%m%d%H%M%S%f")
+        info = SnapshotInfo(
+            id=snapshot_id,
+            schedule=name,
+            created=created.isoformat(timespec="seconds"),
+            reason=reason,
+            revision=revision,
+            subjects=len(schedule.subjects),
+            days=len(schedule.days),
+            overrides=len(schedule.overrides),
+            new_bytes=new_bytes,
+        )
+        schedule_dir = self._schedule_dir(name)
+        schedule_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(
+            schedule_dir / f"{snapshot_id}.manifest.json",
+            json.dumps({"info": asdict(info), "body": body}, ensure_ascii=False).encode("utf-8"),
+        )
+        index = self._read_index(name)
+        index.append(asdict(info))
+        self._write_index(name, index)
+        self._latest_body[name] = body
+        return info
+
+    def history(self, name: str) -> list[dict]:
+        """按时间倒序列出快照（只读 index.json）"""
+        return list(reversed(self._read_index(name)))
+
+    def restore(self, name: str, snapshot_id: str) -> ScheduleData:
+        """按清单重新组装课表"""
+        body = self._read_manifest(name, snapshot_id)["body"]
+        overrides_by_id = {}
+        for digest in body["overrides"]["buckets"]:
+            if digest:
+                for o in json.loads(self._get(digest)):
+                    overrides_by_id[o["id"]] = o
+        order = json.loads(self._get(body["overrides"]["order"]))
+
+        data = (
+            b'{"meta":' + self._get(body["meta"])
+            + b',"subjects":[' + b",".join(self._get(d) for d in body["subjects"])
+            + b'],"days":[' + b",".join(self._get(d) for d in body["days"])
+            + b'],"overrides":' + json.dumps([overrides_by_id[i] for i in order], ensure_ascii=False).encode("utf-8")
+            + b"}"
+        )
+        return ScheduleData.model_validate_json(data)
+
+    def delete(self, name: str, snapshot_ids: set[str]):
+        index = self._read_index(name)
+        for snapshot_id in snapshot_ids:
+            (self._schedule_dir(name) / f"{snapshot_id}.manifest.json").unlink(missing_ok=True)
+        self._write_index(name, [i for i in index if i["id"] not in snapshot_ids])
+        self._latest_body.pop(name, None)
+
+    def rename(self, old_name: str, new_name: str):
+        old_dir, new_dir = self._schedule_dir(old_name), self._schedule_dir(new_name)
+        if not old_dir.exists() or new_dir.exists():
+            return
+        old_dir.rename(new_dir)
+        self._latest_body.pop(old_name, None)
+        index = self._read_index(new_name)
+        for info in index:
+            info["schedule"] = new_name
+        self._write_index(new_name, index)
+
+    def prune(self, name: str, policy: RetentionPolicy, now: Optional[datetime] = None) -> int:
+        """按保留策略删除旧快照，返回删除数量（对象由 gc 回收）"""
+        now = now or datetime.now()
+        index = self._read_index(name)
+        keep: set[str] = {i["id"] for i in index[-policy.keep_recent:]} if policy.keep_recent > 0 else set()
+        seen_days: set[str] = set()
+        seen_weeks: set[tuple[int, int]] = set()
+        for info in reversed(index):  # 新 -> 旧，每个时间段保留最新的一个
+            created = datetime.fromisoformat(info["created"])
+            age = now - created
+            if age <= timedelta(days=policy.keep_daily):
+                day = created.date().isoformat()
+                if day not in seen_days:
+                    seen_days.add(day)
+                    keep.add(info["id"])
+            elif age <= timedelta(weeks=policy.keep_weekly):
+                week = created.isocalendar()[:2]
+                if week not in seen_weeks:
+                    seen_weeks.add(week)
+                    keep.add(info["id"])
+        expired = {i["id"] for i in index} - keep
+        if expired:
+            self.delete(name, expired)
+        return len(expired)
+
+    def gc(self) -> int:
+        """标记-清除：删除不再被任何清单引用的对象，返回删除数量"""
+        referenced: set[str] = set()
+        for path in self.manifests_dir.glob("*/*.manifest.json"):
+            try:
+                body = json.loads(path.read_text(encoding="utf-8"))["body"]
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"Skipping broken snapshot manifest during gc: {path}")
+                continue
+            referenced.add(body["meta"])
+            referenced.update(body["subjects"])
+            referenced.update(body["days"])
+            referenced.add(body["overrides"]["order"])
+            referenced.update(d for d in body["overrides"]["buckets"] if d)
+
+        known = self._known_objects()
+        unreferenced = known - referenced
+        for digest in unreferenced:
+            self._object_path(digest).unlink(missing_ok=True)
+        known -= unreferenced
+        return len(unreferenced)
+
+    def preserve_broken(self, path: Path) -> Path:
+        """保留无法解析的课表原文件，返回备份路径"""
+        broken_dir = self.root / "broken"
+        broken_dir.mkdir(parents=True, exist_ok=True)
+        dest = broken_dir / f"{path.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{path.suffix}"
+        shutil.copy2(path, dest)
+        return dest
+
+    def disk_usage(self) -> int:
+        return sum(p.stat().st_size for p in self.root.rglob("*") if p.is_file())
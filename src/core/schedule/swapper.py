@@ -3,11 +3,12 @@ Class Swap Manager - 换课管理器
 
 临时换课功能核心逻辑：
 - 通过操作 schedule 的 overrides 实现换课
-- 持久化换课记录到 configs.json
+- 持久化换课记录到 settings/schedule.json
 - 跨天时自动清理临时课表
 """
 import json
 from copy import deepcopy
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
@@ -24,10 +25,51 @@ if TYPE_CHECKING:
     from src.core.central import AppCentral
 
 
+@dataclass
+class _ResolvedIndex:
+    """
+    某一修订下的课表索引 + 已解析日程缓存
+    修订号变化（或课表对象被替换）即整体重建；同一次操作内追加的 override 会同步写入索引
+    """
+    schedule: ScheduleData
+    revision: int
+    entries: dict[str, Entry] = field(default_factory=dict)
+    subjects: dict[str, Subject] = field(default_factory=dict)
+    overrides_by_entry: dict[str, list[Timetable]] = field(default_factory=dict)
+    days: dict[tuple[int, int, int], list[dict]] = field(default_factory=dict)  # (星期, 周次, 修订号) -> 条目
+
+    @classmethod
+    def build(cls, schedule: ScheduleData) -> "_ResolvedIndex":
+        index = cls(schedule=schedule, revision=schedule.revision)
+        for day in schedule.days:
+            for entry in day.entries:
+                index.entries.setdefault(entry.id, entry)
+        index.subjects = {s.id: s for s in schedule.subjects}
+        for o in schedule.overrides:
+            index.overrides_by_entry.setdefault(o.entryId, []).append(o)
+        return index
+
+
+@dataclass
+class _SwapBatch:
+    """beginBatch() ~ commitBatch() 之间的状态：回滚用的原始数据 + 推迟到提交时执行的动作"""
+    overrides: list[Timetable]
+    records: list[dict]
+    swap_date: str
+    depth: int = 1
+    picker: Optional[tuple[int, int]] = None  # 推迟写入的换课界面选择
+    modified: bool = False  # 需要 schedule_manager.modify
+    records_dirty: bool = False  # 需要写入配置
+    swapped: bool = False  # 需要发出 swapCommitted
+    changed: bool = False  # 需要发出 updated
+    failed: bool = False  # 内层批量被回滚：最外层 commitBatch 时整体回滚
+
+
 class ClassSwapManager(QObject):
     """换课管理器，管理临时换课操作"""
     updated = Signal()
     swapCommitted = Signal()  # 换课提交成功
+    batchActiveChanged = Signal()
 
     def __init__(self, app_central: "AppCentral"):
         super().__init__()
@@ -38,6 +80,10 @@ class ClassSwapManager(QObject):
         self._swap_records: list[dict[str, str | int]] = []
         # 当前换课日期
         self._swap_date: str = ""
+        # 按修订号缓存的索引 / 已解析日程，供同一次操作内的各个辅助方法共享
+        self._index_cache: Optional[_ResolvedIndex] = None
+        # 批量换课（beginBatch/commitBatch）进行中时的状态
+        self._batch: Optional[_SwapBatch] = None
 
     # ── 数据查询 ────────────────────────────────────────────
 
@@ -68,6 +114,11 @@ class ClassSwapManager(QObject):
         """获取当前星期几"""
         return datetime.now().isoweekday()
 
+    def _effective_weekday(self, now: datetime) -> int:
+        """调休后实际按星期几上课（与 ScheduleServices.get_day_entries 一致）"""
+        reschedule_map = self.app_central.configs.schedule.reschedule_day or {}
+        return reschedule_map.get(now.strftime("%Y-%m-%d"), now.isoweekday())
+
     @Slot(result=int)
     def getCurrentWeekOfCycle(self) -> int:
         """获取当前周期内第几周"""
@@ -108,6 +159,10 @@ class ClassSwapManager(QObject):
         if week_of_cycle < 1 or week_of_cycle > max_cycle:
             week_of_cycle = 1
 
+        if self._batch is not None:
+            self._batch.picker = (day_of_week, week_of_cycle)
+            return
+
         swap_data = getattr(self.app_central.configs.schedule, "class_swap", None)
         if not isinstance(swap_data, dict):
             swap_data = {}
@@ -132,20 +187,22 @@ class ClassSwapManager(QObject):
             week_of_cycle = 1
 
         self.setSwapPickerContext(day_of_week, week_of_cycle)
+        self._snapshot_before_swap()
 
         apply_day_of_week = self.getCurrentDayOfWeek()
         apply_week_of_cycle = self.getCurrentWeekOfCycle()
 
         # ComboBox 切换时，先清理“今天”已有的临时 swap 覆盖，再整天投射
-        self._clear_today_swap_overrides(apply_day_of_week, apply_week_of_cycle)
+        self._clear_today_swap_overrides(apply_day_of_week, apply_week_of_cycle, commit=False)
         self._apply_day_schedule_to_today(
             day_of_week,
             week_of_cycle,
             apply_day_of_week,
             apply_week_of_cycle,
         )
+        self._commit()
 
-        self.updated.emit()
+        self._notify()
         return True
 
     @Slot(result=int)
@@ -180,6 +237,7 @@ class ClassSwapManager(QObject):
 
         # 记录用户在换课界面的选择
         self.setSwapPickerContext(day_of_week, week_of_cycle)
+        self._snapshot_before_swap()
 
         # 先把「所选星期+周次」课表整体应用到今天，再在今天执行换课
         self._apply_day_schedule_to_today(
@@ -207,6 +265,7 @@ class ClassSwapManager(QObject):
 
         if not apply_entry_id_a or not apply_entry_id_b:
             logger.warning("[ClassSwap] Cannot map selected entries to today's temporary schedule")
+            self._commit()
             return False
 
         # 获取两个 entry 当前应用 override 后的真实 subjectId
@@ -215,6 +274,7 @@ class ClassSwapManager(QObject):
 
         if real_a is None or real_b is None:
             logger.warning("Cannot swap: one of the entries not found")
+            self._commit()
             return False
 
         weeks_val = apply_week_of_cycle if max_cycle > 1 else "all"
@@ -226,6 +286,7 @@ class ClassSwapManager(QObject):
             weeks_val,
             real_b["subjectId"],
             real_b.get("title", ""),
+            commit=False,
         )
         self._set_or_update_override(
             apply_entry_id_b,
@@ -233,13 +294,14 @@ class ClassSwapManager(QObject):
             weeks_val,
             real_a["subjectId"],
             real_a.get("title", ""),
+            commit=False,
         )
+        self._commit()
 
         # 记录
         self._add_swap_record("swap", apply_entry_id_a, apply_entry_id_b, real_a["subjectId"], real_b["subjectId"])
 
-        self.swapCommitted.emit()
-        self.updated.emit()
+        self._notify(swapped=True)
         return True
 
     @Slot(str, str, int, int, result=bool)
@@ -258,6 +320,7 @@ class ClassSwapManager(QObject):
 
         # 记录用户在换课界面的选择
         self.setSwapPickerContext(day_of_week, week_of_cycle)
+        self._snapshot_before_swap()
 
         # 先把「所选星期+周次」课表整体应用到今天，再在今天执行替换
         self._apply_day_schedule_to_today(
@@ -277,6 +340,7 @@ class ClassSwapManager(QObject):
         )
         if not apply_entry_id:
             logger.warning("[ClassSwap] Cannot map selected entry to today's temporary schedule")
+            self._commit()
             return False
 
         old_info = self._get_effective_subject(apply_entry_id, apply_day_of_week, apply_week_of_cycle, max_cycle)
@@ -284,24 +348,216 @@ class ClassSwapManager(QObject):
 
         weeks_val = apply_week_of_cycle if max_cycle > 1 else "all"
 
-        self._set_or_update_override(apply_entry_id, [apply_day_of_week], weeks_val, new_subject_id, "")
+        self._set_or_update_override(apply_entry_id, [apply_day_of_week], weeks_val, new_subject_id, "", commit=False)
+        self._commit()
 
         self._add_swap_record("replace", apply_entry_id, "", old_subject_id, new_subject_id)
 
-        self.swapCommitted.emit()
-        self.updated.emit()
+        self._notify(swapped=True)
+        return True
+
+    # ── 冲突预览 ─────────────────────────────────────────────
+
+    @Slot(str, str, int, int, result=list)
+    def previewReplaceConflicts(self, entry_id: str, new_subject_id: str,
+                                day_of_week: int, week_of_cycle: int) -> list:
+        """
+        预览 replaceEntry 后，新科目的教师 / 教室在今天同一时段是否已被其他课表占用
+        Returns:
+            list[dict]: Booking.to_dict()，附带 targetEntryId
+        """
+        slot = self._today_slot(entry_id, day_of_week, week_of_cycle)
+        return self._slot_conflicts(slot, self._find_subject(new_subject_id))
+
+    @Slot(str, str, int, int, result=list)
+    def previewSwapConflicts(self, entry_id_a: str, entry_id_b: str,
+                             day_of_week: int, week_of_cycle: int) -> list:
+        """预览 swapTwoEntries 后两个时段的教师 / 教室冲突"""
+        schedule = self.app_central.schedule_manager.schedule
+        if not schedule:
+            return []
+        max_cycle = schedule.meta.maxWeekCycle or 1
+        real_a = self._get_effective_subject(entry_id_a, day_of_week, week_of_cycle, max_cycle)
+        real_b = self._get_effective_subject(entry_id_b, day_of_week, week_of_cycle, max_cycle)
+        if real_a is None or real_b is None:
+            return []
+        slot_a = self._today_slot(entry_id_a, day_of_week, week_of_cycle)
+        slot_b = self._today_slot(entry_id_b, day_of_week, week_of_cycle)
+        return (self._slot_conflicts(slot_a, self._find_subject(real_b["subjectId"]))
+                + self._slot_conflicts(slot_b, self._find_subject(real_a["subjectId"])))
+
+    def _today_slot(self, entry_id: str, day_of_week: int, week_of_cycle: int) -> Optional[dict]:
+        """所选 星期+周次 中的 entry 投射到今天后的条目"""
+        apply_day_of_week = self.getCurrentDayOfWeek()
+        apply_week_of_cycle = self.getCurrentWeekOfCycle()
+        target_id = self._map_entry_to_day(
+            entry_id, day_of_week, week_of_cycle, apply_day_of_week, apply_week_of_cycle
+        ) or entry_id
+        for item in self._get_day_entries(apply_day_of_week, apply_week_of_cycle, include_non_class=True):
+            if item["id"] == target_id:
+                return item
+        return None
+
+    def _slot_conflicts(self, slot: Optional[dict], subject: Optional[Subject]) -> list:
+        if slot is None or subject is None or not (subject.teacher or subject.location):
+            return []
+        manager = self.app_central.schedule_manager
+        # 只读取后台刷新好的索引，不在 GUI 线程解析课表
+        exclude = {manager.current_schedule_name} if manager.current_schedule_name else None
+        now = datetime.now()
+        hits = manager.conflicts.conflicts_for(
+            subject.teacher, subject.location, now.date(),
+            slot["startTime"], slot["endTime"], exclude=exclude, weekday=self._effective_weekday(now),
+        )
+        return [{**hit.to_dict(), "targetEntryId": slot["id"]} for hit in hits]
+
+    # ── 批量换课 ─────────────────────────────────────────────
+
+    @Property(bool, notify=batchActiveChanged)
+    def batchActive(self) -> bool:
+        return self._batch is not None
+
+    @Slot()
+    def beginBatch(self):
+        """
+        开始批量换课：之后的 swapTwoEntries / replaceEntry / applyPickerToToday 只在内存中修改，
+        commitBatch() 时统一校验、持久化并刷新一次；可嵌套，以最外层为准
+        """
+        if self._batch is not None:
+            self._batch.depth += 1
+            return
+        schedule = self.app_central.schedule_manager.schedule
+        self.app_central.schedule_manager.snapshot("before swap")
+        self._batch = _SwapBatch(
+            overrides=[o.model_copy() for o in schedule.overrides] if schedule else [],
+            records=deepcopy(self._swap_records),
+            swap_date=self._swap_date,
+        )
+        self.batchActiveChanged.emit()
+
+    @Slot(result=bool)
+    def commitBatch(self) -> bool:
+        """提交批量换课；校验失败时整体回滚并返回 False"""
+        batch = self._batch
+        if batch is None:
+            return False
+        batch.depth -= 1
+        if batch.depth > 0:
+            return not batch.failed
+
+        if batch.failed:
+            logger.warning("[ClassSwap] Batch rejected: a nested batch was rolled back")
+            self.rollbackBatch()
+            return False
+        problems = self._validate_swap_overrides()
+        if problems:
+            for problem in problems:
+                logger.warning(f"[ClassSwap] Batch rejected: {problem}")
+            self.rollbackBatch()
+            return False
+
+        self._batch = None
+        if batch.modified:
+            self._commit()
+        if batch.records_dirty or batch.picker is not None:
+            self._write_swap_state(batch.picker)
+        if batch.changed:
+            self._notify(swapped=batch.swapped)
+        self.batchActiveChanged.emit()
+        logger.info(f"[ClassSwap] Batch committed ({len(self._swap_records)} records)")
         return True
 
+    @Slot()
+    def rollbackBatch(self):
+        """
+        放弃批量换课中的全部修改
+        嵌套时只结束当前这一层并标记失败，由最外层的 commitBatch / rollbackBatch 恢复
+        """
+        batch = self._batch
+        if batch is None:
+            return
+        if batch.depth > 1:
+            batch.depth -= 1
+            batch.failed = True
+            logger.info("[ClassSwap] Nested batch failed, the outer batch will be rolled back")
+            return
+        self._batch = None
+        schedule = self.app_central.schedule_manager.schedule
+        if schedule:
+            schedule.overrides = batch.overrides
+        self._invalidate_index()
+        self._swap_records = batch.records
+        self._swap_date = batch.swap_date
+        self.batchActiveChanged.emit()
+        logger.info("[ClassSwap] Batch rolled back")
+
+    @Slot(list, int, int, result=bool)
+    def applySwapBatch(self, operations: list, day_of_week: int, week_of_cycle: int) -> bool:
+        """
+        一次性执行多个换课操作，全部成功才提交
+
+        Args:
+            operations: [{"type": "swap", "entry_a": ..., "entry_b": ...},
+                         {"type": "replace", "entry_a": ..., "new_subject": ...}, ...]
+            day_of_week / week_of_cycle: 换课界面所选的 星期+周次
+        """
+        self.beginBatch()
+        try:
+            for op in operations:
+                op_type = op.get("type") if isinstance(op, dict) else None
+                if op_type == "swap":
+                    ok = self.swapTwoEntries(op.get("entry_a", ""), op.get("entry_b", ""),
+                                             day_of_week, week_of_cycle)
+                elif op_type == "replace":
+                    ok = self.replaceEntry(op.get("entry_a", ""), op.get("new_subject", ""),
+                                           day_of_week, week_of_cycle)
+                else:
+                    logger.warning(f"[ClassSwap] Unknown batch operation: {op}")
+                    ok = False
+                if not ok:
+                    self.rollbackBatch()
+                    return False
+        except Exception as e:
+            logger.exception(f"[ClassSwap] Batch failed: {e}")
+            self.rollbackBatch()
+            return False
+        return self.commitBatch()
+
+    def _validate_swap_overrides(self) -> list[str]:
+        """检查换课 override 引用的条目 / 科目是否都存在"""
+        schedule = self.app_central.schedule_manager.schedule
+        if not schedule:
+            return ["no schedule loaded"]
+        index = self._index()
+        problems = []
+        for o in schedule.overrides:
+            if not o.id.startswith("swap_"):
+                continue
+            if o.entryId not in index.entries:
+                problems.append(f"override {o.id} targets missing entry {o.entryId}")
+            elif o.subjectId and o.subjectId not in index.subjects:
+                problems.append(f"override {o.id} uses missing subject {o.subjectId}")
+        return problems
+
     # ── 持久化 ─────────────────────────────────────────────
 
     @Slot()
     def saveSwapRecords(self):
-        """保存换课记录到配置"""
+        """保存换课记录到配置（批量换课中推迟到 commitBatch）"""
+        if self._batch is not None:
+            self._batch.records_dirty = True
+            return
+        self._write_swap_state()
+
+    def _write_swap_state(self, picker: Optional[tuple[int, int]] = None):
+        """写入换课记录 + 换课界面选择（picker 为空时沿用配置中已有的选择）"""
         today = datetime.now().strftime("%Y-%m-%d")
         current_swap_data = getattr(self.app_central.configs.schedule, "class_swap", None)
         day_of_week = self.getPreferredDayOfWeek()
         week_of_cycle = self.getPreferredWeekOfCycle()
-        if isinstance(current_swap_data, dict):
+        if picker is not None:
+            day_of_week, week_of_cycle = picker
+        elif isinstance(current_swap_data, dict):
             stored_day = current_swap_data.get("day_of_week")
             stored_week = current_swap_data.get("week_of_cycle")
             if isinstance(stored_day, int):
@@ -351,8 +607,9 @@ class ClassSwapManager(QObject):
         records = swap_data.get("records", [])
         self._swap_records = [self._normalize_swap_record(r) for r in records if isinstance(r, dict)]
         self._swap_date = saved_date
-        self.setSwapPickerContext(day_of_week, week_of_cycle)
-        self.saveSwapRecords()
+        with self.app_central.configs.batch():
+            self.setSwapPickerContext(day_of_week, week_of_cycle)
+            self.saveSwapRecords()
         self._rebuild_overrides_from_records(self._swap_records)
         logger.info(f"Loaded {len(self._swap_records)} swap records for today")
 
@@ -399,15 +656,49 @@ class ClassSwapManager(QObject):
 
     # ── 内部方法 ─────────────────────────────────────────────
 
+    def _index(self) -> _ResolvedIndex:
+        """当前修订的索引；未被 ScheduleManager 追踪的课表（revision 0）每次重建"""
+        schedule = self.app_central.schedule_manager.schedule
+        cached = self._index_cache
+        if (cached is None or cached.schedule is not schedule
+                or cached.revision != schedule.revision or schedule.revision == 0):
+            cached = self._index_cache = _ResolvedIndex.build(schedule)
+        return cached
+
+    def _invalidate_index(self):
+        """overrides 列表被整体替换后调用"""
+        self._index_cache = None
+
+    def _commit(self):
+        """把本次操作中对 overrides 的修改一次性提交给 ScheduleManager；批量换课中推迟到 commitBatch"""
+        if self._batch is not None:
+            self._batch.modified = True
+            # 修订号不变，但下一次操作需要看到本次修改后的日程
+            if self._index_cache is not None:
+                self._index_cache.days.clear()
+            return
+        self.app_central.schedule_manager.modify(self.app_central.schedule_manager.schedule)
+
+    def _snapshot_before_swap(self):
+        if self._batch is None:  # 批量换课在 beginBatch 时统一记录
+            self.app_central.schedule_manager.snapshot("before swap")
+
+    def _notify(self, swapped: bool = False):
+        """发出 swapCommitted / updated；批量换课中推迟到 commitBatch"""
+        if self._batch is not None:
+            self._batch.swapped |= swapped
+            self._batch.changed = True
+            return
+        if swapped:
+            self.swapCommitted.emit()
+        self.updated.emit()
+
     def _find_subject(self, subject_id: str) -> Optional[Subject]:
         """查找科目"""
         schedule = self.app_central.schedule_manager.schedule
         if not schedule or not subject_id:
             return None
-        for s in schedule.subjects:
-            if s.id == subject_id:
-                return s
-        return None
+        return self._index().subjects.get(subject_id)
 
     def _get_effective_subject(self, entry_id: str, day_of_week: int,
                                week_of_cycle: int, max_cycle: int) -> Optional[dict]:
@@ -416,16 +707,8 @@ class ClassSwapManager(QObject):
         if not schedule:
             return None
 
-        # 找原始 entry
-        entry = None
-        for day in schedule.days:
-            for e in day.entries:
-                if e.id == entry_id:
-                    entry = e
-                    break
-            if entry:
-                break
-
+        index = self._index()
+        entry = index.entries.get(entry_id)
         if not entry:
             return None
 
@@ -435,9 +718,7 @@ class ClassSwapManager(QObject):
 
         # 应用 override
         best_priority = -1
-        for o in schedule.overrides:
-            if o.entryId != entry_id:
-                continue
+        for o in index.overrides_by_entry.get(entry_id, ()):
             if o.dayOfWeek and day_of_week not in o.dayOfWeek:
                 continue
 
@@ -468,15 +749,17 @@ class ClassSwapManager(QObject):
     def _set_or_update_override(self, entry_id: str, day_of_week: list,
                                  weeks, subject_id: str, title: str,
                                  start_time: Optional[str] = None,
-                                 end_time: Optional[str] = None):
-        """设置或更新 override"""
+                                 end_time: Optional[str] = None,
+                                 commit: bool = True):
+        """设置或更新 override；commit=False 时由调用方在操作结束后统一 _commit()"""
         schedule = self.app_central.schedule_manager.schedule
         if not schedule:
             return
 
+        index = self._index()
         # 查找已有 override
-        for o in schedule.overrides:
-            if o.entryId == entry_id and o.dayOfWeek == day_of_week:
+        for o in index.overrides_by_entry.get(entry_id, ()):
+            if o.dayOfWeek == day_of_week:
                 # 检查 weeks 匹配
                 if o.weeks == weeks or (isinstance(weeks, str) and weeks == "all" and o.weeks is None):
                     o.subjectId = subject_id or None
@@ -485,7 +768,8 @@ class ClassSwapManager(QObject):
                         o.startTime = start_time or None
                     if end_time is not None:
                         o.endTime = end_time or None
-                    self.app_central.schedule_manager.modify(schedule)
+                    if commit:
+                        self._commit()
                     return
 
         # 新建 override
@@ -500,7 +784,9 @@ class ClassSwapManager(QObject):
             endTime=end_time,
         )
         schedule.overrides.append(override)
-        self.app_central.schedule_manager.modify(schedule)
+        index.overrides_by_entry.setdefault(entry_id, []).append(override)
+        if commit:
+            self._commit()
 
     def _add_swap_record(self, swap_type: str, entry_a: str, entry_b: str,
                           old_subject: str, new_subject: str):
@@ -576,6 +862,7 @@ class ClassSwapManager(QObject):
                 f"[ClassSwap] apply day schedule failed: source={len(source_entries)}, target={len(target_entries)}"
             )
             return
+        # 注意：这里只修改、不提交，由调用方在整个操作结束时统一 _commit()
 
         size = min(len(source_entries), len(target_entries))
         for idx in range(size):
@@ -593,6 +880,7 @@ class ClassSwapManager(QObject):
                 src.get("title", "") or "",
                 src.get("startTime", "") or "",
                 src.get("endTime", "") or "",
+                commit=False,
             )
 
     def _get_day_entries(self, day_of_week: int, week_of_cycle: int, include_non_class: bool) -> list:
@@ -602,12 +890,31 @@ class ClassSwapManager(QObject):
             logger.warning("[ClassSwap] getDayEntries: schedule is None")
             return []
 
+        entries = self._resolve_day(day_of_week, week_of_cycle)
+        if include_non_class:
+            return list(entries)
+        return [e for e in entries if e["type"] in (EntryType.CLASS, EntryType.ACTIVITY)]
+
+    def _resolve_day(self, day_of_week: int, week_of_cycle: int) -> list[dict]:
+        """
+        解析指定 day/week 的全部条目（已应用 override，含科目信息）
+        结果按 (星期, 周次, 修订号) 缓存；同一次操作中未提交的 override 修改不会改变条目 id 与顺序，
+        因此映射类调用可以安全复用提交前的缓存
+        """
+        index = self._index()
+        key = (day_of_week, week_of_cycle, index.revision)
+        cached = index.days.get(key)
+        if cached is not None:
+            return cached
+
+        schedule = index.schedule
         max_cycle = schedule.meta.maxWeekCycle or 1
         logger.info(
             f"[ClassSwap] getDayEntries request day={day_of_week}, week={week_of_cycle}, "
             f"days={len(schedule.days)}, overrides={len(schedule.overrides)}"
         )
 
+        result = []
         for day in schedule.days:
             day_of_week_list = [day.dayOfWeek] if isinstance(day.dayOfWeek, int) else day.dayOfWeek
             if day_of_week_list and day_of_week not in day_of_week_list:
@@ -620,44 +927,35 @@ class ClassSwapManager(QObject):
                 f"dayOfWeek={day.dayOfWeek}, weeks={day.weeks}"
             )
 
-            day_copy = day.model_copy()
-            day_copy.entries = [entry.model_copy() for entry in day.entries]
-
-            for entry in day_copy.entries:
-                for override in schedule.overrides:
-                    if override.entryId != entry.id:
-                        continue
+            for entry in day.entries:
+                d = entry.model_dump()
+                for override in index.overrides_by_entry.get(entry.id, ()):
                     if self._override_applies(override, day_of_week, week_of_cycle, max_cycle):
                         if override.subjectId:
-                            entry.subjectId = override.subjectId
+                            d["subjectId"] = override.subjectId
                         if override.title:
-                            entry.title = override.title
+                            d["title"] = override.title
                         if override.startTime:
-                            entry.startTime = override.startTime
+                            d["startTime"] = override.startTime
                         if override.endTime:
-                            entry.endTime = override.endTime
-
-            result = []
-            for e in day_copy.entries:
-                entry_type = e.type.value if isinstance(e.type, EntryType) else str(e.type)
-                if (not include_non_class) and entry_type not in {EntryType.CLASS.value, EntryType.ACTIVITY.value}:
-                    continue
-                d = e.model_dump()
-                subj = self._find_subject(e.subjectId)
-                d["subjectName"] = subj.name if subj else (e.title or "")
+                            d["endTime"] = override.endTime
+                subj = index.subjects.get(d["subjectId"]) if d["subjectId"] else None
+                d["subjectName"] = subj.name if subj else (d["title"] or "")
                 d["subjectColor"] = subj.color if subj else ""
                 d["subjectIcon"] = subj.icon if subj else ""
                 result.append(d)
 
             logger.info(f"[ClassSwap] return entries={len(result)}")
-            return result
+            break
+        else:
+            logger.warning(
+                f"[ClassSwap] no timeline matched for day={day_of_week}, week={week_of_cycle}, max_cycle={max_cycle}"
+            )
 
-        logger.warning(
-            f"[ClassSwap] no timeline matched for day={day_of_week}, week={week_of_cycle}, max_cycle={max_cycle}"
-        )
-        return []
+        index.days[key] = result
+        return result
 
-    def _clear_today_swap_overrides(self, day_of_week: int, week_of_cycle: int):
+    def _clear_today_swap_overrides(self, day_of_week: int, week_of_cycle: int, commit: bool = True):
         """清理今天（指定 day/week）已有 swap override，确保重新投射是全量快照"""
         schedule = self.app_central.schedule_manager.schedule
         if not schedule:
@@ -673,9 +971,11 @@ class ClassSwapManager(QObject):
         ]
         after = len(schedule.overrides)
         if after != before:
-            self.app_central.schedule_manager.modify(schedule)
+            self._invalidate_index()
+            if commit:
+                self._commit()
 
-    def _cleanup_swap_overrides(self, records: list):
+    def _cleanup_swap_overrides(self, records: list, commit: bool = True):
         """清理换课产生的 override"""
         schedule = self.app_central.schedule_manager.schedule
         if not schedule:
@@ -688,7 +988,9 @@ class ClassSwapManager(QObject):
 
         if swap_ids:
             schedule.overrides = [o for o in schedule.overrides if o.id not in swap_ids]
-            self.app_central.schedule_manager.modify(schedule)
+            self._invalidate_index()
+            if commit:
+                self._commit()
             logger.info(f"Cleaned up {len(swap_ids)} swap overrides")
 
     def _rebuild_overrides_from_records(self, records: list):
@@ -701,7 +1003,7 @@ class ClassSwapManager(QObject):
             return
 
         # 先清理已有 swap override，避免重复叠加
-        self._cleanup_swap_overrides(records)
+        self._cleanup_swap_overrides(records, commit=False)
 
         max_cycle = schedule.meta.maxWeekCycle or 1
         apply_day_of_week = self.getCurrentDayOfWeek()
@@ -724,7 +1026,8 @@ class ClassSwapManager(QObject):
                             [apply_day_of_week],
                             weeks_val,
                             new_subject,
-                            ""
+                            "",
+                            commit=False,
                         )
                     if entry_b and old_subject:
                         self._set_or_update_override(
@@ -732,7 +1035,8 @@ class ClassSwapManager(QObject):
                             [apply_day_of_week],
                             weeks_val,
                             old_subject,
-                            ""
+                            "",
+                            commit=False,
                         )
 
                 elif swap_type == "replace":
@@ -744,11 +1048,14 @@ class ClassSwapManager(QObject):
                             [apply_day_of_week],
                             weeks_val,
                             new_subject,
-                            ""
+                            "",
+                            commit=False,
                         )
             except Exception as e:
                 logger.warning(f"[ClassSwap] Failed to rebuild override from record: {record}, error: {e}")
 
+        self._commit()
+
     @staticmethod
     def _is_in_week(weeks, current_week: int, max_week_cycle: int = 1) -> bool:
         if weeks is None:
@@ -0,0 +1,45 @@
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from src.core.schedule.conflicts import ResourceConflictIndex
+from src.core.schedule.diff import merge_schedules, Side
+from src.core.schedule.model import ScheduleData
+
+
+class ScheduleMergeWorker(QObject):
+    """在后台线程执行三方合并，避免大课表阻塞 GUI"""
+    finished = Signal(object)  # MergeResult
+    error = Signal(str)
+
+    def __init__(self, base: Optional[ScheduleData], local: ScheduleData, remote: ScheduleData,
+                 prefer: Side = "remote"):
+        super().__init__()
+        self.base = base
+        self.local = local
+        self.remote = remote
+        self.prefer = prefer
+
+    @Slot()
+    def run(self):
+        try:
+            self.finished.emit(merge_schedules(self.base, self.local, self.remote, self.prefer))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class ConflictIndexWorker(QObject):
+    """在后台线程增量刷新教师 / 教室占用索引（解析目录中的课表）"""
+    finished = Signal(int)  # 重建的课表数量
+    error = Signal(str)
+
+    def __init__(self, index: ResourceConflictIndex):
+        super().__init__()
+        self.index = index
+
+    @Slot()
+    def run(self):
+        try:
+            self.finished.emit(self.index.refresh())
+        except Exception as e:
+            self.error.emit(str(e))
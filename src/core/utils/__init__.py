@@ -4,12 +4,27 @@ from packaging.version import Version
 
 from .json_loader import JsonLoader
 from .calculator import get_cycle_week, get_week_number
-from .tray import TrayIcon
-from .subjects import DEFAULT_SUBJECTS, get_default_subjects, translate_sources
-from .translator import AppTranslator
-from .backend import UtilsBackend
 from uuid import uuid4
 
+# 依赖 Qt 的部分按需导入（PEP 562）
+_LAZY = {
+    "TrayIcon": ".tray",
+    "DEFAULT_SUBJECTS": ".subjects",
+    "get_default_subjects": ".subjects",
+    "translate_sources": ".subjects",
+    "AppTranslator": ".translator",
+    "UtilsBackend": ".backend",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Parser
 def generate_id(prefix: str = "id") -> str:
@@ -10,6 +10,7 @@ class DebuggerWindow(RinUIWindow):
 
         self.engine.rootContext().setContextProperty("AppCentral", instance)
         self.engine.rootContext().setContextProperty("UtilsBackend", instance.utils_backend)
+        self.engine.rootContext().setContextProperty("PluginProfiler", instance.plugin_api.profiler)
 
         self.engine.addImportPath(QML_PATH)
         self.load(QML_PATH / "Debugger" / "MainWindow.qml")
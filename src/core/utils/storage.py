@@ -0,0 +1,39 @@
+"""
+课表与配置的存储格式
+
+- pretty：缩进 4 格的 JSON（默认，便于手动查看与编辑）
+- compact：不含多余空白的 JSON，文件约为 pretty 的一半，读写更快
+
+两种格式都由 pydantic-core 直接序列化 / 解析（不经过 json 模块和中间 dict），
+读取时无需关心文件是哪种格式；导入导出始终使用 pretty。
+"""
+from enum import Enum
+from typing import Any
+
+from pydantic_core import from_json, to_json
+
+
+class StorageFormat(str, Enum):
+    PRETTY = "pretty"
+    COMPACT = "compact"
+
+
+def _indent(fmt: StorageFormat) -> int | None:
+    return None if fmt == StorageFormat.COMPACT else 4
+
+
+def encode(value: Any, fmt: StorageFormat = StorageFormat.PRETTY) -> bytes:
+    """序列化 pydantic 模型或普通 dict / list（非 ASCII 字符原样输出）"""
+    return to_json(value, indent=_indent(fmt), fallback=str)
+
+
+def detect_format(data: bytes) -> StorageFormat:
+    """pretty 格式的 JSON 一定有换行；compact 中的换行只会以 \\n 转义的形式出现在字符串里"""
+    return StorageFormat.PRETTY if b"\n" in data.strip() else StorageFormat.COMPACT
+
+
+def to_pretty(data: bytes) -> bytes:
+    """转换为 pretty 格式（已是 pretty 时原样返回）"""
+    if detect_format(data) == StorageFormat.PRETTY:
+        return data
+    return encode(from_json(data), StorageFormat.PRETTY)
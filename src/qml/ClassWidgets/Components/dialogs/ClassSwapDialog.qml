@@ -175,13 +175,36 @@ Window {
 
     function getPreviewText() {
         let src = getSourceDisplayText()
+        let text
         if (isSwap) {
             let tgt = getTargetDisplayText()
-            return `${src} ⇌ ${tgt} ?`
+            text = `${src} ⇌ ${tgt} ?`
         } else {
             let tgt = getTargetDisplayText()
-            return `${src} → ${tgt} ?`
+            text = `${src} → ${tgt} ?`
         }
+        let conflicts = getConflictText()
+        return conflicts ? `${text}\n${conflicts}` : text
+    }
+
+    // 教师 / 教室在其他课表同一时段已有安排
+    function getConflictText() {
+        if (!sourceEntry) return ""
+        let conflicts = []
+        if (isSwap && targetEntry) {
+            conflicts = ClassSwapManager.previewSwapConflicts(
+                sourceEntry.entryId, targetEntry.entryId, selectedDayOfWeek, selectedWeekCycle)
+        } else if (!isSwap && targetSubjectId) {
+            conflicts = ClassSwapManager.previewReplaceConflicts(
+                sourceEntry.entryId, targetSubjectId, selectedDayOfWeek, selectedWeekCycle)
+        }
+        if (conflicts.length === 0) return ""
+        let c = conflicts[0]
+        let what = c.kind === "teacher" ? qsTr("Teacher %1").arg(c.value) : qsTr("Room %1").arg(c.value)
+        let text = qsTr("%1 is busy in \"%2\" (%3-%4)").arg(what).arg(c.schedule).arg(c.startTime).arg(c.endTime)
+        if (conflicts.length > 1)
+            text += qsTr(" and %1 more").arg(conflicts.length - 1)
+        return text
     }
 
     function getStatusText() {
@@ -210,9 +210,11 @@ ColumnLayout {
         }
 
         onAccepted: {
+            Configs.beginBatch()
             Configs.set("schedule.default_duration.class_", classDuration.value)
             Configs.set("schedule.default_duration.break_", breakDuration.value)
             Configs.set("schedule.default_duration.activity", activityDuration.value)
+            Configs.endBatch()
         }
 
         Component.onCompleted: {
@@ -169,26 +169,21 @@ Clip {
                     MenuItem {
                         text: qsTr("Export to CSES")
                         onClicked: {
+                            // 转换在后台进行，结果见下方 Connections
                             if (AppCentral.scheduleManager.scheduleIO.exportToCSES(filename)) {
-                                floatLayer.createInfoBar(
-                                    {
-                                        severity: Severity.Success,
-                                        title: qsTr("Export Success"),
-                                        text: qsTr("The schedule has been exported as CSES format")
-                                    }
-                                )
+                                exportingCses = true
                             } else {
-                                floatLayer.createInfoBar(
-                                    {
-                                        severity: Severity.Error,
-                                        title: qsTr("Export Failed"),
-                                        text: qsTr(
-                                            "Failed to export the schedule as CSES format. " +
-                                            "Please change the output directory "+
-                                            "or send the log file to the developer or community to help us sort it out."
-                                        )
-                                    }
-                                )
+                                showCsesExportFailed()
+                            }
+                        }
+                    }
+                    MenuItem {
+                        text: qsTr("Export to iCalendar")
+                        onClicked: {
+                            if (AppCentral.scheduleManager.scheduleIO.exportToICS(filename)) {
+                                exportingIcs = true
+                            } else {
+                                showIcsExportFailed()
                             }
                         }
                     }
@@ -197,6 +192,67 @@ Clip {
         }
     }
 
+    property bool exportingCses: false
+    property bool exportingIcs: false
+
+    function showCsesExportFailed() {
+        floatLayer.createInfoBar(
+            {
+                severity: Severity.Error,
+                title: qsTr("Export Failed"),
+                text: qsTr(
+                    "Failed to export the schedule as CSES format. " +
+                    "Please change the output directory "+
+                    "or send the log file to the developer or community to help us sort it out."
+                )
+            }
+        )
+    }
+
+    function showIcsExportFailed() {
+        floatLayer.createInfoBar(
+            {
+                severity: Severity.Error,
+                title: qsTr("Export Failed"),
+                text: qsTr(
+                    "Failed to export the schedule as iCalendar format. " +
+                    "Please change the output directory "+
+                    "or send the log file to the developer or community to help us sort it out."
+                )
+            }
+        )
+    }
+
+    Connections {
+        target: AppCentral.scheduleManager.scheduleIO
+        enabled: exportingCses || exportingIcs
+
+        function onExportFinished(path) {
+            const ics = exportingIcs
+            exportingCses = false
+            exportingIcs = false
+            floatLayer.createInfoBar(
+                {
+                    severity: Severity.Success,
+                    title: qsTr("Export Success"),
+                    text: ics ? qsTr("The schedule has been exported as iCalendar format")
+                              : qsTr("The schedule has been exported as CSES format")
+                }
+            )
+        }
+
+        function onExportFailed(msg) {
+            const ics = exportingIcs
+            exportingCses = false
+            exportingIcs = false
+            if (ics) {
+                showIcsExportFailed()
+            } else {
+                showCsesExportFailed()
+            }
+        }
+    }
+
     // dialogs
 
     Dialog {
@@ -56,6 +56,11 @@ FluentWindow {
                     page: PathManager.qml("pages/settings/notificationAndTime/Notification.qml"),
                     icon: "ic_fluent_alert_badge_20_regular"
                 },
+                {
+                    title: qsTr("Notification History"),
+                    page: PathManager.qml("pages/settings/notificationAndTime/History.qml"),
+                    icon: "ic_fluent_history_20_regular"
+                },
                 {
                     title: qsTr("Time"),
                     page: PathManager.qml("pages/settings/notificationAndTime/Time.qml"),
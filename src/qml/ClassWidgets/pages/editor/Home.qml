@@ -58,13 +58,8 @@ FluentPage {
                     icon.source: PathManager.images("icons/smart_teach.svg")
                     text: qsTr("Import from CSES")
                     onTriggered: {
-                        if (AppCentral.scheduleManager.scheduleIO.importCSES()) {
-                            floatLayer.createInfoBar({
-                                severity: Severity.Success,
-                                title: qsTr("Import Success"),
-                                text: qsTr("The schedule has been imported successfully.")
-                            })
-                        } else {
+                        // 转换在后台进行，结果见 scheduleIO 的 Connections
+                        if (!AppCentral.scheduleManager.scheduleIO.importCSES()) {
                             floatLayer.createInfoBar({
                                 severity: Severity.Error,
                                 title: qsTr("Import Failed"),
@@ -120,6 +115,50 @@ FluentPage {
         }
     }
 
+    Connections {
+        target: AppCentral.scheduleManager
+
+        function onMergeFinished(result) {
+            const conflicts = result.conflicts.length
+            floatLayer.createInfoBar({
+                title: qsTr("Schedule Merged"),
+                text: conflicts > 0
+                    ? qsTr("The imported schedule was merged into the existing one with %1 conflict(s).").arg(conflicts)
+                    : qsTr("The imported schedule was merged into the existing one."),
+                severity: conflicts > 0 ? Severity.Warning : Severity.Success,
+                timeout: 5000,
+            })
+        }
+
+        function onMergeFailed(msg) {
+            floatLayer.createInfoBar({
+                title: qsTr("Import Failed"),
+                text: qsTr("Failed to merge the imported schedule.\n") + msg,
+                severity: Severity.Error,
+                timeout: 5000,
+            })
+        }
+    }
+
+    Connections {
+        target: AppCentral.scheduleManager.scheduleIO
+
+        function onImportFinished(name) {
+            floatLayer.createInfoBar({
+                severity: Severity.Success,
+                title: qsTr("Import Success"),
+                text: qsTr("The schedule has been imported successfully.")
+            })
+        }
+
+        function onImportFailed(msg) {
+            floatLayer.createInfoBar({
+                severity: Severity.Error,
+                title: qsTr("Import Failed"),
+                text: qsTr("Failed to import the schedule. Please check if the schedule file is valid.")
+            })
+        }
+    }
 
     Dialog {
         id: createScheduleDialog
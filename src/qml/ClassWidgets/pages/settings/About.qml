@@ -217,6 +217,24 @@ FluentPage {
             }
         }
 
+        SettingCard {
+            Layout.fillWidth: true
+            icon.name: "ic_fluent_save_20_regular"
+            title: qsTr("Compact Storage")
+            description: qsTr(
+                "Store schedules and settings without indentation: smaller files, faster to load and save. " +
+                "Exported schedules stay human-readable."
+            )
+
+            Switch {
+                onCheckedChanged: {
+                    let format = checked ? "compact" : "pretty"
+                    if (Configs.data.app.storage_format !== format) Configs.set("app.storage_format", format)
+                }
+                Component.onCompleted: checked = Configs.data.app.storage_format === "compact"
+            }
+        }
+
         SettingCard {
             Layout.fillWidth: true
             icon.name: "ic_fluent_learning_app_20_regular"
@@ -367,6 +367,29 @@ FluentPage {
                                             onTriggered: Qt.openUrlExternally(modelData.url)
                                         }
                                     }
+                                    // 独立进程运行：插件卡住或崩溃不影响主程序，可单独重启
+                                    MenuItem {
+                                        icon.name: "ic_fluent_window_new_20_regular"
+                                        text: qsTr("Run in Separate Process")
+                                        checkable: true
+                                        checked: PluginManager.isPluginIsolated(modelData.id)
+                                        enabled: modelData._type !== "builtin" && !modelData.isolated
+                                        onTriggered: {
+                                            PluginManager.setPluginIsolated(modelData.id, checked)
+                                            floatLayer.createInfoBar({
+                                                title: qsTr("Restart Required"),
+                                                text: qsTr("The change takes effect after restarting Class Widgets."),
+                                                severity: Severity.Info,
+                                                timeout: 5000,
+                                            })
+                                        }
+                                    }
+                                    MenuItem {
+                                        icon.name: "ic_fluent_arrow_clockwise_20_regular"
+                                        text: qsTr("Restart Plugin Process")
+                                        enabled: PluginManager.pluginHostState(modelData.id) !== "stopped"
+                                        onTriggered: PluginManager.restartPluginHost(modelData.id)
+                                    }
                                     MenuSeparator { }
                                     MenuItem {
                                         icon.name: "ic_fluent_delete_20_regular"
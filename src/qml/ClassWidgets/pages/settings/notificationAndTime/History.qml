@@ -0,0 +1,146 @@
+import QtQuick
+import QtQuick.Controls
+import QtQuick.Layouts
+import RinUI
+
+
+FluentPage {
+    id: root
+    horizontalPadding: 0
+    wrapperWidth: width - 42*2
+
+    title: qsTr("Notification History")
+
+    property var historyModel: AppCentral.notification ? AppCentral.notification.historyModel : null
+
+    function levelColor(level) {
+        switch (level) {
+            case 1: return Colors.proxy.systemSuccessColor
+            case 2: return Colors.proxy.systemCautionColor
+            case 3: return Colors.proxy.systemCriticalColor
+            default: return Colors.proxy.textSecondaryColor
+        }
+    }
+
+    ColumnLayout {
+        Layout.fillWidth: true
+        spacing: 4
+
+        SettingCard {
+            Layout.fillWidth: true
+            icon.name: "ic_fluent_filter_20_regular"
+            title: qsTr("Filter")
+            description: qsTr("Show notifications by level and time")
+
+            ComboBox {
+                model: ListModel {
+                    ListElement { text: qsTr("All levels"); value: -1 }
+                    ListElement { text: qsTr("Information"); value: 0 }
+                    ListElement { text: qsTr("Announcement"); value: 1 }
+                    ListElement { text: qsTr("Warning"); value: 2 }
+                    ListElement { text: qsTr("System"); value: 3 }
+                }
+                textRole: "text"
+                valueRole: "value"
+                onActivated: if (root.historyModel) root.historyModel.levelFilter = currentValue
+            }
+
+            ComboBox {
+                model: ListModel {
+                    ListElement { text: qsTr("All time"); value: 0 }
+                    ListElement { text: qsTr("Today"); value: 1 }
+                    ListElement { text: qsTr("Last 7 days"); value: 7 }
+                    ListElement { text: qsTr("Last 30 days"); value: 30 }
+                }
+                textRole: "text"
+                valueRole: "value"
+                onActivated: if (root.historyModel) root.historyModel.days = currentValue
+            }
+
+            Button {
+                icon.name: "ic_fluent_broom_20_regular"
+                text: qsTr("Clear")
+                onClicked: if (root.historyModel) root.historyModel.clear()
+            }
+        }
+
+        Frame {
+            Layout.fillWidth: true
+            Layout.preferredHeight: Math.max(root.height * 0.65, 320)
+            padding: 0
+
+            Text {
+                anchors.centerIn: parent
+                visible: historyList.count === 0
+                text: qsTr("No notifications yet")
+                color: Colors.proxy.textSecondaryColor
+            }
+
+            // 滚动到底部时模型才读取下一页
+            ListView {
+                id: historyList
+                anchors.fill: parent
+                anchors.margins: 4
+                clip: true
+                spacing: 2
+                model: root.historyModel
+                ScrollBar.vertical: ScrollBar {}
+
+                delegate: ItemDelegate {
+                    width: historyList.width
+                    height: 60
+
+                    RowLayout {
+                        anchors.fill: parent
+                        anchors.leftMargin: 12
+                        anchors.rightMargin: 12
+                        spacing: 12
+
+                        Rectangle {
+                            width: 4
+                            height: 32
+                            radius: 2
+                            color: root.levelColor(model.level)
+                        }
+
+                        ColumnLayout {
+                            Layout.fillWidth: true
+                            spacing: 2
+
+                            Text {
+                                Layout.fillWidth: true
+                                text: model.count > 1 ? model.title + " ×" + model.count : model.title
+                                elide: Text.ElideRight
+                                typography: Typography.BodyStrong
+                            }
+                            Text {
+                                Layout.fillWidth: true
+                                visible: model.message !== ""
+                                text: model.message
+                                elide: Text.ElideRight
+                                typography: Typography.Caption
+                                color: Colors.proxy.textSecondaryColor
+                            }
+                        }
+
+                        ColumnLayout {
+                            spacing: 2
+                            Text {
+                                Layout.alignment: Qt.AlignRight
+                                text: new Date(model.time).toLocaleString(Qt.locale(), Locale.ShortFormat)
+                                typography: Typography.Caption
+                                color: Colors.proxy.textSecondaryColor
+                            }
+                            Text {
+                                Layout.alignment: Qt.AlignRight
+                                text: model.providerId
+                                typography: Typography.Caption
+                                color: Colors.proxy.textSecondaryColor
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
@@ -71,6 +71,9 @@ ApplicationWindow {
         // 概览
         Overview {}
 
+        // 插件耗时
+        Profiler {}
+
 
     }
 
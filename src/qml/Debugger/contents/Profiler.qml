@@ -0,0 +1,125 @@
+import QtQuick
+import QtQuick.Controls
+import QtQuick.Layouts
+import RinUI
+
+
+Expander {
+    text: "Plugin Profiler"
+    Layout.fillWidth: true
+
+    // 各插件在 GUI 线程中的耗时（PluginProfiler，每秒刷新）
+    ColumnLayout {
+        Layout.fillWidth: true
+        Layout.margins: 12
+
+        RowLayout {
+            Layout.fillWidth: true
+            Text {
+                Layout.fillWidth: true
+                color: Colors.proxy.textSecondaryColor
+                typography: Typography.Caption
+                text: "Wall / CPU time spent in plugin hooks, sorted by total time. Histogram buckets (ms): "
+                      + PluginProfiler.bucketBounds.join(", ") + ", more"
+                wrapMode: Text.Wrap
+            }
+            Button {
+                text: "Reset"
+                onClicked: PluginProfiler.reset()
+            }
+            Button {
+                highlighted: true
+                text: "Export"
+                onClicked: {
+                    let path = PluginProfiler.exportReport()
+                    floatLayer.createInfoBar({
+                        severity: path ? Severity.Success : Severity.Error,
+                        title: path ? "Exported" : "Export failed",
+                        text: path,
+                    })
+                }
+            }
+        }
+
+        // 表头
+        RowLayout {
+            Layout.fillWidth: true
+            spacing: 8
+            Repeater {
+                model: ["Plugin / Hook", "Calls", "Total", "CPU", "p50", "p95", "Max", "Histogram"]
+                delegate: Text {
+                    Layout.fillWidth: index === 0
+                    Layout.preferredWidth: index === 0 ? -1 : (index === 7 ? 130 : 64)
+                    typography: Typography.BodyStrong
+                    text: modelData
+                }
+            }
+        }
+
+        Text {
+            visible: PluginProfiler.stats.length === 0
+            color: Colors.proxy.textSecondaryColor
+            text: "No plugin activity recorded yet."
+        }
+
+        Repeater {
+            model: PluginProfiler.stats
+            delegate: RowLayout {
+                Layout.fillWidth: true
+                spacing: 8
+
+                property int maxBucket: Math.max.apply(null, modelData.buckets)
+
+                ColumnLayout {
+                    Layout.fillWidth: true
+                    spacing: 0
+                    Text {
+                        Layout.fillWidth: true
+                        text: modelData.plugin
+                        elide: Text.ElideRight
+                    }
+                    Text {
+                        Layout.fillWidth: true
+                        text: modelData.hook + (modelData.errors ? "  (" + modelData.errors + " errors)" : "")
+                        elide: Text.ElideRight
+                        typography: Typography.Caption
+                        color: modelData.errors ? Colors.proxy.systemCriticalColor : Colors.proxy.textSecondaryColor
+                    }
+                }
+                Text { Layout.preferredWidth: 64; text: modelData.count }
+                Text { Layout.preferredWidth: 64; text: modelData.total_ms.toFixed(1) }
+                Text { Layout.preferredWidth: 64; text: modelData.cpu_ms.toFixed(1) }
+                Text { Layout.preferredWidth: 64; text: modelData.p50_ms }
+                Text { Layout.preferredWidth: 64; text: modelData.p95_ms }
+                Text {
+                    Layout.preferredWidth: 64
+                    text: modelData.max_ms.toFixed(1)
+                    color: modelData.max_ms >= 100 ? Colors.proxy.systemCautionColor : Colors.proxy.textColor
+                }
+
+                // 耗时直方图
+                Row {
+                    Layout.preferredWidth: 130
+                    Layout.preferredHeight: 24
+                    spacing: 1
+                    Repeater {
+                        model: modelData.buckets
+                        delegate: Rectangle {
+                            anchors.bottom: parent.bottom
+                            width: 9
+                            height: maxBucket > 0 ? Math.max(modelData > 0 ? 2 : 0, 24 * modelData / maxBucket) : 0
+                            radius: 1
+                            color: index >= 9 ? Colors.proxy.systemCautionColor : Colors.proxy.primaryColor
+
+                            HoverHandler { id: bucketHover }
+                            ToolTip {
+                                visible: bucketHover.hovered
+                                text: modelData + " calls"
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}